@@ -0,0 +1,410 @@
+import argparse
+import datetime as dt
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
+
+import sync_to_sheet as s
+from iconik_client import IconikClient
+from metrics import METRICS, add_metrics_arguments, reporting
+from profiling import PROFILER, add_profile_arguments, profiling
+from sheets_client import SheetsService
+
+# sheet column -> writable field on assets/v1/assets/{id}/
+ASSET_FIELDS = {
+    "title": "title",
+    "time_start_ms": "time_start_milliseconds",
+    "time_end_ms": "time_end_milliseconds",
+}
+# derived or sync-only columns that never go back to iconik
+READ_ONLY_COLUMNS = {"id", "time_start_S", "time_end_S", "ProjectNameTag", "SearchTag", s.FINGERPRINT_COLUMN}
+DEFAULT_FIELDS = "title,time_start_ms,time_end_ms"
+SKIP_REASONS = ("empty id", "duplicate id", "not in baseline", "cleared time value", "forbidden")
+
+
+def parse_fields(value: str, allow_metadata: bool) -> tuple[list[str], list[str]]:
+    asset_fields: list[str] = []
+    metadata_fields: list[str] = []
+    for field in (f.strip() for f in value.split(",")):
+        if not field or field in asset_fields or field in metadata_fields:
+            continue
+        if field in READ_ONLY_COLUMNS:
+            print(f"{field} 컬럼은 iconik 반영 대상이 아닙니다(파생/동기화 전용).", file=sys.stderr)
+            sys.exit(2)
+        if field in ASSET_FIELDS:
+            asset_fields.append(field)
+        elif allow_metadata:
+            metadata_fields.append(field)
+        else:
+            print(f"메타데이터 필드 {field} 를 반영하려면 --allow-metadata 가 필요합니다.", file=sys.stderr)
+            sys.exit(2)
+    return asset_fields, metadata_fields
+
+
+def parse_ms(value: str) -> int | None:
+    if value == "":
+        return None
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"not a whole number of milliseconds: {value}")
+    return int(number)
+
+
+def is_structured(value: Any) -> bool:
+    # dicts and nested lists are written to the sheet as JSON text; their
+    # original shape can't be recovered from a cell, so they are never applied
+    if isinstance(value, dict):
+        return True
+    return isinstance(value, list) and any(isinstance(v, (dict, list)) for v in value)
+
+
+def read_sheet(
+    args: argparse.Namespace,
+    fields: list[str],
+) -> tuple[dict[str, tuple[int, list[str]]], list[dict], int]:
+    creds = s.build_credentials()
+    service = SheetsService(creds)
+    reader = s.TabReader(
+        service,
+        args.sheet,
+        args.tab,
+        service_factory=lambda: SheetsService(creds),
+        concurrency=args.read_concurrency,
+    )
+    sheet_rows = reader.rows()
+    header = next(sheet_rows, None)
+    if header is None:
+        print("시트 탭에서 값을 읽지 못했습니다(빈 탭이거나 접근 권한/이름을 확인하세요).", file=sys.stderr)
+        sys.exit(2)
+    names = [s.normalize_sheet_cell(v) for v in header]
+    missing = [c for c in ["id"] + fields if c not in names]
+    if missing:
+        print(f"시트 헤더에 컬럼이 없습니다: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(2)
+
+    is_edited = None
+    if args.edited_only:
+        if s.FINGERPRINT_COLUMN in names:
+            is_edited = s.fingerprint_checker(header)
+        else:
+            print(f"탭에 {s.FINGERPRINT_COLUMN} 컬럼이 없어 --edited-only 를 무시합니다.", file=sys.stderr)
+
+    positions = [names.index(c) for c in ["id"] + fields]
+    by_id: dict[str, tuple[int, list[str]]] = {}
+    skipped: list[dict] = []
+    dupes: set[str] = set()
+    unedited: set[str] = set()
+    row_count = 0
+    for row_number, row in enumerate(sheet_rows, start=2):
+        row_count += 1
+        if not row:
+            continue
+        cells = s.normalize_sheet_row([row[i] if i < len(row) else "" for i in positions])
+        # unedited rows still take part in the duplicate-id check below
+        if is_edited is not None and not is_edited(row):
+            unedited.add(cells[0])
+        asset_id = cells[0]
+        if not asset_id:
+            skipped.append({"row": row_number, "id": "", "status": "skipped", "reason": "empty id"})
+            continue
+        if asset_id in by_id:
+            dupes.add(asset_id)
+            skipped.append({"row": row_number, "id": asset_id, "status": "skipped", "reason": "duplicate id"})
+            continue
+        by_id[asset_id] = (row_number, cells[1:])
+    for asset_id in dupes:
+        row_number, _ = by_id.pop(asset_id)
+        skipped.append({"row": row_number, "id": asset_id, "status": "skipped", "reason": "duplicate id"})
+    edited = {asset_id: entry for asset_id, entry in by_id.items() if asset_id not in unedited}
+    return edited, skipped, row_count
+
+
+def plan_changes(
+    baseline: dict[str, dict],
+    sheet: dict[str, tuple[int, list[str]]],
+    asset_fields: list[str],
+    metadata_fields: list[str],
+) -> tuple[list[dict], list[dict]]:
+    # Diff against the baseline export only (no per-asset GET): each sheet cell
+    # is compared with what sync_to_sheet would have written for that asset.
+    fields = asset_fields + metadata_fields
+    build_row = s.RowBuilder(fields)
+    plans: list[dict] = []
+    skipped: list[dict] = []
+    for asset_id, (row_number, cells) in sheet.items():
+        asset = baseline.get(asset_id)
+        if asset is None:
+            skipped.append({"row": row_number, "id": asset_id, "status": "skipped", "reason": "not in baseline"})
+            continue
+        expected = s.normalize_sheet_row(build_row(asset))
+        if expected == cells:
+            continue
+        md = asset.get("metadata") if isinstance(asset.get("metadata"), dict) else {}
+        changes: dict[str, dict] = {}
+        body: dict[str, Any] = {}
+        metadata_values: dict[str, dict] = {}
+        errors: list[str] = []
+        cleared: list[str] = []
+        for field, old, new in zip(fields, expected, cells):
+            if old == new:
+                continue
+            if field in ASSET_FIELDS:
+                key = ASSET_FIELDS[field]
+                try:
+                    value = new if key == "title" else parse_ms(new)
+                except ValueError as exc:
+                    errors.append(f"{field}: {exc}")
+                    continue
+                if value is None:
+                    # the assets API does not document null for the time fields,
+                    # so a cleared cell is left out of the PATCH instead
+                    cleared.append(field)
+                    continue
+                body[key] = value
+            elif is_structured(md.get(field)):
+                errors.append(f"{field}: structured value (JSON in the sheet) is not applied")
+                continue
+            else:
+                metadata_values[field] = {"field_values": [{"value": v} for v in new.split("\n") if v]}
+            changes[field] = {"from": old, "to": new}
+        entry: dict[str, Any] = {"row": row_number, "id": asset_id, "changes": changes}
+        if cleared:
+            entry["not_applied"] = cleared
+        if errors:
+            entry.update(status="skipped", reason="; ".join(errors))
+            skipped.append(entry)
+            continue
+        if not changes:
+            entry.update(status="skipped", reason="cleared time value")
+            skipped.append(entry)
+            continue
+        # one call per endpoint: asset fields in a single PATCH, metadata in a single PUT
+        requests_: list[tuple[str, str, dict]] = []
+        if body:
+            requests_.append(("PATCH", f"assets/v1/assets/{asset_id}/", body))
+        if metadata_values:
+            requests_.append(("PUT", f"metadata/v1/assets/{asset_id}/", {"metadata_values": metadata_values}))
+        entry.update(status="planned", requests=requests_)
+        plans.append(entry)
+    return plans, skipped
+
+
+def api_of(path: str) -> str:
+    # "metadata/v1/assets/{id}/" -> "metadata/v1"
+    return "/".join(path.split("/")[:2])
+
+
+def apply_one(client: IconikClient, plan: dict, forbidden: dict[str, str]) -> dict:
+    # A 403 is a permission problem, not a per-asset one: once an API has
+    # answered 403 (recorded in `forbidden`) later rows that need it are
+    # skipped before any of their calls, so none is left half applied.
+    result = {k: v for k, v in plan.items() if k != "requests"}
+    for api in (api_of(path) for _, path, _ in plan["requests"]):
+        if api in forbidden:
+            result.update(status="skipped", reason="forbidden", forbidden=api, calls=[])
+            return result
+    calls: list[dict] = []
+    for method, path, body in plan["requests"]:
+        api = api_of(path)
+        try:
+            resp = client.request_with_retries(method, client.url(path), json_body=body)
+        except Exception as exc:
+            calls.append({"method": method, "path": path, "http_status": None, "message": str(exc)})
+            break
+        call = {"method": method, "path": path, "http_status": resp.status_code}
+        if resp.status_code >= 400:
+            call["message"] = resp.text[:500]
+            calls.append(call)
+            if resp.status_code == 403:
+                forbidden.setdefault(api, call["message"])
+                result["forbidden"] = api
+            break
+        calls.append(call)
+    result["calls"] = calls
+    ok = len(calls) == len(plan["requests"]) and all(c.get("http_status") and c["http_status"] < 400 for c in calls)
+    result["status"] = "applied" if ok else "failed"
+    return result
+
+
+def apply_all(client: IconikClient, plans: list[dict], concurrency: int, forbidden: dict[str, str]) -> Iterator[dict]:
+    # bounded window in flight; the client's shared rate limiter paces the calls
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending: deque = deque()
+        for plan in plans:
+            if len(pending) >= concurrency * 2:
+                yield pending.popleft().result()
+            pending.append(executor.submit(apply_one, client, plan, forbidden))
+        while pending:
+            yield pending.popleft().result()
+
+
+def main() -> None:
+    s.load_dotenv()
+    s.configure_stdio()
+
+    parser = argparse.ArgumentParser(
+        description="Apply edits made in a Google Sheets tab back to iconik (dry-run unless --apply)."
+    )
+    s.add_source_arguments(parser)
+    parser.add_argument("--sheet", default=os.getenv("GOOGLE_SHEET_ID"), help="Google Spreadsheet ID")
+    parser.add_argument("--tab", required=True, help="Tab name to read edits from")
+    parser.add_argument("--apply", action="store_true", help="Actually update iconik (default is a dry-run)")
+    parser.add_argument(
+        "--fields",
+        default=os.getenv("ICONIK_APPLY_FIELDS", DEFAULT_FIELDS),
+        help="Comma-separated sheet columns to apply (metadata keys need --allow-metadata)",
+    )
+    parser.add_argument(
+        "--allow-metadata",
+        action="store_true",
+        help="Allow metadata keys in --fields (PUT metadata/v1/assets/{id}/, which needs an admin token)",
+    )
+    parser.add_argument("--limit", type=int, default=0, help="Apply at most N changed assets (0 = all)")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("ICONIK_APPLY_CONCURRENCY", "8")),
+        help="How many assets to update in parallel",
+    )
+    parser.add_argument(
+        "--read-concurrency",
+        type=int,
+        default=int(os.getenv("GOOGLE_SHEETS_READ_CONCURRENCY", "4")),
+        help="How many batchGet requests to keep in flight while reading the tab",
+    )
+    parser.add_argument(
+        "--edited-only",
+        action="store_true",
+        help=f"Only consider rows whose {s.FINGERPRINT_COLUMN} shows an edit since the sync",
+    )
+    parser.add_argument("--max-preview", type=int, default=20, help="How many changes to print")
+    parser.add_argument("--report-dir", default="reports", help="Where to write roundtrip_YYYYMMDD_HHMMSS.json")
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    METRICS.configure(args, "apply")
+    PROFILER.start(args, "apply", hot=(read_sheet, plan_changes, apply_one, s.normalize_sheet_cell))
+
+    if not args.sheet:
+        print("Missing --sheet (or GOOGLE_SHEET_ID).", file=sys.stderr)
+        sys.exit(2)
+
+    asset_fields, metadata_fields = parse_fields(args.fields, args.allow_metadata)
+    fields = asset_fields + metadata_fields
+    if not fields:
+        print("--fields 에 반영할 컬럼이 없습니다.", file=sys.stderr)
+        sys.exit(2)
+
+    with METRICS.phase("load_source"):
+        assets, _ = s.load_source(args)
+    baseline = {str(a["id"]): a for a in assets if a.get("id")}
+
+    with METRICS.phase("sheets_read"):
+        sheet, skipped, row_count = read_sheet(args, fields)
+    with METRICS.phase("plan"):
+        plans, plan_skipped = plan_changes(baseline, sheet, asset_fields, metadata_fields)
+    skipped.extend(plan_skipped)
+    plans.sort(key=lambda p: p["row"])
+    if args.limit > 0:
+        plans = plans[: args.limit]
+
+    results: list[dict] = []
+    forbidden: dict[str, str] = {}
+    client = None
+    if args.apply and plans:
+        client = IconikClient.from_env()
+        try:
+            with METRICS.phase("apply"):
+                results = list(apply_all(client, plans, max(1, args.concurrency), forbidden))
+        finally:
+            client.close()
+    else:
+        results = [{k: v for k, v in p.items() if k != "requests"} for p in plans]
+
+    applied = sum(1 for r in results if r["status"] == "applied")
+    failed = [r for r in results if r["status"] == "failed"]
+    # rows that never called a forbidden API are skips, not failures
+    skipped.extend(r for r in results if r["status"] == "skipped")
+    METRICS.inc("assets_total", applied, status="applied")
+    METRICS.inc("assets_total", len(failed), status="failed")
+    changed_cells = sum(len(p["changes"]) for p in plans)
+    reasons: dict[str, int] = {}
+    for item in skipped:
+        reason = item["reason"] if item["reason"] in SKIP_REASONS else "invalid value"
+        reasons[reason] = reasons.get(reason, 0) + 1
+
+    now = dt.datetime.now()
+    log = {
+        "timestamp": now.isoformat(timespec="seconds"),
+        "mode": "apply" if args.apply else "dry-run",
+        "sheet_id": args.sheet,
+        "tab": args.tab,
+        "json": args.store or args.json,
+        "fields": fields,
+        "sheet_rows": row_count,
+        "changed_assets": len(plans),
+        "changed_cells": changed_cells,
+        "applied": applied,
+        "failed": len(failed),
+        "skipped": len(skipped),
+        "forbidden": forbidden,
+        "results": sorted([r for r in results if r["status"] != "skipped"] + skipped, key=lambda r: r["row"]),
+    }
+    os.makedirs(args.report_dir, exist_ok=True)
+    log_path = os.path.join(args.report_dir, f"roundtrip_{now.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(log_path, "w", encoding="utf-8") as f:
+        json.dump(log, f, ensure_ascii=False, indent=2)
+
+    lines: list[str] = []
+    lines.append("구글 시트 → iconik 적용 리포트")
+    lines.append(f"- 시각: {log['timestamp']}")
+    lines.append(f"- 시트 ID: {args.sheet}")
+    lines.append(f"- 탭: {args.tab}")
+    lines.append(f"- 기준 JSON: {args.store or args.json}")
+    lines.append(f"- 모드: {'apply' if args.apply else 'dry-run (변경 없음, --apply 로 반영)'}")
+    lines.append(f"- 대상 필드: {', '.join(fields)}")
+    lines.append(f"- 시트 행 수(헤더 제외): {row_count}")
+    lines.append(f"- 변경 예정 에셋: {len(plans)} (셀 {changed_cells}개)")
+    lines.append(
+        f"- 스킵: {len(skipped)}"
+        + (" (" + ", ".join(f"{k} {v}" for k, v in sorted(reasons.items())) + ")" if reasons else "")
+    )
+    if args.apply:
+        lines.append(f"- 성공: {applied}, 실패: {len(failed)}")
+    for api, message in sorted(forbidden.items()):
+        hit = sum(1 for r in results if r.get("forbidden") == api)
+        lines.append(f"- 권한 없음(HTTP 403): {api} — 에셋 {hit}개 미반영, 이후 요청 중단. {message}".rstrip())
+    not_applied = sum(len(r.get("not_applied", ())) for r in plans + skipped)
+    if not_applied:
+        lines.append(f"- 비운 시간 셀 {not_applied}개는 반영하지 않음(API에 null 지원이 문서화되어 있지 않음)")
+    if plans:
+        lines.append("")
+        lines.append(f"변경 예시 (최대 {max(0, args.max_preview)}개):")
+        for plan in plans[: max(0, args.max_preview)]:
+            diff = ", ".join(
+                f"{field} {json.dumps(c['from'], ensure_ascii=False)} → {json.dumps(c['to'], ensure_ascii=False)}"
+                for field, c in plan["changes"].items()
+            )
+            lines.append(f"- R{plan['row']} {plan['id']}: {diff}")
+    # 403s are summarized once above instead of once per row
+    listed = [r for r in failed if "forbidden" not in r]
+    if listed:
+        lines.append("")
+        lines.append(f"실패 (최대 {max(0, args.max_preview)}개):")
+        for r in listed[: max(0, args.max_preview)]:
+            last = r["calls"][-1] if r.get("calls") else {}
+            lines.append(f"- R{r['row']} {r['id']}: HTTP {last.get('http_status')} {last.get('message', '')}".rstrip())
+    lines.append("")
+    lines.append(f"로그: {log_path}")
+    print("\n".join(lines))
+    if client is not None:
+        print(f"Rate limiter: {client.limiter.summary()}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    with reporting(), profiling():
+        main()
@@ -0,0 +1,218 @@
+import gzip
+import io
+import json
+import os
+from typing import IO, Iterable, Iterator
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for .zst files
+    zstandard = None
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+def strip_compression_suffix(path: str) -> str:
+    lower = path.lower()
+    for suffix in (".gz", ".zst"):
+        if lower.endswith(suffix):
+            return path[: -len(suffix)]
+    return path
+
+
+def compression_from_path(path: str) -> str:
+    lower = path.lower()
+    if lower.endswith(".gz"):
+        return "gzip"
+    if lower.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def is_ndjson_path(path: str) -> bool:
+    return strip_compression_suffix(path).lower().endswith(NDJSON_SUFFIXES)
+
+
+def require_zstandard():
+    if zstandard is None:
+        raise RuntimeError("zstd compression requires the 'zstandard' package (pip install zstandard).")
+    return zstandard
+
+
+def open_text(path: str) -> IO[str]:
+    # Compression is detected from magic bytes, so a renamed file still opens.
+    with open(path, "rb") as f:
+        head = f.read(4)
+    if head.startswith(GZIP_MAGIC):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if head.startswith(ZSTD_MAGIC):
+        raw = open(path, "rb")
+        reader = require_zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_ndjson(path: str) -> Iterator[dict]:
+    with open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, dict):
+                yield item
+
+
+def iter_json_array(f: IO[str], chunk_size: int = 1 << 20) -> Iterator:
+    # Decode the elements of a top-level JSON array one at a time, reading the
+    # file in chunks, so only the current element and one buffer are in memory.
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            if buf[pos] == "," and not started:
+                raise ValueError("Unexpected ',' before '['")
+            pos += 1
+        if pos >= len(buf) and not eof:
+            more = f.read(chunk_size)
+            eof = not more
+            buf = buf[pos:] + more
+            pos = 0
+            continue
+        if pos >= len(buf):
+            raise ValueError("Unterminated JSON array")
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("Expected a JSON array")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            end = None
+        if end is None or (not eof and (end == len(buf) or (type(item) in (int, float) and buf[end] in ".eE+-"))):
+            # element runs past the buffer (or may: a number cut at the boundary,
+            # where raw_decode accepts "-25" out of "-25.0" or "1" out of "1e5");
+            # grow geometrically so a large element is not re-parsed once per chunk
+            more = f.read(max(chunk_size, len(buf) - pos))
+            eof = not more
+            buf = buf[pos:] + more
+            pos = 0
+            continue
+        yield item
+        pos = end
+        if pos > chunk_size and pos > len(buf) // 2:
+            buf = buf[pos:]
+            pos = 0
+
+
+def iter_assets(path: str) -> Iterator[dict]:
+    if is_ndjson_path(path):
+        yield from iter_ndjson(path)
+        return
+    with open_text(path) as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+    if head != "[":
+        # {objects/assets: [...]} wrappers and unlabeled ndjson go through the full loader
+        yield from read_assets(path)
+        return
+    with open_text(path) as f:
+        for item in iter_json_array(f):
+            if isinstance(item, dict):
+                yield item
+
+
+def read_assets(path: str) -> list[dict]:
+    if is_ndjson_path(path):
+        return list(iter_ndjson(path))
+    with open_text(path) as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as exc:
+            # one JSON object per line (ndjson export without the .ndjson suffix)
+            if exc.msg != "Extra data":
+                raise
+            return list(iter_ndjson(path))
+    if isinstance(data, list):
+        return [d for d in data if isinstance(d, dict)]
+    if isinstance(data, dict):
+        items = data.get("objects") or data.get("assets") or []
+        return [d for d in items if isinstance(d, dict)]
+    return []
+
+
+def write_assets(path: str, assets: list[dict], output_format: str, compression: str = "auto") -> None:
+    # Written next to the target and swapped in, so readers never see a half-written export.
+    tmp_path = path + ".tmp"
+    if output_format == "ndjson":
+        if compression == "auto":
+            compression = compression_from_path(path)
+        with NdjsonWriter(tmp_path, compression=compression) as writer:
+            for start in range(0, len(assets), 1000):
+                writer.write_page(assets[start : start + 1000])
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(assets, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class NdjsonWriter:
+    # Each write_page() call lands as one self-contained block (a gzip member or
+    # zstd frame when compressed), so a half-written run still leaves every
+    # completed page readable and the file can be appended to later.
+    def __init__(self, path: str, compression: str = "auto", append: bool = False, level: int = 3):
+        if compression == "auto":
+            compression = compression_from_path(path)
+        if compression not in ("none", "gzip", "zstd"):
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd":
+            self._zstd = require_zstandard().ZstdCompressor(level=level)
+        self.path = path
+        self.compression = compression
+        self.level = level
+        self.count = 0
+        self._f = open(path, "ab" if append else "wb")
+
+    def _encode(self, data: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=self.level)
+        if self.compression == "zstd":
+            return self._zstd.compress(data)
+        return data
+
+    def write_page(self, items: Iterable[dict]) -> int:
+        lines = [json.dumps(item, ensure_ascii=False, separators=(",", ":")) for item in items]
+        if not lines:
+            return 0
+        self._f.write(self._encode(("\n".join(lines) + "\n").encode("utf-8")))
+        self._f.flush()
+        self.count += len(lines)
+        return len(lines)
+
+    def tell(self) -> int:
+        return self._f.tell()
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._f.close()
+
+    def __enter__(self) -> "NdjsonWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
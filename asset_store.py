@@ -0,0 +1,143 @@
+import json
+import sqlite3
+from typing import Iterable, Iterator
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    title TEXT,
+    date_modified TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assets_seq ON assets(seq);
+CREATE TABLE IF NOT EXISTS asset_metadata (
+    asset_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (asset_id, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS asset_metadata_key ON asset_metadata(key);
+"""
+
+
+def parse_where(items: Iterable[str]) -> dict[str, str]:
+    where: dict[str, str] = {}
+    for item in items:
+        if "=" not in item:
+            raise ValueError(f"Expected KEY=VALUE, got: {item}")
+        key, value = item.split("=", 1)
+        where[key.strip()] = value.strip()
+    return where
+
+
+class AssetStore:
+    # Assets keyed by id, in export order (seq). Each metadata value is also kept
+    # as JSON in asset_metadata, so filters and header scans never touch `data`.
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "AssetStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def clear(self) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM asset_metadata")
+            self.conn.execute("DELETE FROM assets")
+
+    def upsert(self, items: Iterable[dict]) -> int:
+        count = 0
+        with self.conn:
+            (next_seq,) = self.conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM assets").fetchone()
+            for item in items:
+                asset_id = item.get("id")
+                if not asset_id:
+                    continue
+                asset_id = str(asset_id)
+                # existing ids keep their position; only new ids go to the end
+                self.conn.execute(
+                    "INSERT INTO assets (id, seq, title, date_modified, data) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET title = excluded.title, "
+                    "date_modified = excluded.date_modified, data = excluded.data",
+                    (
+                        asset_id,
+                        next_seq,
+                        str(item.get("title") or item.get("name") or ""),
+                        item.get("date_modified"),
+                        json.dumps(item, ensure_ascii=False, separators=(",", ":")),
+                    ),
+                )
+                next_seq += 1
+                self.conn.execute("DELETE FROM asset_metadata WHERE asset_id = ?", (asset_id,))
+                md = item.get("metadata")
+                if isinstance(md, dict):
+                    self.conn.executemany(
+                        "INSERT INTO asset_metadata (asset_id, key, value) VALUES (?, ?, ?)",
+                        [
+                            (asset_id, key, json.dumps(value, ensure_ascii=False))
+                            for key, value in md.items()
+                            if isinstance(key, str) and key
+                        ],
+                    )
+                count += 1
+        return count
+
+    def _filter_sql(self, ids: Iterable[str] | None, where: dict[str, str] | None) -> tuple[str, list]:
+        clauses: list[str] = []
+        params: list = []
+        if ids is not None:
+            # a temp table instead of IN (?, ?, ...) keeps large id lists under SQLite's variable limit
+            with self.conn:
+                self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS filter_ids (id TEXT PRIMARY KEY)")
+                self.conn.execute("DELETE FROM filter_ids")
+                self.conn.executemany("INSERT OR IGNORE INTO filter_ids (id) VALUES (?)", ((str(i),) for i in ids))
+            clauses.append("a.id IN (SELECT id FROM filter_ids)")
+        for key, value in (where or {}).items():
+            # json_each matches a scalar value or any element of a list value
+            clauses.append(
+                "EXISTS (SELECT 1 FROM asset_metadata m, json_each(m.value) j "
+                "WHERE m.asset_id = a.id AND m.key = ? AND CAST(j.value AS TEXT) = ?)"
+            )
+            params.extend([key, value])
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, ids: Iterable[str] | None = None, where: dict[str, str] | None = None) -> int:
+        sql, params = self._filter_sql(ids, where)
+        return self.conn.execute(f"SELECT COUNT(*) FROM assets a{sql}", params).fetchone()[0]
+
+    def get(self, asset_id: str) -> dict | None:
+        row = self.conn.execute("SELECT data FROM assets WHERE id = ?", (str(asset_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_assets(
+        self,
+        ids: Iterable[str] | None = None,
+        where: dict[str, str] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[dict]:
+        sql, params = self._filter_sql(ids, where)
+        cur = self.conn.execute(f"SELECT a.data FROM assets a{sql} ORDER BY a.seq", params)
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                return
+            for (data,) in batch:
+                yield json.loads(data)
+
+    def metadata_keys(self, ids: Iterable[str] | None = None, where: dict[str, str] | None = None) -> set[str]:
+        sql, params = self._filter_sql(ids, where)
+        rows = self.conn.execute(
+            f"SELECT DISTINCT k.key FROM asset_metadata k WHERE k.asset_id IN (SELECT a.id FROM assets a{sql})",
+            params,
+        )
+        return {key for (key,) in rows}
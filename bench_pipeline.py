@@ -0,0 +1,253 @@
+import argparse
+import datetime as dt
+import gc
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable
+
+import sync_to_sheet as s
+import verify_sheet_matches as v
+from column_stats import ColumnStats
+from synthetic_assets import generate_assets, write_synthetic_assets
+
+STAGES = ["load_assets", "build_header", "flatten_assets", "print_match_report", "verify_compare"]
+# Baseline comparisons ignore differences below these, so tiny stages do not flap.
+MIN_SECONDS_DELTA = 0.05
+MIN_BYTES_DELTA = 4 << 20
+
+
+def parse_sizes(text: str) -> list[int]:
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        scale = {"k": 1_000, "m": 1_000_000}.get(part[-1], 1)
+        sizes.append(int(float(part.rstrip("km")) * scale))
+    return sizes
+
+
+def write_source(path: str, count: int, args: argparse.Namespace) -> None:
+    assets = generate_assets(
+        count, seed=args.seed, metadata_keys=args.metadata_keys, fill=args.fill, nested=args.nested
+    )
+    write_synthetic_assets(path, assets)
+
+
+def sheet_values(rows: list[list[str]], edit_rate: float, seed: int) -> list[list[str]]:
+    # What values().get hands back for a synced tab: trailing empty cells are
+    # dropped, and a few cells were edited by hand so the diff path runs too.
+    rng = random.Random(seed)
+    values = []
+    for n, row in enumerate(rows):
+        row = list(row)
+        if n and rng.random() < edit_rate:
+            row[rng.randrange(len(row))] = "edited"
+        while row and not row[-1]:
+            row.pop()
+        values.append(row)
+    return values
+
+
+class StageRunner:
+    # Times each stage with perf_counter; with `traced`, also records the
+    # tracemalloc peak above what was allocated when the stage started.
+    def __init__(self, traced: bool):
+        self.traced = traced
+        self.results: dict[str, dict[str, Any]] = {}
+
+    def run(self, name: str, fn: Callable[[], Any]) -> Any:
+        gc.collect()
+        if self.traced:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        entry = self.results.setdefault(name, {})
+        if self.traced:
+            entry["peak_bytes"] = tracemalloc.get_traced_memory()[1] - base
+        else:
+            entry["seconds"] = min(elapsed, entry.get("seconds", elapsed))
+        return result
+
+
+def run_pipeline(path: str, runner: StageRunner, args: argparse.Namespace) -> dict[str, Any]:
+    assets = runner.run("load_assets", lambda: s.load_assets(path))
+    header = runner.run("build_header", lambda: s.build_header(assets))
+    stats = ColumnStats(header)
+    rows = runner.run("flatten_assets", lambda: s.flatten_assets(assets, header, workers=args.workers, stats=stats))
+    runner.run(
+        "print_match_report",
+        lambda: s.print_match_report(
+            asset_count=len(assets),
+            header=header,
+            stats=stats,
+            matches=(s.match_entry(i, a) for i, a in enumerate(assets)),
+            tab_name="bench",
+            print_all_matches=False,
+            match_preview=20,
+            stream=io.StringIO(),
+        ),
+    )
+    values = sheet_values(rows, args.edit_rate, args.seed)
+    mismatch_cells = runner.run("verify_compare", lambda: verify_compare(header, rows, values))
+    return {"assets": len(assets), "columns": len(header), "mismatch_cells": mismatch_cells}
+
+
+def verify_compare(cols: list[str], expected_rows: list[list[str]], sheet_rows: list[list[str]]) -> int:
+    # The order-mode loop of verify_sheet_matches.main on an in-memory tab.
+    col_index = {name: i for i, name in enumerate(s.normalize_sheet_row(sheet_rows[0])) if name}
+    expected_norm = [s.normalize_sheet_row(r) for r in expected_rows[1:]]
+    pick = v.row_picker(cols, col_index)
+    expected_digest = v.TableDigest()
+    expected_digest.add(s.normalize_sheet_row(cols))
+    for r in expected_norm:
+        expected_digest.add(r)
+    actual_digest = v.TableDigest()
+    actual_digest.add(cols)
+    compare_rows = v.RowComparer(cols, 20)
+    for i, raw in enumerate(sheet_rows[1:]):
+        row = pick(raw)
+        actual_digest.add(row)
+        compare_rows(expected_norm[i], row, i + 2)
+    expected_digest.hexdigest()
+    actual_digest.hexdigest()
+    return compare_rows.mismatch_cells
+
+
+def bench_size(count: int, args: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="iconik_bench_") as tmp:
+        path = os.path.join(tmp, "assets." + args.format)
+        print(f"[{count}] 합성 에셋 생성 중...", file=sys.stderr)
+        write_source(path, count, args)
+
+        timed = StageRunner(traced=False)
+        for _ in range(max(1, args.repeat)):
+            info = run_pipeline(path, timed, args)
+            gc.collect()
+        stages = timed.results
+        if args.memory:
+            traced = StageRunner(traced=True)
+            tracemalloc.start()
+            try:
+                run_pipeline(path, traced, args)
+            finally:
+                info["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            for name, entry in traced.results.items():
+                stages[name].update(entry)
+    info["stages"] = {name: stages[name] for name in STAGES}
+    return info
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for size, current in results["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        for stage, entry in current["stages"].items():
+            base_entry = base.get("stages", {}).get(stage, {})
+            for metric, floor in (("seconds", MIN_SECONDS_DELTA), ("peak_bytes", MIN_BYTES_DELTA)):
+                new, old = entry.get(metric), base_entry.get(metric)
+                if new is None or not old:
+                    continue
+                if new > old * (1 + tolerance) and new - old > floor:
+                    regressions.append(f"{size} {stage} {metric}: {format_value(metric, old)} → {format_value(metric, new)} ({new / old:.2f}x)")
+    return regressions
+
+
+def format_value(metric: str, value: float) -> str:
+    if metric == "seconds":
+        return f"{value:.3f}s"
+    return f"{value / (1 << 20):.1f}MiB"
+
+
+def print_results(results: dict, stream) -> None:
+    for size, info in results["sizes"].items():
+        print(f"에셋 {size}개 (컬럼 {info['columns']}, 불일치 셀 {info['mismatch_cells']})", file=stream)
+        for stage, entry in info["stages"].items():
+            line = f"- {stage}: {format_value('seconds', entry['seconds'])}"
+            if "peak_bytes" in entry:
+                line += f", peak {format_value('peak_bytes', entry['peak_bytes'])}"
+            print(line, file=stream)
+        if "peak_bytes" in info:
+            print(f"- 전체 peak: {format_value('peak_bytes', info['peak_bytes'])}", file=stream)
+
+
+def main() -> None:
+    s.configure_stdio()
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark load/header/flatten/report/verify stages on synthetic iconik assets."
+    )
+    parser.add_argument("--sizes", default="10k,100k,1m", help="Comma-separated asset counts (k/m suffixes allowed)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--metadata-keys", type=int, default=40, help="Distinct metadata keys across all assets")
+    parser.add_argument("--fill", type=float, default=0.35, help="Chance that an asset has a given metadata key")
+    parser.add_argument("--nested", type=float, default=0.02, help="Chance that a metadata value is a list of dicts")
+    parser.add_argument("--edit-rate", type=float, default=0.001, help="Share of sheet rows with one edited cell")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json", help="Source file format to load")
+    parser.add_argument("--workers", type=int, default=1, help="flatten_assets worker processes")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per size; the fastest is kept")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip the tracemalloc pass")
+    parser.add_argument("--out", help="Results JSON (default: reports/bench_YYYYMMDD_HHMMSS.json)")
+    parser.add_argument("--baseline", default=os.getenv("ICONIK_BENCH_BASELINE"), help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown/growth over the baseline")
+    parser.add_argument("--save-baseline", help="Also write the results to this path as the new baseline")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {
+        "timestamp": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {
+            "seed": args.seed,
+            "metadata_keys": args.metadata_keys,
+            "fill": args.fill,
+            "nested": args.nested,
+            "edit_rate": args.edit_rate,
+            "format": args.format,
+            "workers": args.workers,
+        },
+        "sizes": {},
+    }
+    for count in parse_sizes(args.sizes):
+        results["sizes"][str(count)] = bench_size(count, args)
+
+    out = args.out or os.path.join("reports", f"bench_{dt.datetime.now():%Y%m%d_%H%M%S}.json")
+    for path in filter(None, (out, args.save_baseline)):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print_results(results, sys.stdout)
+    print(f"결과: {out}")
+
+    if not args.baseline:
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("options") != results["options"]:
+        print("경고: 기준 결과와 생성/실행 옵션이 다릅니다. 비교가 정확하지 않을 수 있습니다.", file=sys.stderr)
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    print(f"기준: {args.baseline} (허용 {args.tolerance:.0%})")
+    if not regressions:
+        print("회귀 없음")
+        return
+    print(f"회귀 {len(regressions)}건:")
+    for line in regressions:
+        print(f"- {line}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
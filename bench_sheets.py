@@ -0,0 +1,191 @@
+import argparse
+import datetime as dt
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from typing import Any
+
+import sync_to_sheet as s
+from fake_sheets import FakeHttpError, FakeSheets
+from synthetic_assets import generate_assets
+
+
+def parse_ints(text: str) -> list[int]:
+    return [int(float(part)) for part in text.split(",") if part.strip()]
+
+
+def new_fake(args: argparse.Namespace) -> FakeSheets:
+    return FakeSheets(
+        read_requests_per_minute=args.rpm,
+        write_requests_per_minute=args.rpm,
+        latency_ms=args.latency_ms,
+        bandwidth_mbps=args.bandwidth_mbps,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+def measure(fake: FakeSheets, rpm: int, fn) -> dict[str, Any]:
+    before = fake.summary()
+    start = time.perf_counter()
+    error = None
+    try:
+        fn()
+    except FakeHttpError as exc:
+        error = f"HTTP {exc.resp.status}: {exc.resp.reason}"
+    elapsed = time.perf_counter() - start
+    after = fake.summary()
+    requests_ = after["requests"] - before["requests"]
+    errors = {k: v - before["errors"].get(k, 0) for k, v in after["errors"].items() if v - before["errors"].get(k, 0)}
+    return {
+        "seconds": round(elapsed, 3),
+        "requests": requests_,
+        "bytes_sent": after["bytes_sent"] - before["bytes_sent"],
+        "bytes_received": after["bytes_received"] - before["bytes_received"],
+        "errors": errors,
+        # the fewest minutes this many calls take under the per-minute quota
+        "quota_minutes": round(requests_ / rpm, 2) if rpm > 0 else 0.0,
+        "error": error,
+    }
+
+
+def edit_rows(rows: list[list[str]], rate: float, seed: int) -> list[list[str]]:
+    rng = random.Random(seed)
+    edited = [rows[0]]
+    for row in rows[1:]:
+        if rng.random() < rate:
+            row = list(row)
+            row[rng.randrange(1, len(row))] = "edited"
+        edited.append(row)
+    return edited
+
+
+def main() -> None:
+    s.configure_stdio()
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark sheet write/read/in-place strategies against the in-process fake Sheets API."
+    )
+    parser.add_argument("--assets", type=int, default=20_000, help="Synthetic assets to flatten into rows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--metadata-keys", type=int, default=40)
+    parser.add_argument("--chunk-rows", default="1000,5000", help="max_chunk_rows values to try (comma-separated)")
+    parser.add_argument("--chunk-bytes", default="1000000,2000000,8000000", help="max_chunk_bytes values to try")
+    parser.add_argument("--concurrency", default="1,4", help="Writer/reader concurrency values to try")
+    parser.add_argument("--read-block-rows", default="1000,5000", help="TabReader block_rows values to try")
+    parser.add_argument("--edit-rate", type=float, default=0.01, help="Share of rows changed for the in-place run")
+    parser.add_argument("--rpm", type=int, default=300, help="Read and write requests per minute (0 = unlimited)")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Simulated round trip per request")
+    parser.add_argument("--bandwidth-mbps", type=float, default=50.0, help="Simulated upload bandwidth (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 503")
+    parser.add_argument("--backoff-base", type=float, default=2.0, help="Retry backoff base for the writer/reader")
+    parser.add_argument("--out", help="Results JSON (default: reports/bench_sheets_YYYYMMDD_HHMMSS.json)")
+    args = parser.parse_args()
+
+    assets = list(generate_assets(args.assets, seed=args.seed, metadata_keys=args.metadata_keys))
+    header = s.build_header(assets)
+    rows = s.flatten_assets(assets, header)
+    print(f"행 {len(rows) - 1}개 x 컬럼 {len(header)}개", file=sys.stderr)
+    retry_options = {"retries": 5, "backoff_base": args.backoff_base}
+
+    writes = []
+    for chunk_rows, chunk_bytes, concurrency in itertools.product(
+        parse_ints(args.chunk_rows), parse_ints(args.chunk_bytes), parse_ints(args.concurrency)
+    ):
+        fake = new_fake(args)
+        service = fake.service()
+        tab = s.ensure_tab(service, fake.spreadsheet_id, "bench")
+        result = measure(
+            fake,
+            args.rpm,
+            lambda: s.write_rows(
+                service,
+                fake.spreadsheet_id,
+                tab,
+                rows,
+                service_factory=fake.service,
+                concurrency=concurrency,
+                max_chunk_rows=chunk_rows,
+                max_chunk_bytes=chunk_bytes,
+                **retry_options,
+            ),
+        )
+        writes.append({"chunk_rows": chunk_rows, "chunk_bytes": chunk_bytes, "concurrency": concurrency, **result})
+
+    # reads and the in-place diff run against one fully written tab
+    fake = new_fake(args)
+    service = fake.service()
+    tab = s.ensure_tab(service, fake.spreadsheet_id, "bench")
+    setup = measure(
+        fake, args.rpm, lambda: s.write_rows(service, fake.spreadsheet_id, tab, rows, service_factory=fake.service, **retry_options)
+    )
+    read_matrix = [] if setup["error"] else itertools.product(parse_ints(args.read_block_rows), parse_ints(args.concurrency))
+    reads = []
+    for block_rows, concurrency in read_matrix:
+        result = measure(
+            fake,
+            args.rpm,
+            lambda: s.read_tab_values(
+                service,
+                fake.spreadsheet_id,
+                tab,
+                service_factory=fake.service,
+                concurrency=concurrency,
+                block_rows=block_rows,
+                **retry_options,
+            ),
+        )
+        reads.append({"block_rows": block_rows, "concurrency": concurrency, **result})
+
+    in_place = None
+    if not setup["error"]:
+        edited = edit_rows(rows, args.edit_rate, args.seed)
+        in_place = measure(
+            fake,
+            args.rpm,
+            lambda: s.update_in_place(service, fake.spreadsheet_id, tab, edited, service_factory=fake.service, **retry_options),
+        )
+
+    results = {
+        "timestamp": dt.datetime.now().isoformat(timespec="seconds"),
+        "rows": len(rows) - 1,
+        "columns": len(header),
+        "options": {k: v for k, v in vars(args).items() if k != "out"},
+        "write": writes,
+        "read": reads,
+        "update_in_place": in_place,
+    }
+    out = args.out or os.path.join("reports", f"bench_sheets_{dt.datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    def line(entry: dict) -> str:
+        text = (
+            f"{entry['seconds']:.2f}s, 요청 {entry['requests']}, 송신 {entry['bytes_sent'] / (1 << 20):.1f}MiB, "
+            f"수신 {entry['bytes_received'] / (1 << 20):.1f}MiB, 쿼터 최소 {entry['quota_minutes']}분"
+        )
+        if entry["errors"]:
+            text += f", 오류 {entry['errors']}"
+        if entry["error"]:
+            text += f", 실패: {entry['error']}"
+        return text
+
+    print("쓰기 (write_rows):")
+    for w in writes:
+        print(f"- rows {w['chunk_rows']}, bytes {w['chunk_bytes']}, 동시 {w['concurrency']}: {line(w)}")
+    if setup["error"]:
+        print(f"읽기/제자리 갱신 생략: 전체 탭을 쓰지 못했습니다 ({setup['error']})")
+    else:
+        print("읽기 (read_tab_values):")
+        for r in reads:
+            print(f"- block {r['block_rows']}, 동시 {r['concurrency']}: {line(r)}")
+        print(f"제자리 갱신 (update_in_place, 수정 {args.edit_rate:.1%}): {line(in_place)}")
+    print(f"결과: {out}")
+
+
+if __name__ == "__main__":
+    main()
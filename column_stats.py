@@ -0,0 +1,92 @@
+import heapq
+from itertools import repeat
+from typing import Iterable
+
+HASH_MIN = -(1 << 63)
+HASH_RANGE = 1 << 64
+SHEETS_CELL_LIMIT = 50_000
+
+
+class ColumnStats:
+    # Per-column fill count, distinct-value estimate, max length and multi-line
+    # count, updated one chunk of rows at a time. Work is done column-wise on
+    # each chunk so most of it stays in C (set(), max(map(len, ...))).
+    #
+    # Distinct values use a k-minimum-values sketch: exact below `sketch_size`
+    # distinct values, an estimate (a few % error) above it. Python's str hash
+    # is salted per process, so large estimates vary slightly between runs.
+    def __init__(self, header: list[str], sketch_size: int = 1024):
+        self.header = list(header)
+        self.sketch_size = sketch_size
+        self.rows = 0
+        width = len(self.header)
+        self.filled = [0] * width
+        self.max_length = [0] * width
+        self.multiline = [0] * width
+        self._sketch: list[set[int]] = [set() for _ in range(width)]
+        self._threshold = [(1 << 63) - 1] * width
+
+    def add_rows(self, rows: list[list[str]]) -> None:
+        if not rows:
+            return
+        self.rows += len(rows)
+        for idx, column in enumerate(zip(*rows)):
+            if idx >= len(self.header):
+                break
+            values = list(filter(None, column))
+            if not values:
+                continue
+            distinct = set(values)
+            # same rule as the old strip() check: whitespace-only counts as empty
+            if not all(map(str.strip, distinct)):
+                blank = {v for v in distinct if v.isspace()}
+                values = [v for v in values if v not in blank]
+                distinct -= blank
+                if not values:
+                    continue
+            self.filled[idx] += len(values)
+            longest = max(map(len, distinct))
+            if longest > self.max_length[idx]:
+                self.max_length[idx] = longest
+            if "\n" in "".join(distinct):
+                self.multiline[idx] += sum(map(str.__contains__, values, repeat("\n")))
+            self._update_sketch(idx, distinct)
+
+    def _update_sketch(self, idx: int, distinct: Iterable[str]) -> None:
+        # hashes are compared in Python's signed 64-bit range; filter() with a
+        # bound __gt__ keeps the per-value work in C
+        sketch = self._sketch[idx]
+        sketch.update(filter(self._threshold[idx].__gt__, map(hash, distinct)))
+        if len(sketch) > 2 * self.sketch_size:
+            sketch = set(heapq.nsmallest(self.sketch_size, sketch))
+            self._sketch[idx] = sketch
+            self._threshold[idx] = max(sketch)
+
+    def distinct_estimate(self, idx: int) -> int:
+        sketch = self._sketch[idx]
+        if len(sketch) < self.sketch_size:
+            return len(sketch)
+        kth = heapq.nsmallest(self.sketch_size, sketch)[-1]
+        return int((self.sketch_size - 1) * HASH_RANGE / (kth - HASH_MIN + 1))
+
+    def fill_counts(self) -> dict[str, int]:
+        return dict(zip(self.header, self.filled))
+
+    def oversized_columns(self, limit: int = SHEETS_CELL_LIMIT) -> list[tuple[str, int]]:
+        return [(col, n) for col, n in zip(self.header, self.max_length) if n > limit]
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "columns": [
+                {
+                    "name": col,
+                    "filled": self.filled[idx],
+                    "empty": self.rows - self.filled[idx],
+                    "distinct_estimate": self.distinct_estimate(idx),
+                    "max_length": self.max_length[idx],
+                    "multiline": self.multiline[idx],
+                }
+                for idx, col in enumerate(self.header)
+            ],
+        }
@@ -1,160 +1,322 @@
+import argparse
+import datetime as dt
 import json
 import os
 import sys
-import time
-from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 
-import requests
+from asset_io import NdjsonWriter, iter_ndjson, read_assets, write_assets
+from asset_store import AssetStore
+from iconik_client import IconikClient, iter_pages, load_dotenv, parse_page
+from metrics import METRICS, add_metrics_arguments, reporting
+from profiling import PROFILER, add_profile_arguments, profiling
 
 
-def load_dotenv(path: str = ".env") -> None:
+def fetch_detail(client: IconikClient, item: dict) -> dict:
+    asset_id = item.get("id")
+    if not asset_id:
+        return item
+    detail_data = client.get_json_cached(f"assets/v1/assets/{asset_id}/")
+    merged = dict(item)
+    if isinstance(detail_data, dict):
+        merged.update(detail_data)
+    return merged
+
+
+def fetch_details(
+    client: IconikClient,
+    items: list[dict],
+    executor: ThreadPoolExecutor | None = None,
+) -> list[dict]:
+    if executor is None:
+        return [fetch_detail(client, item) for item in items]
+    # executor.map yields results in submission order, so page order is preserved
+    return list(executor.map(lambda item: fetch_detail(client, item), items))
+
+
+def read_json_file(path: str) -> dict | None:
     if not os.path.exists(path):
-        return
+        return None
     with open(path, encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line or line.startswith("#") or "=" not in line:
-                continue
-            key, value = line.split("=", 1)
-            key = key.strip()
-            value = value.strip().strip('"').strip("'")
-            os.environ.setdefault(key, value)
-
-
-def require_env(name: str) -> str:
-    value = os.getenv(name)
-    if not value:
-        print(f"Missing env var: {name}", file=sys.stderr)
-        sys.exit(2)
-    return value
-
-
-def normalize_base_url(base_url: str) -> str:
-    normalized = (base_url or "").rstrip("/")
-    if not normalized.lower().endswith("/api"):
-        return normalized + "/API/"
-    return normalized + "/"
-
-
-def get_with_retries(
-    url: str,
-    headers: dict,
-    params: dict | None = None,
-    timeout: int = 60,
-    retries: int = 3,
-    backoff_base: float = 2.0,
-) -> requests.Response:
-    last_exc: Exception | None = None
-    for attempt in range(retries):
-        try:
-            resp = requests.get(url, headers=headers, params=params, timeout=timeout)
-            # Handle rate limiting / temporary errors
-            if resp.status_code in (429, 500, 502, 503, 504):
-                retry_after = resp.headers.get("Retry-After")
-                sleep_sec = float(retry_after) if retry_after and retry_after.isdigit() else backoff_base ** attempt
-                time.sleep(sleep_sec)
-                last_exc = RuntimeError(f"HTTP {resp.status_code}")
-                continue
-            return resp
-        except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectionError) as e:
-            last_exc = e
-            if attempt < retries - 1:
-                time.sleep(backoff_base ** attempt)
-                continue
-            raise
-    if last_exc:
-        raise last_exc
-    raise RuntimeError("Request failed without exception")
+        return json.load(f)
+
+
+def write_json_file(path: str, state: dict) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def parse_timestamp(value) -> dt.datetime | None:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        ts = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=dt.timezone.utc)
+
+
+def latest_modified(items: list[dict], current: str | None) -> str | None:
+    best, best_ts = current, parse_timestamp(current)
+    for item in items:
+        value = item.get("date_modified")
+        ts = parse_timestamp(value)
+        if ts is not None and (best_ts is None or ts > best_ts):
+            best, best_ts = value, ts
+    return best
+
+
+def fetch_modified_since(
+    fetch_page: Callable[[int], tuple[list[dict], int | None, str | None]],
+    per_page: int,
+    since: dt.datetime,
+) -> list[dict]:
+    # Pages are requested newest-first, so we can stop at the first page that
+    # reaches back past the watermark. If the server turns out not to honour the
+    # sort, keep scanning every page and just filter client-side.
+    changed: list[dict] = []
+    sorted_desc = True
+    for _, items in iter_pages(fetch_page, per_page):
+        stamps = [parse_timestamp(item.get("date_modified")) for item in items]
+        for item, ts in zip(items, stamps):
+            if ts is None or ts >= since:
+                changed.append(item)
+        known = [ts for ts in stamps if ts is not None]
+        if any(a < b for a, b in zip(known, known[1:])):
+            sorted_desc = False
+        if sorted_desc and known and known[-1] < since:
+            break
+    return changed
+
+
+def merge_by_id(existing: list[dict], changed: list[dict]) -> tuple[list[dict], int, int]:
+    updates = {str(item["id"]): item for item in changed if item.get("id")}
+    merged: list[dict] = []
+    replaced = 0
+    for asset in existing:
+        update = updates.pop(str(asset.get("id")), None)
+        if update is not None:
+            replaced += 1
+            merged.append(update)
+        else:
+            merged.append(asset)
+    merged.extend(updates.values())
+    return merged, replaced, len(updates)
 
 
 def main() -> None:
     load_dotenv()
+    parser = argparse.ArgumentParser(description="Export iconik assets to JSON / NDJSON.")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted export from its checkpoint instead of starting at page 1",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Fetch only assets modified since the stored date_modified watermark and merge them into the output by id",
+    )
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    METRICS.configure(args, "export")
+    PROFILER.start(
+        args,
+        "export",
+        hot=(IconikClient.request_with_retries, parse_page, fetch_detail, NdjsonWriter.write_page, latest_modified),
+    )
 
-    base_url = normalize_base_url(os.getenv("ICONIK_BASE_URL", "https://app.iconik.io/API/"))
-    headers = {
-        "App-ID": require_env("ICONIK_APP_ID"),
-        "Auth-Token": require_env("ICONIK_AUTH_TOKEN"),
-    }
+    client = IconikClient.from_env()
+    try:
+        export(args, client)
+    finally:
+        client.close()
 
+
+def export(args: argparse.Namespace, client: IconikClient) -> None:
     collection_id = os.getenv("ICONIK_COLLECTION_ID")
     per_page = int(os.getenv("ICONIK_PER_PAGE", "200"))
     limit = int(os.getenv("ICONIK_LIMIT", "0"))
     output_path = os.getenv("ICONIK_OUTPUT", "assets.json")
     detail_mode = os.getenv("ICONIK_DETAIL", "0").lower() in ("1", "true", "yes", "y")
-    timeout = int(os.getenv("ICONIK_TIMEOUT", "60"))
-    retries = int(os.getenv("ICONIK_RETRIES", "3"))
+    detail_concurrency = max(1, int(os.getenv("ICONIK_DETAIL_CONCURRENCY", "8")))
+    page_concurrency = max(1, int(os.getenv("ICONIK_PAGE_CONCURRENCY", "4")))
+    output_format = os.getenv("ICONIK_OUTPUT_FORMAT", "json").lower()
+    compression = os.getenv("ICONIK_OUTPUT_COMPRESSION", "auto").lower()
+    checkpoint_path = os.getenv("ICONIK_CHECKPOINT", output_path + ".checkpoint.json")
+    state_path = os.getenv("ICONIK_STATE", ".iconik_state.json")
+    sort_param = os.getenv("ICONIK_INCREMENTAL_SORT", "date_modified,desc")
+    store_path = os.getenv("ICONIK_STORE")
+
+    if output_format not in ("json", "ndjson"):
+        print(f"Unknown ICONIK_OUTPUT_FORMAT: {output_format} (expected json or ndjson)", file=sys.stderr)
+        sys.exit(2)
 
     if limit > 0:
         per_page = min(per_page, limit)
 
-    url = urljoin(base_url, "assets/v1/assets/")
-    page = 1
-    all_assets: list[dict] = []
-
-    while True:
-        if limit > 0:
-            remaining = limit - len(all_assets)
-            if remaining <= 0:
-                break
-            page_size = min(per_page, remaining)
-        else:
-            page_size = per_page
+    watermarks = (read_json_file(state_path) or {}).get("watermarks", {})
+    watermark_key = collection_id or "*"
+    watermark = watermarks.get(watermark_key) if args.incremental else None
+    since = parse_timestamp(watermark)
 
-        params = {"page": page, "per_page": page_size}
+    def fetch_page(page: int, sort: str | None = None) -> tuple[list[dict], int | None, str | None]:
+        params = {"page": page, "per_page": per_page}
         if collection_id:
             params["collection_id"] = collection_id
+        if sort:
+            params["sort"] = sort
+        return parse_page(client.get_json("assets/v1/assets/", params=params))
 
-        resp = get_with_retries(url, headers, params=params, timeout=timeout, retries=retries)
-        resp.raise_for_status()
-        data = resp.json()
+    def save_watermark(value: str | None) -> None:
+        if value:
+            watermarks[watermark_key] = value
+            write_json_file(state_path, {"watermarks": watermarks})
 
-        if isinstance(data, dict):
-            items = data.get("objects") or data.get("assets") or []
-            pages = data.get("pages")
-            next_url = data.get("next_url")
+    if since is not None and os.path.exists(output_path):
+        if args.resume:
+            print("--resume is only for full exports; an incremental run is restarted instead", file=sys.stderr)
+        with METRICS.phase("pages"):
+            changed = fetch_modified_since(lambda page: fetch_page(page, sort=sort_param), per_page, since)
+        if detail_mode and changed:
+            with METRICS.phase("details"), ThreadPoolExecutor(max_workers=detail_concurrency) as executor:
+                changed = fetch_details(client, changed, executor=executor)
+        with METRICS.phase("write"):
+            merged, replaced, added = merge_by_id(read_assets(output_path), changed)
+            if changed:
+                write_assets(output_path, merged, output_format, compression)
+                if store_path:
+                    with AssetStore(store_path) as store:
+                        store.upsert(changed)
+            save_watermark(latest_modified(changed, watermark))
+        METRICS.inc("assets_total", len(changed))
+        print(
+            f"Incremental export since {watermark}: {len(changed)} changed "
+            f"({replaced} updated, {added} new), {len(merged)} assets in {output_path}"
+        )
+        print(f"Rate limiter: {client.limiter.summary()}", file=sys.stderr)
+        if client.cache is not None:
+            print(f"Detail cache: {client.cache.summary()}", file=sys.stderr)
+        return
+
+    # Pages always land in an ndjson file first: the output itself for ndjson,
+    # a side file for json that is turned into the final document at the end.
+    if output_format == "ndjson":
+        partial_path = output_path
+    else:
+        partial_path = output_path + ".partial.ndjson"
+        compression = "none"
+
+    state = {
+        "collection_id": collection_id,
+        "per_page": per_page,
+        "detail": detail_mode,
+        "output": output_path,
+        "format": output_format,
+        "partial": partial_path,
+        "last_page": 0,
+        "bytes": 0,
+        "exported": 0,
+    }
+    seen_ids: set[str] = set()
+    start_page = 1
+
+    if args.resume:
+        saved = read_json_file(checkpoint_path)
+        if saved is None:
+            print(f"No checkpoint at {checkpoint_path}; starting from page 1", file=sys.stderr)
         else:
-            items = data or []
-            pages = None
-            next_url = None
+            for key in ("collection_id", "per_page", "detail", "format", "partial"):
+                if saved.get(key) != state[key]:
+                    print(
+                        f"Checkpoint {checkpoint_path} does not match this run ({key}: "
+                        f"{saved.get(key)!r} != {state[key]!r}); rerun without --resume to start over",
+                        file=sys.stderr,
+                    )
+                    sys.exit(2)
+            if not os.path.exists(partial_path):
+                print(f"Checkpoint output {partial_path} is missing; rerun without --resume", file=sys.stderr)
+                sys.exit(2)
+            state = saved
+            # drop anything written after the last recorded page (a page cut off mid-write)
+            with open(partial_path, "r+b") as f:
+                f.truncate(state["bytes"])
+            seen_ids = {str(a.get("id")) for a in iter_ndjson(partial_path) if a.get("id")}
+            start_page = state["last_page"] + 1
+            print(f"Resuming at page {start_page} ({state['exported']} assets already saved)", file=sys.stderr)
 
-        if not items:
-            break
+    exported = state["exported"]
+    high_water = state.get("high_water")
+    writer = NdjsonWriter(partial_path, compression=compression, append=start_page > 1)
+    store = AssetStore(store_path) if store_path else None
+    if store is not None and start_page == 1:
+        store.clear()  # a full export replaces the store; resumed pages are upserts
+    detail_executor = (
+        ThreadPoolExecutor(max_workers=detail_concurrency) if detail_mode and detail_concurrency > 1 else None
+    )
 
-        if detail_mode:
-            detailed_items: list[dict] = []
+    max_pages = -(-limit // per_page) if limit > 0 else 0
+    if limit > 0 and exported >= limit:
+        max_pages = start_page - 1  # a resumed run that already hit the limit only needs finalizing
+    pages = iter_pages(fetch_page, per_page, concurrency=page_concurrency, max_pages=max_pages, start_page=start_page)
+    try:
+        for page, items in METRICS.timed(pages, "pages"):
+            # listings can shift while we page, so an asset may show up twice
+            fresh: list[dict] = []
             for item in items:
                 asset_id = item.get("id")
-                if not asset_id:
-                    detailed_items.append(item)
-                    continue
-                detail_url = urljoin(base_url, f"assets/v1/assets/{asset_id}/")
-                d_resp = get_with_retries(detail_url, headers, timeout=timeout, retries=retries)
-                d_resp.raise_for_status()
-                detail_data = d_resp.json()
-                merged = dict(item)
-                if isinstance(detail_data, dict):
-                    merged.update(detail_data)
-                detailed_items.append(merged)
-            items = detailed_items
-
-        all_assets.extend(items)
-        if limit > 0 and len(all_assets) >= limit:
-            all_assets = all_assets[:limit]
-            break
+                if asset_id:
+                    if str(asset_id) in seen_ids:
+                        continue
+                    seen_ids.add(str(asset_id))
+                fresh.append(item)
+            items = fresh
+            if limit > 0:
+                items = items[: limit - exported]
+            if detail_mode:
+                with METRICS.phase("details"):
+                    items = fetch_details(client, items, executor=detail_executor)
 
-        if next_url or (pages and page < pages):
-            page += 1
-            continue
-        if pages is None and len(items) == per_page:
-            page += 1
-            continue
-        break
+            with METRICS.phase("write"):
+                writer.write_page(items)
+                if store is not None:
+                    store.upsert(items)
+                exported += len(items)
+                METRICS.inc("assets_total", len(items))
+                high_water = latest_modified(items, high_water)
+                state.update(last_page=page, bytes=writer.tell(), exported=exported, high_water=high_water)
+                write_json_file(checkpoint_path, state)
+            if limit > 0 and exported >= limit:
+                break
+    finally:
+        pages.close()  # stop the page look-ahead when the limit ends the loop early
+        if detail_executor is not None:
+            detail_executor.shutdown()
+        writer.close()
+        if store is not None:
+            store.close()
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(all_assets, f, ensure_ascii=False, indent=2)
+    if output_format == "json":
+        with METRICS.phase("finalize"):
+            all_assets = list(iter_ndjson(partial_path))
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(all_assets, f, ensure_ascii=False, indent=2)
+            os.remove(partial_path)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    if args.incremental and limit <= 0:
+        save_watermark(high_water)
 
-    print(f"Exported {len(all_assets)} assets to {output_path}")
+    print(f"Exported {exported} assets to {output_path}")
+    print(f"Rate limiter: {client.limiter.summary()}", file=sys.stderr)
+    if client.cache is not None:
+        print(f"Detail cache: {client.cache.summary()}", file=sys.stderr)
 
 
 if __name__ == "__main__":
-    main()
+    with reporting(), profiling():
+        main()
@@ -0,0 +1,540 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from types import SimpleNamespace
+from typing import Any, Callable
+
+# Limits of the live API that the sync/verify code has to stay inside.
+MAX_PAYLOAD_BYTES = 10 * 1024 * 1024
+MAX_SPREADSHEET_CELLS = 10_000_000
+MAX_CELL_CHARS = 50_000
+DEFAULT_ROWS = 1000
+DEFAULT_COLUMNS = 26
+
+CELL_RE = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+
+class FakeHttpError(Exception):
+    # Shaped like googleapiclient.errors.HttpError as far as this repo looks
+    # at it: the status is exc.resp.status and the JSON error is exc.content.
+    def __init__(self, status: int, message: str):
+        super().__init__(f"<HttpError {status}: {message}>")
+        self.resp = SimpleNamespace(status=status, reason=message)
+        self.content = json.dumps({"error": {"code": status, "message": message}}).encode("utf-8")
+
+
+def column_index(letters: str) -> int:
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + ord(ch) - ord("A") + 1
+    return n - 1
+
+
+def split_a1(a1: str) -> tuple[str, str]:
+    if a1.startswith("'"):
+        pos = 1
+        while True:
+            pos = a1.index("'", pos)
+            if a1[pos + 1 : pos + 2] != "'":
+                break
+            pos += 2
+        title = a1[1:pos].replace("''", "'")
+        rest = a1[pos + 1 :]
+        return title, rest[1:] if rest.startswith("!") else rest
+    title, _, ref = a1.partition("!")
+    return title, ref
+
+
+def parse_cell(ref: str) -> tuple[int | None, int | None]:
+    match = CELL_RE.match(ref)
+    if not match:
+        raise FakeHttpError(400, f"Unable to parse range: {ref}")
+    letters, digits = match.groups()
+    return (int(digits) - 1 if digits else None), (column_index(letters) if letters else None)
+
+
+def formatted(value: Any) -> str:
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return value if isinstance(value, str) else str(value)
+
+
+def trim_values(rows: list[list[Any]]) -> list[list[Any]]:
+    # values responses drop trailing empty cells and trailing empty rows
+    out = []
+    for row in rows:
+        last = len(row)
+        while last and row[last - 1] == "":
+            last -= 1
+        out.append(row[:last])
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+
+class FakeTab:
+    # Rows are replaced, never mutated in place, so a shallow copy of `rows`
+    # is enough to roll a failed batchUpdate back.
+    def __init__(self, sheet_id: int, title: str, index: int, rows: int = DEFAULT_ROWS, columns: int = DEFAULT_COLUMNS):
+        self.props = {
+            "sheetId": sheet_id,
+            "title": title,
+            "index": index,
+            "sheetType": "GRID",
+            "gridProperties": {"rowCount": rows, "columnCount": columns},
+        }
+        self.rows: list[list[Any]] = []
+        self.hidden_columns: set[int] = set()
+
+    @property
+    def row_count(self) -> int:
+        return self.props["gridProperties"]["rowCount"]
+
+    @property
+    def column_count(self) -> int:
+        return self.props["gridProperties"]["columnCount"]
+
+    def resolve(self, ref: str) -> tuple[int, int, int, int]:
+        # 0-based, end-exclusive (r0, c0, r1, c1); open ends run to the grid edge
+        start, _, end = ref.partition(":")
+        r0, c0 = parse_cell(start) if start else (None, None)
+        r1, c1 = parse_cell(end) if end else (r0, c0) if ref and ":" not in ref else (None, None)
+        r0, c0 = r0 or 0, c0 or 0
+        r1 = self.row_count if r1 is None else r1 + 1
+        c1 = self.column_count if c1 is None else c1 + 1
+        return r0, c0, r1, c1
+
+    def check_grid(self, a1: str, last_row: int, last_col: int) -> None:
+        if last_row > self.row_count or last_col > self.column_count:
+            raise FakeHttpError(
+                400,
+                f"Range ({a1}) exceeds grid limits. Max rows: {self.row_count}, max columns: {self.column_count}",
+            )
+
+    def last_data_row(self) -> int:
+        last = len(self.rows)
+        while last and not any(self.rows[last - 1]):
+            last -= 1
+        return last
+
+    def read(self, r0: int, c0: int, r1: int, c1: int) -> list[list[str]]:
+        return trim_values([row[c0:c1] for row in self.rows[r0:r1]])
+
+    def write(self, r0: int, c0: int, values: list[list[Any]]) -> int:
+        # cells are stored as their FORMATTED_VALUE strings; all-string rows
+        # (the RAW writes this repo makes) are copied without a per-cell pass
+        if len(self.rows) < r0 + len(values):
+            self.rows.extend([] for _ in range(r0 + len(values) - len(self.rows)))
+        written = 0
+        for offset, cells in enumerate(values):
+            row = list(self.rows[r0 + offset])
+            if len(row) < c0 + len(cells):
+                row.extend([""] * (c0 + len(cells) - len(row)))
+            try:
+                "".join(cells)
+            except TypeError:
+                for col, value in enumerate(cells, start=c0):
+                    if value is None:
+                        continue  # null leaves the cell as it is, like the live API
+                    row[col] = formatted(value)
+                    written += 1
+            else:
+                row[c0 : c0 + len(cells)] = cells
+                written += len(cells)
+            self.rows[r0 + offset] = row
+        return written
+
+
+class QuotaWindow:
+    # Requests allowed in any trailing `window` seconds.
+    def __init__(self, limit: int, window: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self._stamps: deque = deque()
+
+    def try_acquire(self) -> bool:
+        if self.limit <= 0:
+            return True
+        now = self.clock()
+        while self._stamps and self._stamps[0] <= now - self.window:
+            self._stamps.popleft()
+        if len(self._stamps) >= self.limit:
+            return False
+        self._stamps.append(now)
+        return True
+
+
+class FakeSheets:
+    # In-process stand-in for one Google spreadsheet behind the Sheets v4 API.
+    # service() returns an object with the discovery client's call shape
+    # (service.spreadsheets().values().batchGet(...).execute()), so it can be
+    # passed as `service` and `service.service` as `service_factory`.
+    #
+    # Enforced like the live API: request payload size (400), read and write
+    # requests per minute (429), the 10M-cell spreadsheet cap (400), grid
+    # bounds on values reads and updateCells (400) and 50k characters per cell
+    # (400). Values writes past the grid edge expand the grid instead, as the
+    # live API does (a fresh 1000-row tab takes a longer values.update); the
+    # added cells count toward the cap.
+    # batchUpdate applies all of its requests or none. latency_ms and
+    # bandwidth_mbps add a delay per call; error_rate injects seeded 503s.
+    def __init__(
+        self,
+        spreadsheet_id: str = "fake-spreadsheet",
+        tabs: tuple[str, ...] = ("Sheet1",),
+        *,
+        read_requests_per_minute: int = 300,
+        write_requests_per_minute: int = 300,
+        max_payload_bytes: int = MAX_PAYLOAD_BYTES,
+        max_cells: int = MAX_SPREADSHEET_CELLS,
+        latency_ms: float = 0.0,
+        bandwidth_mbps: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.spreadsheet_id = spreadsheet_id
+        self.max_payload_bytes = max_payload_bytes
+        self.max_cells = max_cells
+        self.latency_ms = latency_ms
+        self.bandwidth_mbps = bandwidth_mbps
+        self.error_rate = error_rate
+        self.read_quota = QuotaWindow(read_requests_per_minute, clock=clock)
+        self.write_quota = QuotaWindow(write_requests_per_minute, clock=clock)
+        self.tabs: list[FakeTab] = []
+        self.calls: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.cells_written = 0
+        self._rng = random.Random(seed)
+        self._next_sheet_id = 0
+        self._lock = threading.Lock()
+        for title in tabs:
+            self._add_tab({"title": title})
+
+    def service(self) -> "FakeSheetsService":
+        return FakeSheetsService(self)
+
+    def tab(self, title: str) -> FakeTab:
+        for tab in self.tabs:
+            if tab.props["title"] == title:
+                return tab
+        raise FakeHttpError(400, f"Unable to parse range: {title}")
+
+    def values(self, title: str) -> list[list[str]]:
+        tab = self.tab(title)
+        return tab.read(0, 0, tab.row_count, tab.column_count)
+
+    def total_cells(self) -> int:
+        return sum(t.row_count * t.column_count for t in self.tabs)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "requests": sum(self.calls.values()),
+                "errors": {str(k): v for k, v in sorted(self.errors.items())},
+                "bytes_sent": self.bytes_sent,
+                "bytes_received": self.bytes_received,
+                "cells_written": self.cells_written,
+                "grid_cells": self.total_cells(),
+            }
+
+    def call(self, method: str, write: bool, body: str, handler: Callable[[], dict], spreadsheet_id: str) -> dict:
+        sent = len(body.encode("utf-8"))
+        with self._lock:
+            self.calls[method] += 1
+            self.bytes_sent += sent
+            try:
+                if spreadsheet_id != self.spreadsheet_id:
+                    raise FakeHttpError(404, "Requested entity was not found.")
+                if sent > self.max_payload_bytes:
+                    raise FakeHttpError(400, f"Request payload size exceeds the limit: {self.max_payload_bytes} bytes.")
+                quota = self.write_quota if write else self.read_quota
+                if not quota.try_acquire():
+                    kind = "Write" if write else "Read"
+                    raise FakeHttpError(
+                        429,
+                        f"Quota exceeded for quota metric '{kind} requests' and limit "
+                        f"'{kind} requests per minute per user'",
+                    )
+                if self.error_rate and self._rng.random() < self.error_rate:
+                    raise FakeHttpError(503, "The service is currently unavailable.")
+            except FakeHttpError as exc:
+                self.errors[exc.resp.status] += 1
+                raise
+        delay = self.latency_ms / 1000
+        if self.bandwidth_mbps > 0:
+            delay += sent * 8 / (self.bandwidth_mbps * 1_000_000)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            try:
+                result = handler()
+            except FakeHttpError as exc:
+                self.errors[exc.resp.status] += 1
+                raise
+            if not write:
+                self.bytes_received += len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+            return result
+
+    # --- handlers, called with the lock held ---
+
+    def _metadata(self) -> dict:
+        return {
+            "spreadsheetId": self.spreadsheet_id,
+            "properties": {"title": self.spreadsheet_id},
+            "sheets": [
+                {"properties": json.loads(json.dumps(t.props))} for t in sorted(self.tabs, key=lambda t: t.props["index"])
+            ],
+        }
+
+    def _check_cells(self, extra: int = 0) -> None:
+        if self.total_cells() + extra > self.max_cells:
+            raise FakeHttpError(
+                400,
+                f"This action would increase the number of cells in the workbook above the limit of {self.max_cells} cells.",
+            )
+
+    def _add_tab(self, props: dict) -> dict:
+        title = props.get("title") or f"Sheet{len(self.tabs) + 1}"
+        if any(t.props["title"] == title for t in self.tabs):
+            raise FakeHttpError(400, f'Invalid requests[0].addSheet: A sheet with the name "{title}" already exists.')
+        grid = props.get("gridProperties") or {}
+        rows, cols = grid.get("rowCount", DEFAULT_ROWS), grid.get("columnCount", DEFAULT_COLUMNS)
+        self._check_cells(rows * cols)
+        sheet_id = props.get("sheetId", self._next_sheet_id)
+        self._next_sheet_id = max(self._next_sheet_id, sheet_id) + 1
+        tab = FakeTab(sheet_id, title, len(self.tabs), rows, cols)
+        self.tabs.append(tab)
+        return tab.props
+
+    def _tab_by_id(self, sheet_id: int) -> FakeTab:
+        for tab in self.tabs:
+            if tab.props["sheetId"] == sheet_id:
+                return tab
+        raise FakeHttpError(400, f"No grid with id: {sheet_id}")
+
+    def _batch_update(self, requests_: list[dict]) -> dict:
+        snapshot = [(t, dict(t.props), dict(t.props["gridProperties"]), list(t.rows), set(t.hidden_columns)) for t in self.tabs]
+        tabs, next_id, written = list(self.tabs), self._next_sheet_id, self.cells_written
+        try:
+            replies = [self._apply(n, req) for n, req in enumerate(requests_)]
+        except FakeHttpError:
+            self.tabs, self._next_sheet_id, self.cells_written = tabs, next_id, written
+            for tab, props, grid, rows, hidden in snapshot:
+                tab.props, tab.rows, tab.hidden_columns = props, rows, hidden
+                tab.props["gridProperties"] = grid
+            raise
+        return {"spreadsheetId": self.spreadsheet_id, "replies": replies}
+
+    def _apply(self, n: int, req: dict) -> dict:
+        (kind, spec), = req.items()
+        if kind == "addSheet":
+            return {"addSheet": {"properties": dict(self._add_tab(spec.get("properties") or {}))}}
+        if kind == "deleteSheet":
+            self.tabs.remove(self._tab_by_id(spec["sheetId"]))
+            return {}
+        if kind == "appendDimension":
+            tab = self._tab_by_id(spec["sheetId"])
+            length = spec["length"]
+            columns = spec["dimension"] == "COLUMNS"
+            self._check_cells(length * (tab.row_count if columns else tab.column_count))
+            tab.props["gridProperties"]["columnCount" if columns else "rowCount"] += length
+            return {}
+        if kind == "deleteDimension":
+            rng = spec["range"]
+            tab = self._tab_by_id(rng["sheetId"])
+            start, end = rng.get("startIndex", 0), rng.get("endIndex")
+            if rng["dimension"] == "ROWS":
+                end = tab.row_count if end is None else end
+                del tab.rows[start:end]
+                tab.props["gridProperties"]["rowCount"] -= end - start
+            else:
+                end = tab.column_count if end is None else end
+                tab.rows = [row[:start] + row[end:] for row in tab.rows]
+                tab.props["gridProperties"]["columnCount"] -= end - start
+            return {}
+        if kind == "updateDimensionProperties":
+            rng = spec["range"]
+            tab = self._tab_by_id(rng["sheetId"])
+            if rng["dimension"] == "COLUMNS" and "hiddenByUser" in spec.get("properties", {}):
+                cols = range(rng.get("startIndex", 0), rng.get("endIndex", tab.column_count))
+                if spec["properties"]["hiddenByUser"]:
+                    tab.hidden_columns.update(cols)
+                else:
+                    tab.hidden_columns.difference_update(cols)
+            return {}
+        if kind == "updateCells":
+            start = spec["start"]
+            tab = self._tab_by_id(start["sheetId"])
+            values = [[cell_value(c) for c in row.get("values", [])] for row in spec.get("rows", [])]
+            r0, c0 = start.get("rowIndex", 0), start.get("columnIndex", 0)
+            tab.check_grid(f"requests[{n}].updateCells", r0 + len(values), c0 + max(map(len, values), default=0))
+            self._write(tab, r0, c0, values)
+            return {}
+        if kind == "appendCells":
+            tab = self._tab_by_id(spec["sheetId"])
+            values = [[cell_value(c) for c in row.get("values", [])] for row in spec.get("rows", [])]
+            r0 = tab.last_data_row()
+            grow_rows = max(0, r0 + len(values) - tab.row_count)
+            grow_cols = max(0, max(map(len, values), default=0) - tab.column_count)
+            self._check_cells(grow_rows * tab.column_count + grow_cols * (tab.row_count + grow_rows))
+            tab.props["gridProperties"]["rowCount"] += grow_rows
+            tab.props["gridProperties"]["columnCount"] += grow_cols
+            self._write(tab, r0, 0, values)
+            return {}
+        if kind == "updateSheetProperties":
+            props = spec["properties"]
+            tab = self._tab_by_id(props["sheetId"])
+            grid = props.get("gridProperties") or {}
+            rows, cols = grid.get("rowCount", tab.row_count), grid.get("columnCount", tab.column_count)
+            self._check_cells(rows * cols - tab.row_count * tab.column_count)
+            if "title" in props:
+                tab.props["title"] = props["title"]
+            tab.props["gridProperties"].update(rowCount=rows, columnCount=cols)
+            del tab.rows[rows:]
+            return {}
+        raise FakeHttpError(400, f"Invalid requests[{n}]: {kind} is not supported by the fake")
+
+    def _write(self, tab: FakeTab, r0: int, c0: int, values: list[list[Any]]) -> None:
+        for row in values:
+            try:
+                fits = len("".join(row)) <= MAX_CELL_CHARS
+            except TypeError:
+                fits = False
+            if not fits and max((len(formatted(v)) for v in row if v is not None), default=0) > MAX_CELL_CHARS:
+                raise FakeHttpError(
+                    400, f"Your input contains more than the maximum of {MAX_CELL_CHARS} characters in a single cell."
+                )
+        self.cells_written += tab.write(r0, c0, values)
+
+    def _values_get(self, a1: str) -> dict:
+        title, ref = split_a1(a1)
+        tab = self.tab(title)
+        r0, c0, r1, c1 = tab.resolve(ref)
+        tab.check_grid(a1, r1, c1)
+        values = tab.read(r0, c0, r1, c1)
+        out = {"range": a1, "majorDimension": "ROWS"}
+        if values:
+            out["values"] = values
+        return out
+
+    def _values_update(self, data: list[dict]) -> dict:
+        # every range is checked, and the grid grown, before anything is written
+        planned = []
+        grown: dict[int, tuple[FakeTab, int, int]] = {}
+        for item in data:
+            title, ref = split_a1(item["range"])
+            tab = self.tab(title)
+            r0, c0, _, _ = tab.resolve(ref)
+            values = item.get("values") or []
+            _, rows, cols = grown.get(id(tab), (tab, tab.row_count, tab.column_count))
+            rows = max(rows, r0 + len(values))
+            cols = max(cols, c0 + max(map(len, values), default=0))
+            grown[id(tab)] = (tab, rows, cols)
+            planned.append((tab, r0, c0, values))
+        self._check_cells(sum(rows * cols - tab.row_count * tab.column_count for tab, rows, cols in grown.values()))
+        for tab, rows, cols in grown.values():
+            tab.props["gridProperties"].update(rowCount=rows, columnCount=cols)
+        before = self.cells_written
+        for tab, r0, c0, values in planned:
+            self._write(tab, r0, c0, values)
+        return {
+            "spreadsheetId": self.spreadsheet_id,
+            "totalUpdatedRows": sum(len(v) for _, _, _, v in planned),
+            "totalUpdatedCells": self.cells_written - before,
+        }
+
+
+def cell_value(cell: dict) -> Any:
+    entered = cell.get("userEnteredValue") or {}
+    for key in ("stringValue", "numberValue", "boolValue", "formulaValue"):
+        if key in entered:
+            return entered[key]
+    return ""
+
+
+class FakeRequest:
+    def __init__(self, sheets: FakeSheets, method: str, write: bool, spreadsheet_id: str, payload: dict, handler):
+        self._sheets = sheets
+        self._method = method
+        self._write = write
+        self._spreadsheet_id = spreadsheet_id
+        self._handler = handler
+        # same attributes as googleapiclient's HttpRequest
+        self.methodId = f"sheets.spreadsheets.{method}"
+        self.body = json.dumps(payload, ensure_ascii=False)
+
+    def execute(self, num_retries: int = 0, **kwargs) -> dict:
+        return self._sheets.call(self._method, self._write, self.body, self._handler, self._spreadsheet_id)
+
+
+class FakeValues:
+    def __init__(self, sheets: FakeSheets):
+        self._sheets = sheets
+
+    def _request(self, method: str, write: bool, spreadsheet_id: str, payload: dict, handler) -> FakeRequest:
+        return FakeRequest(self._sheets, f"values.{method}", write, spreadsheet_id, payload, handler)
+
+    def get(self, spreadsheetId: str, range: str, **params) -> FakeRequest:
+        return self._request("get", False, spreadsheetId, {"range": range, **params}, lambda: self._sheets._values_get(range))
+
+    def batchGet(self, spreadsheetId: str, ranges: list[str] | str, **params) -> FakeRequest:
+        ranges = [ranges] if isinstance(ranges, str) else list(ranges)
+
+        def handler() -> dict:
+            return {
+                "spreadsheetId": spreadsheetId,
+                "valueRanges": [self._sheets._values_get(r) for r in ranges],
+            }
+
+        return self._request("batchGet", False, spreadsheetId, {"ranges": ranges, **params}, handler)
+
+    def update(self, spreadsheetId: str, range: str, body: dict, **params) -> FakeRequest:
+        data = [{"range": range, "values": body.get("values") or []}]
+        return self._request("update", True, spreadsheetId, {"range": range, "body": body, **params}, lambda: self._sheets._values_update(data))
+
+    def batchUpdate(self, spreadsheetId: str, body: dict) -> FakeRequest:
+        return self._request("batchUpdate", True, spreadsheetId, body, lambda: self._sheets._values_update(body.get("data") or []))
+
+    def clear(self, spreadsheetId: str, range: str, body: dict | None = None) -> FakeRequest:
+        def handler() -> dict:
+            title, ref = split_a1(range)
+            tab = self._sheets.tab(title)
+            r0, c0, r1, c1 = tab.resolve(ref)
+            tab.write(r0, c0, [[""] * (c1 - c0) for _ in range(max(0, min(r1, len(tab.rows)) - r0))])
+            return {"spreadsheetId": spreadsheetId, "clearedRange": range}
+
+        return self._request("clear", True, spreadsheetId, {"range": range}, handler)
+
+
+class FakeSpreadsheets:
+    def __init__(self, sheets: FakeSheets):
+        self._sheets = sheets
+
+    def get(self, spreadsheetId: str, **params) -> FakeRequest:
+        return FakeRequest(self._sheets, "get", False, spreadsheetId, params, self._sheets._metadata)
+
+    def batchUpdate(self, spreadsheetId: str, body: dict) -> FakeRequest:
+        return FakeRequest(
+            self._sheets, "batchUpdate", True, spreadsheetId, body, lambda: self._sheets._batch_update(body.get("requests") or [])
+        )
+
+    def values(self) -> FakeValues:
+        return FakeValues(self._sheets)
+
+
+class FakeSheetsService:
+    def __init__(self, sheets: FakeSheets):
+        self._sheets = sheets
+
+    def spreadsheets(self) -> FakeSpreadsheets:
+        return FakeSpreadsheets(self._sheets)
@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+import time
+import zlib
+from typing import NamedTuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access);
+"""
+
+
+class CachedResponse(NamedTuple):
+    etag: str | None
+    last_modified: str | None
+    body: bytes
+
+
+class ResponseCache:
+    # On-disk store of validated GET bodies keyed by URL. Bodies are zlib-compressed
+    # and the least recently used entries are evicted once max_bytes is exceeded.
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        (self.total_bytes,) = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def get(self, url: str) -> CachedResponse | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(row[0], row[1], zlib.decompress(row[2]))
+
+    def record_hit(self, url: str) -> None:
+        with self._lock, self.conn:
+            self.hits += 1
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+
+    def put(self, url: str, etag: str | None, last_modified: str | None, body: bytes) -> None:
+        packed = zlib.compress(body)
+        with self._lock, self.conn:
+            old = self.conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, packed, len(packed), time.time()),
+            )
+            self.total_bytes += len(packed)
+            self.stores += 1
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # drop least recently used entries down to 90% so we don't evict on every put
+        target = int(self.max_bytes * 0.9)
+        rows = self.conn.execute("SELECT url, size FROM responses ORDER BY last_access")
+        doomed: list[tuple[str]] = []
+        for url, size in rows:
+            if self.total_bytes <= target:
+                break
+            doomed.append((url,))
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM responses WHERE url = ?", doomed)
+        self.evictions += len(doomed)
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits} revalidated (304), {self.stores} stored, {self.evictions} evicted, "
+            f"{self.total_bytes / (1024 * 1024):.1f} MiB on disk"
+        )
@@ -0,0 +1,345 @@
+import email.utils
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import ResponseCache
+from metrics import METRICS
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+# longest Retry-After honoured: the pause stops every worker
+MAX_RETRY_AFTER = 120.0
+
+
+def load_dotenv(path: str = ".env") -> None:
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            key = key.strip()
+            value = value.strip().strip('"').strip("'")
+            os.environ.setdefault(key, value)
+
+
+def require_env(name: str) -> str:
+    value = os.getenv(name)
+    if not value:
+        print(f"Missing env var: {name}", file=sys.stderr)
+        sys.exit(2)
+    return value
+
+
+def normalize_base_url(base_url: str) -> str:
+    normalized = (base_url or "").rstrip("/")
+    if not normalized.lower().endswith("/api"):
+        return normalized + "/API/"
+    return normalized + "/"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    # Retry-After is either delta-seconds or an HTTP-date (RFC 9110 10.2.3)
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when is None:
+            return None
+        seconds = when.timestamp() - time.time()
+    if not math.isfinite(seconds):
+        return None
+    return min(MAX_RETRY_AFTER, max(0.0, seconds))
+
+
+class RateLimiter:
+    # Process-wide token bucket shared by every worker thread. A 429/503 halves
+    # the rate, and one with Retry-After also pauses all callers until it has
+    # passed; each success then adds back a slice of max_rps until the ceiling
+    # is reached again.
+    def __init__(self, max_rps: float = 0.0, min_rps: float = 0.5, ramp_fraction: float = 0.05):
+        self.max_rps = max_rps
+        self.min_rps = min(min_rps, max_rps) if max_rps > 0 else min_rps
+        self.ramp_fraction = ramp_fraction
+        self.rate = max_rps
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.throttled_seconds = 0.0
+        self.backoffs = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.rate <= 0:
+                    break
+                else:
+                    self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.last_refill) * self.rate)
+                    self.last_refill = now
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        break
+                    delay = (1.0 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+        if waited:
+            with self._lock:
+                self.throttled_seconds += waited
+            METRICS.inc("rate_limit_wait_seconds_total", waited, service="iconik")
+
+    def backoff(self, pause: float | None = None) -> None:
+        with self._lock:
+            self.backoffs += 1
+            if pause is not None:
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            if self.max_rps > 0:
+                self.rate = max(self.min_rps, self.rate / 2)
+                self.tokens = 0.0
+
+    def on_success(self) -> None:
+        if self.max_rps <= 0 or self.rate >= self.max_rps:
+            return
+        with self._lock:
+            self.rate = min(self.max_rps, self.rate + self.max_rps * self.ramp_fraction)
+
+    def summary(self) -> str:
+        return f"throttled {self.throttled_seconds:.1f}s (summed over workers), {self.backoffs} backoff(s)"
+
+
+class IconikClient:
+    # One keep-alive Session per process: every page and detail call reuses pooled
+    # TCP/TLS connections instead of paying a new handshake per request.
+    def __init__(
+        self,
+        base_url: str,
+        app_id: str,
+        auth_token: str,
+        timeout: int = 60,
+        retries: int = 3,
+        backoff_base: float = 2.0,
+        pool_size: int = 16,
+        limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+    ):
+        self.base_url = normalize_base_url(base_url)
+        self.limiter = limiter or RateLimiter()
+        self.cache = cache
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "App-ID": app_id,
+                "Auth-Token": auth_token,
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+            }
+        )
+
+    @classmethod
+    def from_env(cls) -> "IconikClient":
+        cache_path = os.getenv("ICONIK_CACHE")
+        cache = None
+        if cache_path:
+            cache = ResponseCache(cache_path, max_bytes=int(float(os.getenv("ICONIK_CACHE_MAX_MB", "512")) * 1024 * 1024))
+        return cls(
+            os.getenv("ICONIK_BASE_URL", "https://app.iconik.io/API/"),
+            require_env("ICONIK_APP_ID"),
+            require_env("ICONIK_AUTH_TOKEN"),
+            timeout=int(os.getenv("ICONIK_TIMEOUT", "60")),
+            retries=int(os.getenv("ICONIK_RETRIES", "3")),
+            pool_size=int(os.getenv("ICONIK_POOL_SIZE", "16")),
+            limiter=RateLimiter(max_rps=float(os.getenv("ICONIK_MAX_RPS", "20"))),
+            cache=cache,
+        )
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self) -> "IconikClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def url(self, path: str) -> str:
+        return urljoin(self.base_url, path)
+
+    def get_with_retries(
+        self,
+        url: str,
+        params: dict | None = None,
+        headers: dict | None = None,
+    ) -> requests.Response:
+        return self.request_with_retries("GET", url, params=params, headers=headers)
+
+    def request_with_retries(
+        self,
+        method: str,
+        url: str,
+        params: dict | None = None,
+        headers: dict | None = None,
+        json_body=None,
+    ) -> requests.Response:
+        # Only for idempotent calls (GET, and PATCH/PUT that set fields to values).
+        last_exc: Exception | None = None
+        for attempt in range(self.retries):
+            self.limiter.acquire()
+            try:
+                resp = self.session.request(
+                    method, url, params=params, headers=headers, json=json_body, timeout=self.timeout
+                )
+                METRICS.inc("http_requests_total", service="iconik", method=method, status=resp.status_code)
+                METRICS.inc("http_bytes_sent_total", len(resp.request.body or b""), service="iconik")
+                # Handle rate limiting / temporary errors
+                if resp.status_code in RETRY_STATUSES:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    sleep_sec = retry_after if retry_after is not None else self.backoff_base ** attempt
+                    resp.close()
+                    last_exc = RuntimeError(f"HTTP {resp.status_code}")
+                    if attempt < self.retries - 1:
+                        METRICS.inc("http_retries_total", service="iconik", reason=resp.status_code)
+                    if resp.status_code in THROTTLE_STATUSES:
+                        # every worker waits out the server's Retry-After in acquire();
+                        # without one only this worker backs off, at the lowered rate
+                        self.limiter.backoff(retry_after)
+                        if retry_after is not None:
+                            continue
+                    METRICS.inc("retry_sleep_seconds_total", sleep_sec, service="iconik")
+                    time.sleep(sleep_sec)
+                    continue
+                # wire size when the server sent one (the body may be gzipped)
+                METRICS.inc(
+                    "http_bytes_received_total",
+                    int(resp.headers.get("Content-Length") or len(resp.content)),
+                    service="iconik",
+                )
+                self.limiter.on_success()
+                return resp
+            except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectionError) as e:
+                last_exc = e
+                if attempt < self.retries - 1:
+                    METRICS.inc("http_retries_total", service="iconik", reason="connection")
+                    METRICS.inc("retry_sleep_seconds_total", self.backoff_base ** attempt, service="iconik")
+                    time.sleep(self.backoff_base ** attempt)
+                    continue
+                raise
+        if last_exc:
+            raise last_exc
+        raise RuntimeError("Request failed without exception")
+
+    def get_json(self, path: str, params: dict | None = None):
+        resp = self.get_with_retries(self.url(path), params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_json_cached(self, path: str):
+        # Conditional GET: a 304 reuses the cached body without downloading it again.
+        if self.cache is None:
+            return self.get_json(path)
+        url = self.url(path)
+        cached = self.cache.get(url)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        resp = self.get_with_retries(url, headers=headers)
+        if resp.status_code == 304 and cached is not None:
+            self.cache.record_hit(url)
+            return json.loads(cached.body)
+        resp.raise_for_status()
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            self.cache.put(url, etag, last_modified, resp.content)
+        return resp.json()
+
+
+def parse_page(data, key: str = "assets") -> tuple[list[dict], int | None, str | None]:
+    if isinstance(data, dict):
+        items = data.get("objects") or data.get(key) or []
+        return items, data.get("pages"), data.get("next_url")
+    return data or [], None, None
+
+
+def iter_pages(
+    fetch_page: Callable[[int], tuple[list[dict], int | None, str | None]],
+    per_page: int,
+    concurrency: int = 1,
+    max_pages: int = 0,
+    start_page: int = 1,
+) -> Iterator[tuple[int, list[dict]]]:
+    # Page 1 tells us `pages`; when present the rest are fetched in parallel and
+    # yielded in page order, otherwise fall back to next_url / full-page checks.
+    page = start_page
+    if 0 < max_pages < page:
+        return
+    items, pages, next_url = fetch_page(page)
+    if not items:
+        return
+    yield page, items
+
+    if pages and concurrency > 1:
+        last_page = pages if max_pages <= 0 else min(pages, max_pages)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        pending: deque = deque()
+        next_page = page + 1
+        try:
+            while next_page <= last_page or pending:
+                while next_page <= last_page and len(pending) < concurrency:
+                    pending.append((next_page, executor.submit(fetch_page, next_page)))
+                    next_page += 1
+                page, fut = pending.popleft()
+                items = fut.result()[0]
+                if not items:
+                    return
+                yield page, items
+        finally:
+            # an empty page, an error or a consumer that stops early (--limit)
+            # drops the look-ahead: queued pages are cancelled and requests
+            # already on the wire finish in the background, unread
+            executor.shutdown(wait=False, cancel_futures=True)
+        return
+
+    while max_pages <= 0 or page < max_pages:
+        has_more = bool(next_url) or bool(pages and page < pages) or (pages is None and len(items) == per_page)
+        if not has_more:
+            return
+        page += 1
+        items, pages, next_url = fetch_page(page)
+        if not items:
+            return
+        yield page, items
@@ -0,0 +1,120 @@
+import argparse
+import datetime as dt
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from asset_io import read_assets
+from mock_iconik_server import add_mock_arguments, server_from_args
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TARGETS = {"export": "export_assets.py", "collections": "list_collections.py"}
+
+
+def exporter_env(args: argparse.Namespace, base_url: str, output_path: str) -> dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("ICONIK_")}
+    env.update(
+        {
+            "ICONIK_BASE_URL": base_url,
+            "ICONIK_APP_ID": "load-test",
+            "ICONIK_AUTH_TOKEN": "load-test",
+            "ICONIK_OUTPUT": output_path,
+            "ICONIK_OUTPUT_FORMAT": "ndjson",
+            "ICONIK_PER_PAGE": str(args.per_page),
+            "ICONIK_PAGE_CONCURRENCY": str(args.page_concurrency),
+            "ICONIK_DETAIL": "1" if args.detail else "0",
+            "ICONIK_DETAIL_CONCURRENCY": str(args.detail_concurrency),
+            "ICONIK_MAX_RPS": str(args.client_max_rps),
+            "ICONIK_RETRIES": str(args.client_retries),
+        }
+    )
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key.strip()] = value
+    return env
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run export_assets.py or list_collections.py against the local mock iconik server and report throughput."
+    )
+    add_mock_arguments(parser)
+    parser.add_argument("--target", choices=sorted(TARGETS), default="export")
+    parser.add_argument("--per-page", type=int, default=200)
+    parser.add_argument("--page-concurrency", type=int, default=4)
+    parser.add_argument("--detail", action="store_true", help="Run the exporter with ICONIK_DETAIL=1")
+    parser.add_argument("--detail-concurrency", type=int, default=8)
+    parser.add_argument("--client-max-rps", type=float, default=0.0, help="ICONIK_MAX_RPS for the exporter (0 = unlimited)")
+    parser.add_argument("--client-retries", type=int, default=5, help="ICONIK_RETRIES for the exporter")
+    parser.add_argument("--env", action="append", default=[], help="Extra KEY=VALUE for the exporter (repeatable)")
+    parser.add_argument("--out", help="Results JSON (default: reports/loadtest_YYYYMMDD_HHMMSS.json)")
+    args = parser.parse_args()
+
+    print(f"모의 서버 준비 중 (에셋 {args.assets}개)...", file=sys.stderr)
+    server = server_from_args(args)
+    expected_ids = {a["id"] for a in server.data.assets}
+    expected_count = len(expected_ids) if args.target == "export" else len(server.data.collections)
+
+    with server, tempfile.TemporaryDirectory(prefix="iconik_load_") as tmp:
+        output_path = os.path.join(tmp, "assets.ndjson")
+        env = exporter_env(args, server.base_url, output_path)
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, os.path.join(HERE, TARGETS[args.target])],
+            cwd=tmp,  # keeps the repo's .env out of the run
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if args.target == "export":
+            ids = [a.get("id") for a in read_assets(output_path)] if os.path.exists(output_path) else []
+            received = len(ids)
+            complete = len(ids) == len(set(ids)) and set(ids) == expected_ids
+        else:
+            try:
+                received = len(json.loads(proc.stdout))
+            except ValueError:
+                received = 0
+            complete = received == expected_count
+    server_stats = server.stats.to_dict()
+    retried = sum(n for code, n in server_stats["statuses"].items() if code in ("429", "500", "502", "503", "504"))
+
+    results = {
+        "timestamp": dt.datetime.now().isoformat(timespec="seconds"),
+        "target": args.target,
+        "exit_code": proc.returncode,
+        "seconds": round(elapsed, 3),
+        "expected": expected_count,
+        "received": received,
+        "complete": complete,
+        "items_per_second": round(received / elapsed, 1) if elapsed > 0 else 0.0,
+        "retried_requests": retried + server_stats["dropped"],
+        "server": server_stats,
+        "client_stderr": proc.stderr.strip().splitlines()[-5:],
+        "options": {k: v for k, v in vars(args).items() if k != "out"},
+    }
+
+    out = args.out or os.path.join("reports", f"loadtest_{dt.datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    latency = server_stats["latency_ms"]
+    print(f"대상: {TARGETS[args.target]} (종료 코드 {proc.returncode})")
+    print(f"- 소요: {elapsed:.2f}s, 수신 {received}/{expected_count} ({results['items_per_second']}/s)")
+    print(f"- 완전성(중복/누락 없음): {'예' if complete else '아니오'}")
+    print(f"- 요청: {server_stats['requests']}, 상태별 {server_stats['statuses']}, 연결 끊김 {server_stats['dropped']}")
+    print(f"- 재시도된 요청(429/5xx/끊김): {results['retried_requests']}")
+    print(f"- 서버 지연 p50 {latency['p50']}ms, p95 {latency['p95']}ms, p99 {latency['p99']}ms, max {latency['max']}ms")
+    for line in results["client_stderr"]:
+        print(f"  | {line}")
+    print(f"결과: {out}")
+    sys.exit(0 if proc.returncode == 0 and complete else 1)
+
+
+if __name__ == "__main__":
+    main()
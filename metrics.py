@@ -0,0 +1,208 @@
+import argparse
+import datetime as dt
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+PROMETHEUS_PREFIX = "iconik_"
+
+
+class Metrics:
+    # Process-wide phase timers and counters. A phase records wall time on the
+    # thread that enters it; nested phases are exclusive (the outer clock stops
+    # while an inner phase runs), so the main thread's phases add up to the run
+    # and whatever is left over is reported as "other". Counters carry labels
+    # and are safe to bump from worker threads.
+    def __init__(self):
+        self.entry = "main"
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.options: argparse.Namespace | None = None
+        self.phases: dict[str, list[float]] = {}
+        self.counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def configure(self, args: argparse.Namespace, entry: str) -> None:
+        self.entry = entry
+        self.options = args
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+
+    def _stack(self) -> list[list]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, name: str) -> None:
+        stack = self._stack()
+        now = time.perf_counter()
+        if stack:
+            stack[-1][2] += now - stack[-1][1]
+        stack.append([name, now, 0.0])
+
+    def _exit(self) -> None:
+        stack = self._stack()
+        now = time.perf_counter()
+        name, start, elapsed = stack.pop()
+        self.add_phase(name, elapsed + now - start)
+        if stack:
+            stack[-1][1] = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def timed(self, items: Iterable[T], name: str) -> Iterator[T]:
+        # Charges the time spent producing each item (not consuming it) to `name`;
+        # meant for coarse items such as pages, chunks or row blocks.
+        it = iter(items)
+        while True:
+            self._enter(name)
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            yield item
+
+    def add_phase(self, name: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            entry = self.phases.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self, success: bool = True) -> dict:
+        seconds = time.perf_counter() - self.started
+        with self._lock:
+            phases = {name: {"seconds": round(s, 4), "calls": n} for name, (s, n) in self.phases.items()}
+            counters = [
+                {"name": name, "labels": dict(labels), "value": round(value, 4) if isinstance(value, float) else value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+        other = seconds - sum(p["seconds"] for p in phases.values())
+        if phases and other > 0:
+            phases["other"] = {"seconds": round(other, 4), "calls": 1}
+        return {
+            "entry": self.entry,
+            "started_at": dt.datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "seconds": round(seconds, 4),
+            "success": success,
+            "phases": phases,
+            "counters": counters,
+        }
+
+    def summary_lines(self, snap: dict) -> list[str]:
+        lines = [f"[metrics] {snap['entry']}: {snap['seconds']:.2f}s ({'ok' if snap['success'] else 'failed'})"]
+        for name, phase in sorted(snap["phases"].items(), key=lambda kv: -kv[1]["seconds"]):
+            share = phase["seconds"] / snap["seconds"] if snap["seconds"] else 0.0
+            lines.append(f"- phase {name}: {phase['seconds']:.2f}s ({share:.0%}, {phase['calls']} calls)")
+        for counter in snap["counters"]:
+            labels = ",".join(f"{k}={v}" for k, v in counter["labels"].items())
+            lines.append(f"- {counter['name']}{{{labels}}}: {counter['value']}")
+        return lines
+
+    def to_prometheus(self, snap: dict) -> str:
+        entry = {"entry": snap["entry"]}
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: list[tuple[dict, float]]) -> None:
+            full = PROMETHEUS_PREFIX + name
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            for labels, value in samples:
+                text = ",".join(f'{k}="{escape_label(str(v))}"' for k, v in {**entry, **labels}.items())
+                lines.append(f"{full}{{{text}}} {value}")
+
+        family("run_seconds", "gauge", "Wall time of the last run.", [({}, snap["seconds"])])
+        family("run_success", "gauge", "1 if the last run finished without an error.", [({}, int(snap["success"]))])
+        family("run_timestamp_seconds", "gauge", "Start time of the last run.", [({}, round(self.started_at, 3))])
+        phases = sorted(snap["phases"].items())
+        family("phase_seconds", "gauge", "Wall time per phase in the last run.", [({"phase": n}, p["seconds"]) for n, p in phases])
+        family("phase_calls", "gauge", "Times each phase was entered in the last run.", [({"phase": n}, p["calls"]) for n, p in phases])
+        by_name: dict[str, list[tuple[dict, float]]] = {}
+        for counter in snap["counters"]:
+            by_name.setdefault(counter["name"], []).append((counter["labels"], counter["value"]))
+        # counters restart at zero every run, so they go out as gauges of the last
+        # run without the _total suffix: read as Prometheus counters they would
+        # reset on every run. run_timestamp_seconds tells the runs apart.
+        for name, samples in by_name.items():
+            name = name.removesuffix("_total")
+            family(name, "gauge", f"{name.replace('_', ' ')} in the last run (per-run value).", samples)
+        return "\n".join(lines) + "\n"
+
+    def emit(self, success: bool = True) -> None:
+        args = self.options
+        if args is None:
+            return
+        snap = self.snapshot(success)
+        if args.metrics:
+            print("\n".join(self.summary_lines(snap)), file=sys.stderr)
+        if args.metrics_json:
+            write_atomic(args.metrics_json, json.dumps(snap, ensure_ascii=False, indent=2) + "\n")
+        if args.metrics_prom:
+            write_atomic(args.metrics_prom, self.to_prometheus(snap))
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_atomic(path: str, text: str) -> None:
+    # the node exporter textfile collector may read at any moment
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+METRICS = Metrics()
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        default=os.getenv("ICONIK_METRICS", "0").lower() in ("1", "true", "yes", "y"),
+        help="Print per-phase timings, request/retry counts and bytes to stderr at exit",
+    )
+    parser.add_argument("--metrics-json", default=os.getenv("ICONIK_METRICS_JSON"), help="Write the metrics as JSON")
+    parser.add_argument(
+        "--metrics-prom",
+        default=os.getenv("ICONIK_METRICS_PROM"),
+        help="Write the last run's metrics as Prometheus gauges (node exporter textfile collector)",
+    )
+
+
+@contextmanager
+def reporting() -> Iterator[None]:
+    # Wraps an entry point's main() so the metrics are written however it
+    # exits, sys.exit() included; main() calls METRICS.configure() once its
+    # arguments are parsed.
+    success = False
+    try:
+        yield
+        success = True
+    except SystemExit as exc:
+        success = exc.code in (None, 0)
+        raise
+    finally:
+        METRICS.emit(success)
@@ -0,0 +1,335 @@
+import argparse
+import datetime as dt
+import gzip
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from synthetic_assets import generate_assets
+
+MAX_PER_PAGE = 500
+
+
+class FaultPlan:
+    # Decides, per request, how long to stall and whether to fail. Draws come
+    # from one seeded RNG, so a single-threaded client sees the same sequence
+    # every run. A 5xx starts a burst: the next `burst - 1` requests fail too.
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_429: float = 0.0,
+        retry_after: float = 1.0,
+        rate_5xx: float = 0.0,
+        burst: int = 1,
+        drop_rate: float = 0.0,
+        max_rps: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.rate_5xx = rate_5xx
+        self.burst = max(1, burst)
+        self.drop_rate = drop_rate
+        self.max_rps = max_rps
+        self._rng = random.Random(seed)
+        self._burst_left = 0
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def decide(self) -> tuple[str | None, float]:
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            if self.max_rps > 0:
+                now = time.monotonic()
+                self._tokens = min(max(1.0, self.max_rps), self._tokens + (now - self._last_refill) * self.max_rps)
+                self._last_refill = now
+                if self._tokens < 1.0:
+                    return "429", delay
+                self._tokens -= 1.0
+            if self._burst_left > 0:
+                self._burst_left -= 1
+                return "5xx", delay
+            roll = self._rng.random()
+            if roll < self.drop_rate:
+                return "drop", delay
+            roll -= self.drop_rate
+            if roll < self.rate_429:
+                return "429", delay
+            roll -= self.rate_429
+            if roll < self.rate_5xx:
+                self._burst_left = self.burst - 1
+                return "5xx", delay
+            return None, delay
+
+
+class ServerStats:
+    def __init__(self):
+        self.requests = 0
+        self.statuses: Counter = Counter()
+        self.dropped = 0
+        self.latencies: list[float] = []
+        self._lock = threading.Lock()
+
+    def record(self, status: int | None, seconds: float) -> None:
+        with self._lock:
+            self.requests += 1
+            if status is None:
+                self.dropped += 1
+            else:
+                self.statuses[status] += 1
+            self.latencies.append(seconds)
+
+    def percentile(self, pct: float) -> float:
+        with self._lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            statuses = {str(k): v for k, v in sorted(self.statuses.items())}
+            requests, dropped = self.requests, self.dropped
+        return {
+            "requests": requests,
+            "statuses": statuses,
+            "dropped": dropped,
+            "latency_ms": {
+                name: round(self.percentile(pct) * 1000, 2) for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+            },
+        }
+
+
+class MockIconikData:
+    # Seeded assets and collections in listing order. Assets are spread over
+    # the collections and get date_modified stamps in random order, so the
+    # collection_id filter and the incremental date_modified sort both work.
+    def __init__(self, asset_count: int, collection_count: int = 20, seed: int = 0, **asset_options):
+        rng = random.Random(seed)
+        base = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+        self.collections = [
+            {
+                "id": f"{n:08x}-0000-4000-8000-{rng.getrandbits(48):012x}",
+                "name": f"Collection {n}",
+                "is_root": n < 3,
+                "date_modified": (base + dt.timedelta(hours=n)).isoformat(),
+            }
+            for n in range(max(1, collection_count))
+        ]
+        self.assets = list(generate_assets(asset_count, seed=seed, **asset_options))
+        offsets = list(range(len(self.assets)))
+        rng.shuffle(offsets)
+        for asset, offset in zip(self.assets, offsets):
+            asset["date_modified"] = (base + dt.timedelta(seconds=30 * offset)).isoformat()
+            asset["collection_id"] = rng.choice(self.collections)["id"]
+        self.by_id = {asset["id"]: asset for asset in self.assets}
+        self._listings: dict[tuple, list[dict]] = {}
+        self._lock = threading.Lock()
+
+    def listing(self, collection_id: str | None, sort: str | None) -> list[dict]:
+        key = (collection_id, sort)
+        with self._lock:
+            items = self._listings.get(key)
+            if items is None:
+                items = [a for a in self.assets if not collection_id or a["collection_id"] == collection_id]
+                if sort:
+                    field, _, direction = sort.partition(",")
+                    items = sorted(items, key=lambda a: str(a.get(field) or ""), reverse=direction == "desc")
+                self._listings[key] = items
+        return items
+
+
+def page_body(items: list[dict], path: str, query: dict[str, str], page: int, per_page: int) -> dict:
+    pages = max(1, -(-len(items) // per_page))
+
+    def page_url(n: int) -> str:
+        return f"{path}?{urlencode({**query, 'page': n, 'per_page': per_page})}"
+
+    start = (page - 1) * per_page
+    return {
+        "objects": items[start : start + per_page],
+        "page": page,
+        "pages": pages,
+        "per_page": per_page,
+        "total": len(items),
+        "first_url": page_url(1),
+        "last_url": page_url(pages),
+        "prev_url": page_url(page - 1) if page > 1 else None,
+        "next_url": page_url(page + 1) if page < pages else None,
+    }
+
+
+class MockIconikHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockIconikServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        started = time.perf_counter()
+        action, delay = self.server.faults.decide()
+        if delay:
+            time.sleep(delay)
+        status = None
+        if action == "drop":
+            # no response at all; the client sees the connection reset mid-request
+            self.close_connection = True
+        elif action == "429":
+            status = self.send_json(429, {"errors": ["Too many requests"]}, {"Retry-After": f"{self.server.faults.retry_after:g}"})
+        elif action == "5xx":
+            status = self.send_json(503, {"errors": ["Service unavailable"]})
+        else:
+            status = self.route()
+        self.server.stats.record(status, time.perf_counter() - started)
+
+    def route(self) -> int:
+        if not (self.headers.get("App-ID") and self.headers.get("Auth-Token")):
+            return self.send_json(401, {"errors": ["Missing App-ID or Auth-Token"]})
+        parts = urlsplit(self.path)
+        path = parts.path
+        if path.lower().startswith("/api/"):
+            path = path[4:]
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        data = self.server.data
+        if path == "/assets/v1/assets/":
+            items = data.listing(query.get("collection_id"), query.get("sort"))
+            return self.send_page(items, parts.path, query)
+        if path == "/assets/v1/collections/":
+            return self.send_page(data.collections, parts.path, query)
+        if path.startswith("/assets/v1/assets/") and path.endswith("/") and path.count("/") == 5:
+            asset = data.by_id.get(path.split("/")[4])
+            if asset is None:
+                return self.send_json(404, {"errors": ["Asset not found"]})
+            etag = '"' + hashlib.sha1(f"{asset['id']}:{asset['date_modified']}".encode()).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                return self.send_json(304, None, {"ETag": etag})
+            return self.send_json(200, asset, {"ETag": etag})
+        return self.send_json(404, {"errors": [f"Unknown path {path}"]})
+
+    def send_page(self, items: list[dict], path: str, query: dict[str, str]) -> int:
+        try:
+            page = max(1, int(query.pop("page", "1")))
+            per_page = min(MAX_PER_PAGE, max(1, int(query.pop("per_page", "10"))))
+        except ValueError:
+            return self.send_json(400, {"errors": ["page and per_page must be integers"]})
+        return self.send_json(200, page_body(items, path, query, page, per_page))
+
+    def send_json(self, status: int, body: Any, headers: dict[str, str] | None = None) -> int:
+        payload = b"" if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if payload:
+            self.send_header("Content-Type", "application/json")
+            if self.server.gzip and len(payload) > 1024 and "gzip" in self.headers.get("Accept-Encoding", ""):
+                payload = gzip.compress(payload, compresslevel=1)
+                self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        return status
+
+
+class MockIconikServer(ThreadingHTTPServer):
+    # Local stand-in for the iconik endpoints the exporters call. Use as a
+    # context manager to serve from a background thread.
+    daemon_threads = True
+
+    def __init__(
+        self,
+        data: MockIconikData,
+        faults: FaultPlan | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        gzip: bool = True,
+        verbose: bool = False,
+    ):
+        super().__init__((host, port), MockIconikHandler)
+        self.data = data
+        self.faults = faults or FaultPlan()
+        self.stats = ServerStats()
+        self.gzip = gzip
+        self.verbose = verbose
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/API/"
+
+    def __enter__(self) -> "MockIconikServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--assets", type=int, default=10_000, help="Number of synthetic assets to serve")
+    parser.add_argument("--collections", type=int, default=20, help="Number of collections to serve")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--metadata-keys", type=int, default=40, help="Distinct metadata keys across all assets")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the latency")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Share of requests that start a 503 burst")
+    parser.add_argument("--burst", type=int, default=1, help="Consecutive 503 responses per burst")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Share of requests whose connection is closed")
+    parser.add_argument("--max-rps", type=float, default=0.0, help="Server-side rate limit; excess requests get 429")
+    parser.add_argument("--no-gzip", dest="gzip", action="store_false", help="Never gzip responses")
+
+
+def server_from_args(args: argparse.Namespace, host: str = "127.0.0.1", port: int = 0) -> MockIconikServer:
+    data = MockIconikData(args.assets, args.collections, seed=args.seed, metadata_keys=args.metadata_keys)
+    faults = FaultPlan(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        rate_5xx=args.rate_5xx,
+        burst=args.burst,
+        drop_rate=args.drop_rate,
+        max_rps=args.max_rps,
+        seed=args.seed,
+    )
+    return MockIconikServer(data, faults, host=host, port=port, gzip=args.gzip, verbose=getattr(args, "verbose", False))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve seeded synthetic iconik assets/collections for local testing.")
+    add_mock_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = server_from_args(args, host=args.host, port=args.port)
+    print(f"ICONIK_BASE_URL={server.base_url} (any ICONIK_APP_ID/ICONIK_AUTH_TOKEN)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats.to_dict(), indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import argparse
+import cProfile
+import datetime as dt
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+
+class Profiler:
+    # cProfile plus tracemalloc for one run of an entry point. cProfile only
+    # sees the thread that started it: work on pool threads shows up as the
+    # main thread waiting on futures and process-pool workers not at all, so
+    # profile with --workers 1 / concurrency 1 to charge CPU to the hot paths.
+    # By the time main() returns its data is gone, so a sampler thread keeps a
+    # tracemalloc snapshot from near the traced-memory high point instead.
+    def __init__(self):
+        self.profile: cProfile.Profile | None = None
+        self.entry = "main"
+        self.out_dir = "reports"
+        self.top = 30
+        self.hot: list[Callable] = []
+        self.started = 0.0
+        self.snapshot: tracemalloc.Snapshot | None = None
+        self.snapshot_bytes = 0
+        self._done = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    def start(self, args: argparse.Namespace, entry: str, hot: Iterable[Callable] = ()) -> None:
+        if not args.profile:
+            return
+        self.entry = entry
+        self.out_dir = args.profile_dir
+        self.top = max(1, args.profile_top)
+        self.hot = list(hot)
+        tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self._sampler.start()
+        self.started = time.perf_counter()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self) -> None:
+        if self.profile is None:
+            return
+        self.profile.disable()
+        seconds = time.perf_counter() - self.started
+        self._done.set()
+        self._sampler.join()
+        if self.snapshot is None:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_bytes = tracemalloc.get_traced_memory()[0]
+        snapshot = self.snapshot
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        base = os.path.join(self.out_dir, f"profile_{self.entry}_{dt.datetime.now():%Y%m%d_%H%M%S}")
+        os.makedirs(self.out_dir or ".", exist_ok=True)
+        self.profile.dump_stats(base + ".prof")
+        stats = pstats.Stats(self.profile)
+        lines = [
+            f"Profile of {self.entry}: {seconds:.2f}s wall, main thread only",
+            f"Traced memory: peak {peak / (1 << 20):.1f} MiB",
+            f"CPU profile: {base}.prof (python -m pstats)",
+            "",
+        ]
+        lines += self.hot_lines(stats)
+        for title, sort in (("Top by cumulative time", "cumulative"), ("Top by own time", "tottime")):
+            out = io.StringIO()
+            pstats.Stats(self.profile, stream=out).strip_dirs().sort_stats(sort).print_stats(self.top)
+            lines += ["", f"{title}:", out.getvalue().strip("\n")]
+        lines += ["", f"Top allocations at {self.snapshot_bytes / (1 << 20):.1f} MiB traced (by line):"]
+        lines += allocation_lines(snapshot, self.top)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self.profile = None
+        print(f"Profile: {base}.txt, {base}.prof", file=sys.stderr)
+
+    def _sample(self) -> None:
+        while not self._done.wait(0.1):
+            current = tracemalloc.get_traced_memory()[0]
+            if current > self.snapshot_bytes * 1.1:
+                self.snapshot = tracemalloc.take_snapshot()
+                self.snapshot_bytes = current
+
+    def hot_lines(self, stats: pstats.Stats) -> list[str]:
+        total = stats.total_tt or 1.0
+        lines = ["Hot functions:"]
+        for fn in self.hot:
+            code = fn.__code__
+            key = (code.co_filename, code.co_firstlineno, code.co_name)
+            name = fn.__qualname__
+            if key not in stats.stats:
+                lines.append(f"- {name}: not called on the main thread")
+                continue
+            _, calls, own, cumulative, _ = stats.stats[key]
+            per_call = cumulative / calls * 1e6 if calls else 0.0
+            lines.append(
+                f"- {name}: {calls} calls, own {own:.3f}s ({own / total:.0%}), "
+                f"cumulative {cumulative:.3f}s, {per_call:.1f}us per call"
+            )
+        return lines
+
+
+def allocation_lines(snapshot: tracemalloc.Snapshot, top: int) -> list[str]:
+    snapshot = snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+    )
+    lines = []
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        lines.append(f"- {stat.size / 1024:.1f} KiB in {stat.count} blocks: {frame.filename}:{frame.lineno}")
+    return lines
+
+
+PROFILER = Profiler()
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=os.getenv("ICONIK_PROFILE", "0").lower() in ("1", "true", "yes", "y"),
+        help="Write a cProfile dump and a CPU/allocation report for this run (slows the run down)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=os.getenv("ICONIK_PROFILE_DIR", "reports"),
+        help="Where to write profile_<entry>_YYYYMMDD_HHMMSS.prof/.txt",
+    )
+    parser.add_argument("--profile-top", type=int, default=30, help="Functions and allocation sites to list")
+
+
+@contextmanager
+def profiling() -> Iterator[None]:
+    # Like metrics.reporting(): main() starts the profiler once its arguments
+    # are parsed and the report is written however main() exits.
+    try:
+        yield
+    finally:
+        PROFILER.stop()
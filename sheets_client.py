@@ -0,0 +1,119 @@
+import json
+from types import SimpleNamespace
+from typing import Any
+from urllib.parse import quote
+
+API_ROOT = "https://sheets.googleapis.com/v4/spreadsheets"
+
+
+class SheetsHttpError(Exception):
+    # Carries resp.status / resp.reason / content like googleapiclient's
+    # HttpError, which is all http_status() and the retry loops look at.
+    def __init__(self, status: int, reason: str, content: bytes, method_id: str):
+        self.resp = SimpleNamespace(status=status, reason=reason)
+        self.content = content
+        message = reason
+        try:
+            message = json.loads(content)["error"]["message"]
+        except (ValueError, KeyError, TypeError):
+            pass
+        super().__init__(f"HTTP {status} from {method_id}: {message}")
+
+
+class SheetsRequest:
+    # Built by the resource methods and sent on execute(), like a
+    # googleapiclient HttpRequest; methodId and body feed the run metrics.
+    def __init__(
+        self,
+        service: "SheetsService",
+        method_id: str,
+        http_method: str,
+        path: str,
+        params: dict[str, Any],
+        body: dict | None = None,
+    ):
+        self.service = service
+        self.methodId = f"sheets.spreadsheets.{method_id}"
+        self.http_method = http_method
+        self.uri = API_ROOT + path
+        self.params = {k: encode_param(v) for k, v in params.items() if v is not None}
+        self.body = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+
+    def execute(self) -> dict:
+        return self.service.send(self)
+
+
+def encode_param(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def spreadsheet_path(spreadsheet_id: str) -> str:
+    return "/" + quote(spreadsheet_id, safe="")
+
+
+class SheetsService:
+    # Just the Sheets v4 calls these scripts make, with the same
+    # service.spreadsheets().values().batchGet(...).execute() shape as the
+    # discovery client but without fetching or building a discovery document.
+    # The HTTP session is not shared across threads: use one service per thread.
+    def __init__(self, credentials, timeout: float = 60.0):
+        # google.auth's transport pulls in requests; only sheet runs pay for it
+        from google.auth.transport.requests import AuthorizedSession
+
+        self.session = AuthorizedSession(credentials)
+        self.timeout = timeout
+
+    def spreadsheets(self) -> "Spreadsheets":
+        return Spreadsheets(self)
+
+    def send(self, request: SheetsRequest) -> dict:
+        headers = {"Content-Type": "application/json; charset=utf-8"} if request.body is not None else None
+        resp = self.session.request(
+            request.http_method,
+            request.uri,
+            params=request.params,
+            data=request.body,
+            headers=headers,
+            timeout=self.timeout,
+        )
+        if resp.status_code >= 400:
+            raise SheetsHttpError(resp.status_code, resp.reason, resp.content, request.methodId)
+        return resp.json() if resp.content else {}
+
+
+class Spreadsheets:
+    def __init__(self, service: SheetsService):
+        self.service = service
+
+    def get(self, spreadsheetId: str, **params) -> SheetsRequest:
+        return SheetsRequest(self.service, "get", "GET", spreadsheet_path(spreadsheetId), params)
+
+    def batchUpdate(self, spreadsheetId: str, body: dict) -> SheetsRequest:
+        path = spreadsheet_path(spreadsheetId) + ":batchUpdate"
+        return SheetsRequest(self.service, "batchUpdate", "POST", path, {}, body)
+
+    def values(self) -> "Values":
+        return Values(self.service)
+
+
+class Values:
+    def __init__(self, service: SheetsService):
+        self.service = service
+
+    def get(self, spreadsheetId: str, range: str, **params) -> SheetsRequest:
+        path = f"{spreadsheet_path(spreadsheetId)}/values/{quote(range, safe='')}"
+        return SheetsRequest(self.service, "values.get", "GET", path, params)
+
+    def update(self, spreadsheetId: str, range: str, body: dict, **params) -> SheetsRequest:
+        path = f"{spreadsheet_path(spreadsheetId)}/values/{quote(range, safe='')}"
+        return SheetsRequest(self.service, "values.update", "PUT", path, params, body)
+
+    def batchGet(self, spreadsheetId: str, ranges: list[str] | str, **params) -> SheetsRequest:
+        path = spreadsheet_path(spreadsheetId) + "/values:batchGet"
+        return SheetsRequest(self.service, "values.batchGet", "GET", path, {"ranges": ranges, **params})
+
+    def batchUpdate(self, spreadsheetId: str, body: dict) -> SheetsRequest:
+        path = spreadsheet_path(spreadsheetId) + "/values:batchUpdate"
+        return SheetsRequest(self.service, "values.batchUpdate", "POST", path, {}, body)
@@ -1,15 +1,25 @@
 import argparse
 import csv
 import datetime as dt
+import hashlib
 import io
 import json
+import multiprocessing as mp
 import os
 import sys
-from typing import Any, Iterable
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
 
-from google.oauth2 import service_account
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from asset_io import iter_assets, read_assets
+from asset_store import AssetStore, parse_where
+from column_stats import SHEETS_CELL_LIMIT, ColumnStats
+from metrics import METRICS, add_metrics_arguments, reporting
+from profiling import PROFILER, add_profile_arguments, profiling
+from sheets_client import SheetsService
 
 
 BASE_HEADER = [
@@ -50,6 +60,18 @@ BASE_HEADER = [
     "All-in",
 ]
 
+# Columns filled from the asset itself rather than its metadata.
+BASE_FIELDS = (
+    "id",
+    "title",
+    "time_start_ms",
+    "time_end_ms",
+    "time_start_S",
+    "time_end_S",
+    "ProjectNameTag",
+    "SearchTag",
+)
+
 
 def load_dotenv(path: str = ".env") -> None:
     if not os.path.exists(path):
@@ -74,15 +96,19 @@ def configure_stdio() -> None:
                 pass
 
 
+# json.dumps builds a fresh encoder per call once any option is passed
+_cell_json = json.JSONEncoder(ensure_ascii=False).encode
+
+
 def normalize_cell_value(value: Any) -> str:
     if value is None:
         return ""
     if isinstance(value, list):
         if all(not isinstance(v, (dict, list)) for v in value):
             return "\n".join(str(v) for v in value if v is not None).strip()
-        return json.dumps(value, ensure_ascii=False)
+        return _cell_json(value)
     if isinstance(value, dict):
-        return json.dumps(value, ensure_ascii=False)
+        return _cell_json(value)
     return str(value).strip()
 
 
@@ -96,63 +122,263 @@ def build_header(assets: Iterable[dict]) -> list[str]:
             if isinstance(key, str) and key:
                 metadata_keys.add(key)
 
+    return header_from_metadata_keys(metadata_keys)
+
+
+def header_from_metadata_keys(metadata_keys: Iterable[str]) -> list[str]:
     base = list(BASE_HEADER)
     base_set = set(base)
     extra = sorted(k for k in metadata_keys if k not in base_set)
     return base + extra
 
 
+def ms_to_s(ms: Any) -> str:
+    if isinstance(ms, (int, float)):
+        return str(ms / 1000)
+    return ""
+
+
+class RowBuilder:
+    # Column layout is worked out once per header: base columns get fixed
+    # positions and metadata keys map straight to their indices, so building a
+    # row is one preallocated list plus a pass over the asset's own metadata.
+    def __init__(self, header: list[str]):
+        self.header = list(header)
+        self.width = len(self.header)
+        positions: dict[str, list[int]] = {}
+        for idx, key in enumerate(self.header):
+            positions.setdefault(key, []).append(idx)
+        base = {key: tuple(positions.pop(key, ())) for key in BASE_FIELDS}
+        self.id_cols = base["id"]
+        self.title_cols = base["title"]
+        self.start_ms_cols = base["time_start_ms"]
+        self.end_ms_cols = base["time_end_ms"]
+        self.start_s_cols = base["time_start_S"]
+        self.end_s_cols = base["time_end_S"]
+        self.blank_cols = base["ProjectNameTag"] + base["SearchTag"]
+        self.metadata_index = {key: idxs[0] for key, idxs in positions.items()}
+        # a header that repeats a metadata key gets the value copied after the fill
+        self.metadata_copies = [(idxs[0], idx) for idxs in positions.values() for idx in idxs[1:]]
+
+    def __call__(self, asset: dict) -> list[str]:
+        row = [""] * self.width
+        md = asset.get("metadata")
+        if md and isinstance(md, dict):
+            index = self.metadata_index
+            for key, value in md.items():
+                idx = index.get(key)
+                if idx is None:
+                    continue
+                kind = type(value)
+                if kind is str:
+                    row[idx] = value.strip()
+                    continue
+                if kind is list:
+                    # iconik metadata values are usually lists of strings
+                    try:
+                        row[idx] = "\n".join(value).strip()
+                        continue
+                    except TypeError:
+                        pass
+                row[idx] = normalize_cell_value(value)
+            for src, dst in self.metadata_copies:
+                row[dst] = row[src]
+
+        # base fields win over metadata keys of the same name
+        if self.id_cols:
+            cell = str(asset.get("id") or "")
+            for idx in self.id_cols:
+                row[idx] = cell
+        if self.title_cols:
+            cell = str(asset.get("title") or asset.get("name") or "")
+            for idx in self.title_cols:
+                row[idx] = cell
+        if self.start_ms_cols or self.start_s_cols:
+            ms = asset.get("time_start_milliseconds")
+            for idx in self.start_ms_cols:
+                row[idx] = str(ms or "")
+            for idx in self.start_s_cols:
+                row[idx] = ms_to_s(ms)
+        if self.end_ms_cols or self.end_s_cols:
+            ms = asset.get("time_end_milliseconds")
+            for idx in self.end_ms_cols:
+                row[idx] = str(ms or "")
+            for idx in self.end_s_cols:
+                row[idx] = ms_to_s(ms)
+        for idx in self.blank_cols:
+            row[idx] = ""
+        return row
+
+    def rows(self, assets: Iterable[dict]) -> Iterator[list[str]]:
+        for asset in assets:
+            yield self(asset)
+
+
 def asset_to_row(asset: dict, header: list[str]) -> list[str]:
-    md = asset.get("metadata") or {}
-    if not isinstance(md, dict):
-        md = {}
+    return RowBuilder(header)(asset)
 
-    time_start_ms = asset.get("time_start_milliseconds")
-    time_end_ms = asset.get("time_end_milliseconds")
 
-    def ms_to_s(ms: Any) -> str:
-        if isinstance(ms, (int, float)):
-            return str(ms / 1000)
-        return ""
+# Per-process state for the flattening pool. With the fork start method the
+# workers inherit the parent's asset list and only receive index ranges, so
+# assets are never pickled; elsewhere each chunk is sent to the worker.
+_worker_row_builder: RowBuilder | None = None
+_worker_assets: list[dict] = []
 
-    row: dict[str, str] = {
-        "id": str(asset.get("id") or ""),
-        "title": str(asset.get("title") or asset.get("name") or ""),
-        "time_start_ms": str(time_start_ms or ""),
-        "time_end_ms": str(time_end_ms or ""),
-        "time_start_S": ms_to_s(time_start_ms),
-        "time_end_S": ms_to_s(time_end_ms),
-        "ProjectNameTag": "",
-        "SearchTag": "",
-    }
 
-    for key in header:
-        if key in row:
-            continue
-        if key in md:
-            row[key] = normalize_cell_value(md.get(key))
-        else:
-            row[key] = ""
+def _init_row_worker(header: list[str]) -> None:
+    global _worker_row_builder
+    _worker_row_builder = RowBuilder(header)
+
+
+def _build_rows(chunk: list[dict] | tuple[int, int]) -> list[list[str]]:
+    if isinstance(chunk, tuple):
+        chunk = _worker_assets[chunk[0] : chunk[1]]
+    return [_worker_row_builder(asset) for asset in chunk]
+
+
+# --workers 0 only starts the pool for inputs at least this large. Serial
+# flatten runs ~14us per asset and a forked pool starts in ~0.07s, but the
+# parent still unpickles every row (~4us per asset), so below this the most a
+# pool can save is a second or two.
+FLATTEN_POOL_MIN_ASSETS = 200_000
 
-    return [row.get(col, "") for col in header]
 
+def can_fork_pool() -> bool:
+    # fork hands the asset list to the workers for free, but forking a process
+    # that already runs threads (profiler sampler, Sheets pools) can leave the
+    # children stuck on locks they inherited
+    return "fork" in mp.get_all_start_methods() and threading.active_count() == 1
 
-def flatten_assets(assets: Iterable[dict], header: list[str]) -> list[list[str]]:
+
+def auto_flatten_workers(asset_count: int) -> int:
+    # Without fork the assets are pickled to the workers, and that plus reading
+    # the rows back costs the parent nearly as much as flattening serially.
+    cpus = os.cpu_count() or 1
+    if cpus < 2 or asset_count < FLATTEN_POOL_MIN_ASSETS or not can_fork_pool():
+        return 1
+    return cpus
+
+
+def flatten_assets(
+    assets: Iterable[dict],
+    header: list[str],
+    workers: int = 1,
+    chunk_rows: int = 5000,
+    stats: ColumnStats | None = None,
+) -> list[list[str]]:
     rows = [header]
-    for asset in assets:
-        rows.append(asset_to_row(asset, header))
+    if workers <= 1:
+        if stats is None:
+            rows.extend(RowBuilder(header).rows(assets))
+            return rows
+        for chunk in iter_row_chunks(assets, header, chunk_rows):
+            rows.extend(chunk)
+            stats.add_rows(chunk)
+        return rows
+
+    global _worker_assets
+    assets = assets if isinstance(assets, list) else list(assets)
+    # with other threads running the workers start clean and get their chunks pickled
+    if can_fork_pool():
+        context = mp.get_context("fork")
+        _worker_assets = assets
+        tasks = ((start, start + chunk_rows) for start in range(0, len(assets), chunk_rows))
+    else:
+        context = mp.get_context("forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn")
+        tasks = (assets[start : start + chunk_rows] for start in range(0, len(assets), chunk_rows))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_row_worker, initargs=(header,)
+        ) as pool:
+            # results are collected in submission order with a bounded window in flight
+            pending: deque = deque()
+            for task in tasks:
+                if len(pending) >= workers * 2:
+                    chunk = pending.popleft().result()
+                    rows.extend(chunk)
+                    if stats is not None:
+                        stats.add_rows(chunk)
+                pending.append(pool.submit(_build_rows, task))
+            while pending:
+                chunk = pending.popleft().result()
+                rows.extend(chunk)
+                if stats is not None:
+                    stats.add_rows(chunk)
+    finally:
+        _worker_assets = []
     return rows
 
 
+def iter_row_chunks(assets: Iterable[dict], header: list[str], chunk_rows: int) -> Iterator[list[list[str]]]:
+    build_row = RowBuilder(header)
+    chunk: list[list[str]] = []
+    for asset in assets:
+        chunk.append(build_row(asset))
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 def load_assets(json_path: str) -> list[dict]:
-    with open(json_path, encoding="utf-8") as f:
-        data = json.load(f)
-    if isinstance(data, list):
-        return [d for d in data if isinstance(d, dict)]
-    if isinstance(data, dict):
-        items = data.get("objects") or data.get("assets") or []
-        return [d for d in items if isinstance(d, dict)]
-    return []
+    return read_assets(json_path)
+
+
+def add_source_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--json", default=os.getenv("ICONIK_JSON", "assets_test.json"), help="Path to assets JSON")
+    parser.add_argument(
+        "--store",
+        default=os.getenv("ICONIK_STORE"),
+        help="Read assets from this SQLite asset store instead of --json",
+    )
+    parser.add_argument("--ids", help="Comma-separated asset ids to include (requires --store)")
+    parser.add_argument(
+        "--where",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Only assets whose metadata KEY equals (or contains) VALUE; repeatable (requires --store)",
+    )
+
+
+def source_filters(args: argparse.Namespace) -> tuple[list[str] | None, dict[str, str]]:
+    ids = [i.strip() for i in args.ids.split(",") if i.strip()] if args.ids else None
+    where = parse_where(args.where)
+    if not args.store and (ids is not None or where):
+        print("--ids/--where require --store.", file=sys.stderr)
+        sys.exit(2)
+    return ids, where
+
+
+def load_source(args: argparse.Namespace) -> tuple[list[dict], list[str]]:
+    ids, where = source_filters(args)
+    if not args.store:
+        assets = load_assets(args.json)
+        return assets, build_header(assets)
+    with AssetStore(args.store) as store:
+        header = header_from_metadata_keys(store.metadata_keys(ids=ids, where=where))
+        assets = list(store.iter_assets(ids=ids, where=where))
+    return assets, header
+
+
+def stream_source(args: argparse.Namespace) -> tuple[list[str], Iterator[dict]]:
+    # Two passes over the source: the first only collects metadata keys for the
+    # header, the second hands out assets one at a time for row building.
+    ids, where = source_filters(args)
+    if not args.store:
+        return build_header(iter_assets(args.json)), iter_assets(args.json)
+
+    store = AssetStore(args.store)
+    header = header_from_metadata_keys(store.metadata_keys(ids=ids, where=where))
+
+    def assets() -> Iterator[dict]:
+        try:
+            yield from store.iter_assets(ids=ids, where=where)
+        finally:
+            store.close()
+
+    return header, assets()
 
 
 def build_credentials() -> Any:
@@ -162,12 +388,17 @@ def build_credentials() -> Any:
     sa_json = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
     oauth_client_file = os.getenv("GOOGLE_OAUTH_CLIENT_FILE")
 
+    # google-auth is imported here so --dry-run never loads it
+    from google.oauth2 import service_account
+
     if sa_file and os.path.exists(sa_file):
         return service_account.Credentials.from_service_account_file(sa_file, scopes=scopes)
     if sa_json:
         info = json.loads(sa_json)
         return service_account.Credentials.from_service_account_info(info, scopes=scopes)
     if oauth_client_file and os.path.exists(oauth_client_file):
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
         flow = InstalledAppFlow.from_client_secrets_file(oauth_client_file, scopes=scopes)
         creds = flow.run_local_server(port=0)
         return creds
@@ -181,7 +412,7 @@ def build_credentials() -> Any:
 
 
 def ensure_tab(service, spreadsheet_id: str, tab_name: str) -> str:
-    meta = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
+    meta = execute_request(service.spreadsheets().get(spreadsheetId=spreadsheet_id))
     existing = {s["properties"]["title"] for s in meta.get("sheets", [])}
     name = tab_name
     if name in existing:
@@ -189,32 +420,608 @@ def ensure_tab(service, spreadsheet_id: str, tab_name: str) -> str:
         name = f"{tab_name}_{suffix}"
 
     body = {"requests": [{"addSheet": {"properties": {"title": name}}}]}
-    service.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body=body).execute()
+    execute_request(service.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body=body))
     return name
 
 
-def write_rows(service, spreadsheet_id: str, tab_name: str, rows: list[list[str]]) -> None:
-    range_name = f"{tab_name}!A1"
-    body = {"values": rows}
-    service.spreadsheets().values().update(
-        spreadsheetId=spreadsheet_id,
-        range=range_name,
-        valueInputOption="RAW",
-        body=body,
-    ).execute()
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+def normalize_sheet_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.replace("\r\n", "\n").strip()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).replace("\r\n", "\n").strip()
+
+
+def normalize_sheet_row(row: list[Any]) -> list[str]:
+    # normalize_sheet_cell for a whole row; values read from Sheets (and rows
+    # from flatten_assets) are all strings, which stays on str.strip in C
+    try:
+        cells = list(map(str.strip, row))
+    except TypeError:
+        return [normalize_sheet_cell(v) for v in row]
+    if "\r" in "".join(cells):
+        cells = [c.replace("\r\n", "\n") for c in cells]
+    return cells
+
+
+# Optional last column holding a hash of the row's synced values, hidden in the
+# sheet. A row whose recomputed hash differs was edited after the sync.
+FINGERPRINT_COLUMN = "_row_fingerprint"
+
+
+def row_fingerprint(cells: list[Any]) -> str:
+    joined = "\x1f".join(normalize_sheet_row(cells))
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def add_fingerprints(rows: list[list[str]], has_header: bool = True) -> list[list[str]]:
+    # appends in place; the header row is replaced rather than mutated since it
+    # is usually the caller's header list
+    start = 0
+    if has_header and rows:
+        rows[0] = list(rows[0]) + [FINGERPRINT_COLUMN]
+        start = 1
+    for row in islice(rows, start, None):
+        row.append(row_fingerprint(row))
+    return rows
+
+
+def fingerprint_checker(header: list[Any]) -> Callable[[list[Any]], bool]:
+    # `header` is the tab's own header row, which has to contain
+    # FINGERPRINT_COLUMN. The returned check is True for a row whose stored
+    # fingerprint no longer matches its values.
+    names = [normalize_sheet_cell(v) for v in header]
+    fp_idx = names.index(FINGERPRINT_COLUMN)
+    width = len(names)
+
+    def is_edited(row: list[Any]) -> bool:
+        cells = list(row[:width]) + [""] * (width - min(len(row), width))
+        stored = normalize_sheet_cell(cells.pop(fp_idx))
+        return stored != row_fingerprint(cells)
+
+    return is_edited
+
+
+def edited_rows(header: list[Any], rows: Iterable[list[Any]], first_row: int = 2) -> Iterator[int]:
+    is_edited = fingerprint_checker(header)
+    for row_number, row in enumerate(rows, start=first_row):
+        if row and is_edited(row):
+            yield row_number
+
+
+def hide_column(service, spreadsheet_id: str, tab_name: str, index: int) -> None:
+    sheet_id = get_sheet_properties(service, spreadsheet_id, tab_name)["sheetId"]
+    body = {
+        "requests": [
+            {
+                "updateDimensionProperties": {
+                    "range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": index, "endIndex": index + 1},
+                    "properties": {"hiddenByUser": True},
+                    "fields": "hiddenByUser",
+                }
+            }
+        ]
+    }
+    execute_request(service.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body=body))
+
+
+def quote_tab(tab_name: str) -> str:
+    return "'" + tab_name.replace("'", "''") + "'"
+
+
+def http_status(exc: Exception) -> int | None:
+    status = getattr(getattr(exc, "resp", None), "status", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc: Exception) -> bool:
+    status = http_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return isinstance(exc, (ConnectionError, TimeoutError, OSError))
+
+
+def get_sheet_properties(service, spreadsheet_id: str, tab_name: str) -> dict:
+    meta = execute_request(
+        service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields="sheets.properties(sheetId,title,gridProperties)",
+        )
+    )
+    for sheet in meta.get("sheets", []):
+        props = sheet.get("properties", {})
+        if props.get("title") == tab_name:
+            return props
+    raise RuntimeError(f"Tab not found: {tab_name}")
+
+
+def execute_request(request):
+    # Every Sheets call goes through here so it shows up in the run metrics.
+    method = (getattr(request, "methodId", None) or "unknown").replace("sheets.spreadsheets.", "")
+    body = getattr(request, "body", None)
+    METRICS.inc("http_bytes_sent_total", len(body) if body else 0, service="sheets")
+    try:
+        result = request.execute()
+    except Exception as exc:
+        METRICS.inc("http_requests_total", service="sheets", method=method, status=http_status(exc) or "error")
+        raise
+    METRICS.inc("http_requests_total", service="sheets", method=method, status=200)
+    return result
+
+
+def retry_sleep(exc: Exception, delay: float) -> None:
+    METRICS.inc("http_retries_total", service="sheets", reason=http_status(exc) or "connection")
+    METRICS.inc("retry_sleep_seconds_total", delay, service="sheets")
+    time.sleep(delay)
+
+
+def execute_with_retries(make_request, service, retries: int = 5, backoff_base: float = 2.0):
+    for attempt in range(retries):
+        try:
+            return execute_request(make_request(service))
+        except Exception as exc:
+            if attempt >= retries - 1 or not is_retryable(exc):
+                raise
+            retry_sleep(exc, backoff_base ** attempt)
+
+
+class TabReader:
+    # Reads a tab in row blocks sized from its grid, several ranges per
+    # values().batchGet and up to `concurrency` requests in flight (one service
+    # per worker thread). Blocks come back in order; empty rows are kept as []
+    # between values and dropped at the end, like a single values().get.
+    def __init__(
+        self,
+        service,
+        spreadsheet_id: str,
+        tab_name: str,
+        *,
+        service_factory=None,
+        concurrency: int = 4,
+        block_rows: int = 5000,
+        ranges_per_request: int = 2,
+        retries: int = 5,
+        backoff_base: float = 2.0,
+    ):
+        self.service = service
+        self.spreadsheet_id = spreadsheet_id
+        self.tab_name = tab_name
+        self.service_factory = service_factory
+        self.concurrency = max(1, concurrency) if service_factory is not None else 1
+        self.block_rows = max(1, block_rows)
+        self.ranges_per_request = max(1, ranges_per_request)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self._local = threading.local()
+        props = get_sheet_properties(service, spreadsheet_id, tab_name)
+        self.row_count = props.get("gridProperties", {}).get("rowCount", 0)
+
+    def _thread_service(self):
+        if self.concurrency == 1:
+            return self.service
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = self._local.service = self.service_factory()
+        return service
+
+    def _fetch(self, ranges: list[tuple[int, int]]) -> list[list[list[Any]]]:
+        resp = execute_with_retries(
+            lambda svc: svc.spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=[f"{quote_tab(self.tab_name)}!{start}:{end}" for start, end in ranges],
+                valueRenderOption="FORMATTED_VALUE",
+            ),
+            self._thread_service(),
+            self.retries,
+            self.backoff_base,
+        )
+        blocks: list[list[list[Any]]] = []
+        for (start, end), value_range in zip(ranges, resp.get("valueRanges") or []):
+            values = value_range.get("values") or []
+            # pad each block to its full height so row numbers line up across blocks
+            blocks.append(values + [[] for _ in range(end - start + 1 - len(values))])
+            METRICS.inc("sheets_cells_read_total", sum(map(len, values)))
+        return blocks
+
+    def _requests(self) -> Iterator[list[tuple[int, int]]]:
+        ranges: list[tuple[int, int]] = []
+        for start in range(1, self.row_count + 1, self.block_rows):
+            ranges.append((start, min(start + self.block_rows - 1, self.row_count)))
+            if len(ranges) >= self.ranges_per_request:
+                yield ranges
+                ranges = []
+        if ranges:
+            yield ranges
+
+    def _raw_blocks(self) -> Iterator[list[list[Any]]]:
+        if self.concurrency == 1:
+            for ranges in self._requests():
+                yield from self._fetch(ranges)
+            return
+        pending: deque = deque()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                for ranges in self._requests():
+                    if len(pending) >= self.concurrency:
+                        yield from pending.popleft().result()
+                    pending.append(executor.submit(self._fetch, ranges))
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def blocks(self) -> Iterator[list[list[Any]]]:
+        held_empty = 0
+        for block in self._raw_blocks():
+            last = len(block)
+            while last > 0 and not block[last - 1]:
+                last -= 1
+            if last == 0:
+                held_empty += len(block)
+                continue
+            out = [[] for _ in range(held_empty)] + block[:last] if held_empty else block[:last]
+            held_empty = len(block) - last
+            yield out
+
+    def rows(self) -> Iterator[list[Any]]:
+        for block in self.blocks():
+            yield from block
+
+
+def read_tab_values(service, spreadsheet_id: str, tab_name: str, **reader_options) -> list[list[Any]]:
+    values: list[list[Any]] = []
+    for block in TabReader(service, spreadsheet_id, tab_name, **reader_options).blocks():
+        values.extend(block)
+    return values
+
+
+class ChunkedSheetWriter:
+    # Splits rows into blocks bounded by payload size and row count and sends each
+    # block as its own values().batchUpdate. Up to `concurrency` blocks are in
+    # flight (one service per worker thread, each with its own HTTP session),
+    # and each block retries 429/5xx on its own. Values writes grow the grid
+    # themselves, so no separate resize call is spent per write.
+    def __init__(
+        self,
+        service,
+        spreadsheet_id: str,
+        tab_name: str,
+        *,
+        service_factory=None,
+        concurrency: int = 4,
+        max_chunk_bytes: int = 2_000_000,
+        max_chunk_rows: int = 5000,
+        retries: int = 5,
+        backoff_base: float = 2.0,
+        progress=None,
+        total_rows: int | None = None,
+    ):
+        self.service = service
+        self.spreadsheet_id = spreadsheet_id
+        self.tab_name = tab_name
+        self.service_factory = service_factory
+        self.concurrency = max(1, concurrency) if service_factory is not None else 1
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_chunk_rows = max(1, max_chunk_rows)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.progress = progress
+        self.total_rows = total_rows
+        self.rows_written = 0
+        self.chunks_written = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency) if self.concurrency > 1 else None
+        self._pending: deque = deque()
+
+    def _thread_service(self):
+        if self._executor is None:
+            return self.service
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = self._local.service = self.service_factory()
+        return service
+
+    def _execute(self, make_request, service):
+        return execute_with_retries(make_request, service, self.retries, self.backoff_base)
+
+    def _send(self, start_row: int, block: list[list[str]]) -> None:
+        body = {
+            "valueInputOption": "RAW",
+            "data": [{"range": f"{quote_tab(self.tab_name)}!A{start_row}", "values": block}],
+        }
+        self._execute(
+            lambda svc: svc.spreadsheets().values().batchUpdate(spreadsheetId=self.spreadsheet_id, body=body),
+            self._thread_service(),
+        )
+        METRICS.inc("sheets_cells_written_total", sum(map(len, block)))
+        with self._lock:
+            self.rows_written += len(block)
+            self.chunks_written += 1
+            if self.progress is not None:
+                total = f"/{self.total_rows}" if self.total_rows is not None else ""
+                print(
+                    f"[write] rows {start_row}-{start_row + len(block) - 1} landed "
+                    f"({self.rows_written}{total} rows, {self.chunks_written} chunks)",
+                    file=self.progress,
+                )
+
+    def _blocks(self, rows: list[list[str]], start_row: int) -> Iterator[tuple[int, list[list[str]]]]:
+        block: list[list[str]] = []
+        block_bytes = 0
+        block_start = start_row
+        for row in rows:
+            row_bytes = len(json.dumps(row)) + 1
+            if block and (block_bytes + row_bytes > self.max_chunk_bytes or len(block) >= self.max_chunk_rows):
+                yield block_start, block
+                block_start += len(block)
+                block, block_bytes = [], 0
+            block.append(row)
+            block_bytes += row_bytes
+        if block:
+            yield block_start, block
+
+    def write(self, rows: list[list[str]], start_row: int) -> None:
+        if not rows:
+            return
+        for block_start, block in self._blocks(rows, start_row):
+            if self._executor is None:
+                self._send(block_start, block)
+                continue
+            while len(self._pending) >= self.concurrency * 2:
+                self._pending.popleft().result()
+            self._pending.append(self._executor.submit(self._send, block_start, block))
+
+    def close(self) -> None:
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+
+
+def write_rows(
+    service,
+    spreadsheet_id: str,
+    tab_name: str,
+    rows: list[list[str]],
+    start_row: int = 1,
+    **writer_options,
+) -> int:
+    writer = ChunkedSheetWriter(service, spreadsheet_id, tab_name, total_rows=len(rows), **writer_options)
+    try:
+        writer.write(rows, start_row)
+    finally:
+        writer.close()
+    return writer.chunks_written
+
+
+def changed_runs(expected: list[str], actual: list[Any]) -> Iterator[tuple[int, list[str]]]:
+    # Contiguous runs of cells whose normalized values differ; cells beyond the
+    # expected width are cleared.
+    width = max(len(expected), len(actual))
+    run_start = None
+    run: list[str] = []
+    for col in range(width):
+        exp = expected[col] if col < len(expected) else ""
+        act = actual[col] if col < len(actual) else ""
+        if normalize_sheet_cell(exp) != normalize_sheet_cell(act):
+            if run_start is None:
+                run_start = col
+            run.append(exp)
+            continue
+        if run_start is not None:
+            yield run_start, run
+            run_start, run = None, []
+    if run_start is not None:
+        yield run_start, run
+
+
+def cell_rows(values: Iterable[list[str]]) -> list[dict]:
+    return [{"values": [{"userEnteredValue": {"stringValue": v}} for v in row]} for row in values]
+
+
+def plan_in_place_update(
+    *,
+    sheet_id: int,
+    grid_cols: int,
+    current: list[list[Any]],
+    rows: list[list[str]],
+) -> tuple[list[dict], dict[str, int]]:
+    header = rows[0]
+    id_pos = header.index("id")
+    current_header = [normalize_sheet_cell(v) for v in (current[0] if current else [])]
+    if "id" not in current_header:
+        raise RuntimeError("Current tab has no 'id' column; cannot update in place.")
+    sheet_id_pos = current_header.index("id")
+
+    # rows without an id (notes, subtotals people add to the tab) are left as-is
+    sheet_rows: dict[str, int] = {}
+    unkeyed_rows = 0
+    for idx, row in enumerate(current[1:], start=1):
+        asset_id = normalize_sheet_cell(row[sheet_id_pos] if sheet_id_pos < len(row) else "")
+        if not asset_id:
+            if any(normalize_sheet_cell(v) for v in row):
+                unkeyed_rows += 1
+            continue
+        if asset_id in sheet_rows:
+            raise RuntimeError(f"Duplicate id in tab: {asset_id}")
+        sheet_rows[asset_id] = idx
+
+    updates: list[dict] = []
+    stats = {
+        "changed_cells": 0,
+        "updated_rows": 0,
+        "appended_rows": 0,
+        "deleted_rows": 0,
+        "unkeyed_rows": unkeyed_rows,
+    }
+
+    def add_updates(row_index: int, expected: list[str], actual: list[Any]) -> None:
+        touched = False
+        for col, run in changed_runs(expected, actual):
+            touched = True
+            stats["changed_cells"] += len(run)
+            updates.append(
+                {
+                    "updateCells": {
+                        "start": {"sheetId": sheet_id, "rowIndex": row_index, "columnIndex": col},
+                        "rows": cell_rows([run]),
+                        "fields": "userEnteredValue",
+                    }
+                }
+            )
+        if touched and row_index > 0:
+            stats["updated_rows"] += 1
+
+    add_updates(0, header, current[0] if current else [])
+
+    seen: set[str] = set()
+    appended: list[list[str]] = []
+    for row in rows[1:]:
+        asset_id = normalize_sheet_cell(row[id_pos])
+        if asset_id in seen:
+            raise RuntimeError(f"Duplicate id in source: {asset_id}")
+        if asset_id:
+            seen.add(asset_id)
+        row_index = sheet_rows.get(asset_id)
+        if row_index is None:
+            appended.append(row)
+        else:
+            add_updates(row_index, row, current[row_index])
+
+    # deletions run bottom-up so earlier indices stay valid; updates above were
+    # planned against the pre-delete layout and are applied first
+    stale = sorted((idx for asset_id, idx in sheet_rows.items() if asset_id not in seen), reverse=True)
+    deletes: list[dict] = []
+    for idx in stale:
+        deletes.append(
+            {
+                "deleteDimension": {
+                    "range": {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": idx, "endIndex": idx + 1}
+                }
+            }
+        )
+    stats["deleted_rows"] = len(stale)
+
+    appends: list[dict] = []
+    if appended:
+        appends.append({"appendCells": {"sheetId": sheet_id, "rows": cell_rows(appended), "fields": "userEnteredValue"}})
+        stats["appended_rows"] = len(appended)
+        stats["changed_cells"] += sum(len(r) for r in appended)
+
+    grow: list[dict] = []
+    if len(header) > grid_cols:
+        grow.append(
+            {"appendDimension": {"sheetId": sheet_id, "dimension": "COLUMNS", "length": len(header) - grid_cols}}
+        )
+    return grow + updates + deletes + appends, stats
+
+
+def update_in_place(
+    service,
+    spreadsheet_id: str,
+    tab_name: str,
+    rows: list[list[str]],
+    *,
+    retries: int = 5,
+    backoff_base: float = 2.0,
+    **writer_options,
+) -> dict[str, int]:
+    try:
+        props = get_sheet_properties(service, spreadsheet_id, tab_name)
+    except RuntimeError:
+        body = {"requests": [{"addSheet": {"properties": {"title": tab_name}}}]}
+        execute_request(service.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body=body))
+        props = None
+    current = (
+        read_tab_values(
+            service,
+            spreadsheet_id,
+            tab_name,
+            service_factory=writer_options.get("service_factory"),
+            concurrency=writer_options.get("concurrency", 4),
+        )
+        if props is not None
+        else []
+    )
+    if not current:
+        chunks = write_rows(service, spreadsheet_id, tab_name, rows, **writer_options)
+        return {
+            "changed_cells": sum(len(r) for r in rows),
+            "updated_rows": 0,
+            "appended_rows": len(rows) - 1,
+            "deleted_rows": 0,
+            "unkeyed_rows": 0,
+            "requests": chunks + (1 if props is None else 0),
+        }
+
+    requests_, stats = plan_in_place_update(
+        sheet_id=props["sheetId"],
+        grid_cols=props.get("gridProperties", {}).get("columnCount", 0),
+        current=current,
+        rows=rows,
+    )
+
+    def send(batch: list[dict]) -> None:
+        # only 429s are retried: a 5xx may have applied the appendCells already
+        for attempt in range(retries):
+            try:
+                execute_request(service.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body={"requests": batch}))
+                return
+            except Exception as exc:
+                if attempt >= retries - 1 or http_status(exc) != 429:
+                    raise
+                retry_sleep(exc, backoff_base ** attempt)
+
+    # Normally a single batchUpdate; only a very large diff is split, in order.
+    max_request_bytes = writer_options.get("max_chunk_bytes", 2_000_000)
+    batch: list[dict] = []
+    batch_bytes = 0
+    stats["requests"] = 0
+    for req in requests_:
+        req_bytes = len(json.dumps(req))
+        if batch and batch_bytes + req_bytes > max_request_bytes:
+            send(batch)
+            stats["requests"] += 1
+            batch, batch_bytes = [], 0
+        batch.append(req)
+        batch_bytes += req_bytes
+    if batch:
+        send(batch)
+        stats["requests"] += 1
+    return stats
+
+
+def match_entry(idx: int, asset: dict) -> dict[str, str | int]:
+    return {
+        "row": idx + 2,  # 1-based, header at row 1
+        "id": str(asset.get("id") or ""),
+        "title": str(asset.get("title") or asset.get("name") or ""),
+    }
 
 
 def print_match_report(
     *,
-    assets: list[dict],
+    asset_count: int,
     header: list[str],
-    rows: list[list[str]],
+    stats: ColumnStats,
+    matches: Iterable[dict],
     tab_name: str | None,
     print_all_matches: bool,
     match_preview: int,
     stream,
 ) -> None:
-    asset_count = len(assets)
     base_cols = len(BASE_HEADER)
     total_cols = len(header)
     extra_cols = max(0, total_cols - base_cols)
@@ -224,13 +1031,8 @@ def print_match_report(
     print(f"행(헤더 제외): {asset_count}", file=stream)
     print(f"컬럼: {total_cols} (기본 {base_cols} + 확장 {extra_cols})", file=stream)
 
-    if asset_count > 0 and rows:
-        counts = {col: 0 for col in header}
-        for row in rows[1:]:
-            for col, cell in zip(header, row):
-                if str(cell).strip() != "":
-                    counts[col] += 1
-
+    if asset_count > 0:
+        counts = stats.fill_counts()
         top = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:10]
         print("컬럼 채움 TOP 10:", file=stream)
         for col, cnt in top:
@@ -242,29 +1044,112 @@ def print_match_report(
             suffix = " ..." if len(empty_cols) > 20 else ""
             print(f"빈 컬럼(0/{asset_count}): {preview}{suffix}", file=stream)
 
-    matches: list[dict[str, str | int]] = []
-    for idx, asset in enumerate(assets):
-        matches.append(
-            {
-                "row": idx + 2,  # 1-based, header at row 1
-                "id": str(asset.get("id") or ""),
-                "title": str(asset.get("title") or asset.get("name") or ""),
-            }
-        )
+        for col, length in stats.oversized_columns():
+            print(f"경고: {col} 컬럼에 {length}자 셀이 있습니다 (시트 셀 한도 {SHEETS_CELL_LIMIT}자)", file=stream)
 
-    show = matches if print_all_matches else matches[: max(0, match_preview)]
+    # matches may be lazy; only pull as many as the preview shows
+    show = list(matches) if print_all_matches else list(islice(matches, max(0, match_preview)))
     print("매칭(시트 행 ↔ asset):", file=stream)
     for m in show:
         print(f"- {m['row']}: {m['id']} | {m['title']}", file=stream)
-    if not print_all_matches and len(matches) > max(0, match_preview):
-        print(f"(미리보기 {len(show)}/{len(matches)}; 전체 출력은 --print-matches)", file=stream)
+    if not print_all_matches and asset_count > max(0, match_preview):
+        print(f"(미리보기 {len(show)}/{asset_count}; 전체 출력은 --print-matches)", file=stream)
+
+
+def write_stats_json(path: str, stats: ColumnStats) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+def writer_options(args: argparse.Namespace, creds) -> dict:
+    return {
+        "service_factory": lambda: SheetsService(creds),
+        "concurrency": args.write_concurrency,
+        "max_chunk_bytes": args.chunk_bytes,
+        "max_chunk_rows": args.chunk_rows,
+        "progress": sys.stderr,
+    }
+
+
+def sync_streaming(args: argparse.Namespace) -> None:
+    header, assets = stream_source(args)
+    keep = None if args.print_matches else max(0, args.match_preview)
+    matches: list[dict] = []
+    asset_count = 0
+
+    def tracked(items: Iterator[dict]) -> Iterator[dict]:
+        nonlocal asset_count
+        for asset in items:
+            if keep is None or asset_count < keep:
+                matches.append(match_entry(asset_count, asset))
+            asset_count += 1
+            yield asset
+
+    stats = ColumnStats(header)
+    # reading the source and building rows happen together, one chunk at a time
+    chunks = METRICS.timed(iter_row_chunks(tracked(assets), header, max(1, args.chunk_rows)), "read_flatten")
+
+    if args.dry_run:
+        try:
+            sys.stdout.reconfigure(encoding="utf-8", errors="backslashreplace")
+        except Exception:
+            pass
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(header + [FINGERPRINT_COLUMN] if args.fingerprint else header)
+        with METRICS.phase("csv_output"):
+            for chunk in chunks:
+                stats.add_rows(chunk)
+                if args.fingerprint:
+                    add_fingerprints(chunk, has_header=False)
+                writer.writerows(chunk)
+        tab_name = None
+        report_stream = sys.stderr
+    else:
+        if not args.sheet:
+            print("Missing --sheet (or GOOGLE_SHEET_ID).", file=sys.stderr)
+            sys.exit(2)
+        creds = build_credentials()
+        service = SheetsService(creds)
+        with METRICS.phase("sheets_write"):
+            tab_name = ensure_tab(service, args.sheet, args.tab)
+            writer = ChunkedSheetWriter(service, args.sheet, tab_name, **writer_options(args, creds))
+            try:
+                writer.write([header + [FINGERPRINT_COLUMN] if args.fingerprint else header], 1)
+                next_row = 2
+                for chunk in chunks:
+                    stats.add_rows(chunk)
+                    if args.fingerprint:
+                        add_fingerprints(chunk, has_header=False)
+                    writer.write(chunk, next_row)
+                    next_row += len(chunk)
+            finally:
+                writer.close()
+            if args.fingerprint:
+                hide_column(service, args.sheet, tab_name, len(header))
+        print(f"Wrote {asset_count} rows to {args.sheet} / tab '{tab_name}'")
+        report_stream = sys.stdout
+
+    METRICS.inc("assets_total", asset_count)
+    if args.stats_json:
+        write_stats_json(args.stats_json, stats)
+    with METRICS.phase("report"):
+        print_match_report(
+            asset_count=asset_count,
+            header=header,
+            stats=stats,
+            matches=matches,
+            tab_name=tab_name,
+            print_all_matches=args.print_matches,
+            match_preview=args.match_preview,
+            stream=report_stream,
+        )
 
 
 def main() -> None:
     load_dotenv()
     configure_stdio()
     parser = argparse.ArgumentParser(description="Flatten iconik assets JSON and sync to Google Sheets.")
-    parser.add_argument("--json", default=os.getenv("ICONIK_JSON", "assets_test.json"), help="Path to assets JSON")
+    add_source_arguments(parser)
     parser.add_argument("--sheet", default=os.getenv("GOOGLE_SHEET_ID"), help="Google Spreadsheet ID")
     parser.add_argument("--tab", default=os.getenv("GOOGLE_TAB_NAME", "iconik_export"), help="Tab name to create")
     parser.add_argument("--dry-run", action="store_true", help="Only write CSV to stdout")
@@ -275,30 +1160,107 @@ def main() -> None:
         default=int(os.getenv("ICONIK_MATCH_PREVIEW", "20")),
         help="How many matches to preview when not using --print-matches",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=os.getenv("ICONIK_STREAM", "0").lower() in ("1", "true", "yes", "y"),
+        help="Read the source in two streaming passes and write rows in chunks (flat memory for large exports)",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=int(os.getenv("ICONIK_CHUNK_ROWS", "5000")),
+        help="Max rows per chunk (row building in --stream mode and each Sheets write)",
+    )
+    parser.add_argument(
+        "--chunk-bytes",
+        type=int,
+        default=int(os.getenv("GOOGLE_SHEETS_CHUNK_BYTES", "2000000")),
+        help="Max JSON payload bytes per Sheets write request",
+    )
+    parser.add_argument(
+        "--write-concurrency",
+        type=int,
+        default=int(os.getenv("GOOGLE_SHEETS_WRITE_CONCURRENCY", "4")),
+        help="How many write chunks to keep in flight",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("ICONIK_FLATTEN_WORKERS", "1")),
+        help=(
+            f"Processes used to flatten assets into rows (0 = one per CPU from {FLATTEN_POOL_MIN_ASSETS} assets "
+            "when the pool can fork, else 1; not used with --stream)"
+        ),
+    )
+    parser.add_argument(
+        "--update-in-place",
+        action="store_true",
+        default=os.getenv("GOOGLE_SHEETS_UPDATE_IN_PLACE", "0").lower() in ("1", "true", "yes", "y"),
+        help="Diff against the existing tab (rows matched by id) and write only changed cells instead of a new tab",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        default=os.getenv("GOOGLE_SHEETS_FINGERPRINT", "0").lower() in ("1", "true", "yes", "y"),
+        help=f"Add a hidden {FINGERPRINT_COLUMN} column hashing each row's values, so later edits can be detected",
+    )
+    parser.add_argument(
+        "--stats-json",
+        default=os.getenv("ICONIK_STATS_JSON"),
+        help="Also write per-column stats (fill, distinct estimate, max length, multi-line) as JSON to this path",
+    )
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    METRICS.configure(args, "sync")
+    PROFILER.start(
+        args,
+        "sync",
+        hot=(RowBuilder.__call__, asset_to_row, normalize_cell_value, ColumnStats.add_rows, row_fingerprint),
+    )
+    if args.update_in_place and args.stream:
+        print("--update-in-place reads the whole tab and cannot be combined with --stream.", file=sys.stderr)
+        sys.exit(2)
 
-    assets = load_assets(args.json)
-    header = build_header(assets)
-    rows = flatten_assets(assets, header)
+    if args.stream:
+        sync_streaming(args)
+        return
+
+    with METRICS.phase("load_source"):
+        assets, header = load_source(args)
+    METRICS.inc("assets_total", len(assets))
+    stats = ColumnStats(header)
+    workers = args.workers if args.workers > 0 else auto_flatten_workers(len(assets))
+    with METRICS.phase("flatten"):
+        rows = flatten_assets(assets, header, workers=workers, stats=stats)
+    if args.stats_json:
+        write_stats_json(args.stats_json, stats)
+    if args.fingerprint:
+        with METRICS.phase("fingerprint"):
+            add_fingerprints(rows)
 
     if args.dry_run:
-        out = io.StringIO()
-        writer = csv.writer(out, lineterminator="\n")
-        writer.writerows(rows)
-        try:
-            sys.stdout.reconfigure(encoding="utf-8", errors="backslashreplace")
-        except Exception:
-            pass
-        sys.stdout.write(out.getvalue())
-        print_match_report(
-            assets=assets,
-            header=header,
-            rows=rows,
-            tab_name=None,
-            print_all_matches=args.print_matches,
-            match_preview=args.match_preview,
-            stream=sys.stderr,
-        )
+        with METRICS.phase("csv_output"):
+            out = io.StringIO()
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerows(rows)
+            try:
+                sys.stdout.reconfigure(encoding="utf-8", errors="backslashreplace")
+            except Exception:
+                pass
+            sys.stdout.write(out.getvalue())
+        with METRICS.phase("report"):
+            print_match_report(
+                asset_count=len(assets),
+                header=header,
+                stats=stats,
+                matches=(match_entry(idx, asset) for idx, asset in enumerate(assets)),
+                tab_name=None,
+                print_all_matches=args.print_matches,
+                match_preview=args.match_preview,
+                stream=sys.stderr,
+            )
         return
 
     if not args.sheet:
@@ -306,21 +1268,37 @@ def main() -> None:
         sys.exit(2)
 
     creds = build_credentials()
-    service = build("sheets", "v4", credentials=creds, cache_discovery=False)
-
-    tab_name = ensure_tab(service, args.sheet, args.tab)
-    write_rows(service, args.sheet, tab_name, rows)
-    print(f"Wrote {len(rows)-1} rows to {args.sheet} / tab '{tab_name}'")
-    print_match_report(
-        assets=assets,
-        header=header,
-        rows=rows,
-        tab_name=tab_name,
-        print_all_matches=args.print_matches,
-        match_preview=args.match_preview,
-        stream=sys.stdout,
-    )
+    service = SheetsService(creds)
+
+    with METRICS.phase("sheets_write"):
+        if args.update_in_place:
+            tab_name = args.tab
+            result = update_in_place(service, args.sheet, tab_name, rows, **writer_options(args, creds))
+            print(
+                f"Updated {args.sheet} / tab '{tab_name}' in place: {result['changed_cells']} cells written, "
+                f"{result['updated_rows']} rows changed, {result['appended_rows']} appended, "
+                f"{result['deleted_rows']} deleted, {result['unkeyed_rows']} without an id kept "
+                f"({result['requests']} batch requests)"
+            )
+        else:
+            tab_name = ensure_tab(service, args.sheet, args.tab)
+            write_rows(service, args.sheet, tab_name, rows, **writer_options(args, creds))
+            print(f"Wrote {len(rows)-1} rows to {args.sheet} / tab '{tab_name}'")
+        if args.fingerprint:
+            hide_column(service, args.sheet, tab_name, len(header))
+    with METRICS.phase("report"):
+        print_match_report(
+            asset_count=len(assets),
+            header=header,
+            stats=stats,
+            matches=(match_entry(idx, asset) for idx, asset in enumerate(assets)),
+            tab_name=tab_name,
+            print_all_matches=args.print_matches,
+            match_preview=args.match_preview,
+            stream=sys.stdout,
+        )
 
 
 if __name__ == "__main__":
-    main()
+    with reporting(), profiling():
+        main()
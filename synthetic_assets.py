@@ -0,0 +1,140 @@
+import argparse
+import random
+import sys
+import uuid
+from itertools import islice
+from typing import Any, Iterator
+
+from asset_io import NdjsonWriter, is_ndjson_path, write_assets
+from sync_to_sheet import BASE_FIELDS, BASE_HEADER
+
+
+# Metadata columns of the sheet, in header order; extra keys beyond these are
+# named Extra_001, Extra_002, ... and land in the sorted tail of the header.
+METADATA_COLUMNS = [c for c in BASE_HEADER if c not in BASE_FIELDS]
+
+PLAYERS = [
+    "Phil Ivey",
+    "Tom Dwan",
+    "Daniel Negreanu",
+    "Phil Hellmuth",
+    "Doyle Brunson",
+    "Patrik Antonius",
+    "Gus Hansen",
+    "Antonio Esfandiari",
+    "Vanessa Selbst",
+    "Jennifer Harman",
+    "Erik Seidel",
+    "Fedor Holz",
+    "Justin Bonomo",
+    "Bryn Kenney",
+    "Kristen Foxen",
+    "Sam Trickett",
+]
+WORDS = [
+    "river",
+    "turn",
+    "flop",
+    "preflop",
+    "raise",
+    "call",
+    "fold",
+    "shove",
+    "bluff",
+    "value",
+    "cooler",
+    "final table",
+    "heads up",
+    "high roller",
+    "main event",
+    "rail",
+    "chip lead",
+    "bubble",
+    "set over set",
+    "nut flush",
+]
+FLAG_COLUMNS = {"Badbeat", "Bluff", "Suckout", "Cooler", "EPICHAND", "All-in"}
+
+
+def metadata_key_names(count: int) -> list[str]:
+    names = METADATA_COLUMNS[:count]
+    names += [f"Extra_{n:03d}" for n in range(1, count - len(names) + 1)]
+    return names
+
+
+def metadata_value(rng: random.Random, key: str, nested: float) -> Any:
+    roll = rng.random()
+    if roll < 0.02:
+        return None
+    if roll < 0.02 + nested:
+        # structured values end up JSON-encoded in the cell
+        return [{"value": w, "label": w.title()} for w in rng.sample(WORDS, rng.randint(1, 3))]
+    if key == "PlayersTags":
+        return rng.sample(PLAYERS, rng.randint(1, 6))
+    if key == "Description":
+        sentences = [" ".join(rng.choices(WORDS, k=rng.randint(4, 12))).capitalize() + "." for _ in range(rng.randint(1, 4))]
+        return "\n".join(sentences) if rng.random() < 0.3 else " ".join(sentences)
+    if key == "Year_":
+        return [str(rng.randint(2003, 2025))]
+    if key in FLAG_COLUMNS:
+        return ["true"]
+    return rng.sample(WORDS, rng.randint(1, 3))
+
+
+def generate_assets(
+    count: int,
+    *,
+    seed: int = 0,
+    metadata_keys: int = 40,
+    fill: float = 0.35,
+    nested: float = 0.02,
+) -> Iterator[dict]:
+    # Same seed and options give the same assets, so runs are comparable.
+    rng = random.Random(seed)
+    keys = metadata_key_names(metadata_keys)
+    for n in range(count):
+        md = {key: metadata_value(rng, key, nested) for key in keys if rng.random() < fill}
+        asset: dict[str, Any] = {
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "title": f"{rng.choice(PLAYERS)} vs {rng.choice(PLAYERS)} - hand {n}",
+            "type": "ASSET",
+            "status": "ACTIVE",
+            "metadata": md,
+        }
+        if rng.random() < 0.8:
+            start = rng.randint(0, 4 * 3600 * 1000)
+            asset["time_start_milliseconds"] = start
+            asset["time_end_milliseconds"] = start + rng.randint(5_000, 600_000)
+        yield asset
+
+
+def write_synthetic_assets(path: str, assets: Iterator[dict]) -> None:
+    # ndjson is written page by page; a JSON array (the export default) is
+    # written like export_assets does, in one go
+    if is_ndjson_path(path):
+        with NdjsonWriter(path) as writer:
+            while writer.write_page(islice(assets, 1000)):
+                pass
+    else:
+        write_assets(path, list(assets), "json")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic iconik asset export for benchmarks.")
+    parser.add_argument("--count", type=int, required=True, help="Number of assets")
+    parser.add_argument("--out", required=True, help="Output path (.json, or .ndjson/.jsonl with optional .gz/.zst)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--metadata-keys", type=int, default=40, help="Distinct metadata keys across all assets")
+    parser.add_argument("--fill", type=float, default=0.35, help="Chance that an asset has a given metadata key")
+    parser.add_argument("--nested", type=float, default=0.02, help="Chance that a metadata value is a list of dicts")
+    args = parser.parse_args()
+
+    assets = generate_assets(
+        args.count, seed=args.seed, metadata_keys=args.metadata_keys, fill=args.fill, nested=args.nested
+    )
+    write_synthetic_assets(args.out, assets)
+    print(f"Wrote {args.count} assets to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
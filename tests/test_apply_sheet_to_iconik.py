@@ -0,0 +1,69 @@
+import apply_sheet_to_iconik as a
+
+FIELDS = ["title", "time_start_ms", "time_end_ms"]
+ASSET = {"id": "a1", "title": "T", "time_start_milliseconds": 5, "time_end_milliseconds": 10}
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str = ""):
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeClient:
+    def __init__(self, statuses: dict[str, int]):
+        self.statuses = statuses
+        self.calls: list[tuple[str, str]] = []
+
+    def url(self, path: str) -> str:
+        return path
+
+    def request_with_retries(self, method, url, json_body=None):
+        self.calls.append((method, url))
+        status = self.statuses.get(a.api_of(url), 200)
+        return FakeResponse(status, "admin only" if status == 403 else "")
+
+
+def test_cleared_time_cell_is_left_out_of_the_patch():
+    plans, skipped = a.plan_changes({"a1": ASSET}, {"a1": (2, ["New", "5", ""])}, FIELDS, [])
+    assert skipped == []
+    (plan,) = plans
+    assert plan["requests"] == [("PATCH", "assets/v1/assets/a1/", {"title": "New"})]
+    assert plan["not_applied"] == ["time_end_ms"]
+
+
+def test_only_cleared_time_cells_skip_the_row():
+    plans, skipped = a.plan_changes({"a1": ASSET}, {"a1": (2, ["T", "", ""])}, FIELDS, [])
+    assert plans == []
+    assert skipped[0]["reason"] == "cleared time value"
+
+
+def test_403_stops_later_calls_to_that_api():
+    client = FakeClient({"metadata/v1": 403})
+    forbidden: dict[str, str] = {}
+    plans = []
+    for n in range(4):
+        plans.append(
+            {
+                "row": n + 2,
+                "id": f"a{n}",
+                "changes": {},
+                "requests": [
+                    ("PATCH", f"assets/v1/assets/a{n}/", {"title": "x"}),
+                    ("PUT", f"metadata/v1/assets/a{n}/", {"metadata_values": {}}),
+                ],
+            }
+        )
+    results = list(a.apply_all(client, plans, 1, forbidden))
+    assert [r["status"] for r in results] == ["failed", "skipped", "skipped", "skipped"]
+    assert forbidden == {"metadata/v1": "admin only"}
+    assert all(r["forbidden"] == "metadata/v1" for r in results)
+    # skipped rows send nothing, so none of them is half applied
+    assert client.calls == [("PATCH", "assets/v1/assets/a0/"), ("PUT", "metadata/v1/assets/a0/")]
+
+
+def test_403_does_not_stop_rows_that_skip_that_api():
+    client = FakeClient({"metadata/v1": 403})
+    forbidden = {"metadata/v1": "admin only"}
+    plan = {"row": 2, "id": "a1", "changes": {}, "requests": [("PATCH", "assets/v1/assets/a1/", {"title": "x"})]}
+    assert a.apply_one(client, plan, forbidden)["status"] == "applied"
@@ -0,0 +1,39 @@
+import io
+import json
+import random
+
+import pytest
+
+from asset_io import iter_json_array
+
+
+def decode(text: str, chunk_size: int) -> list:
+    return list(iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 11])
+def test_numbers_split_at_chunk_boundaries(chunk_size):
+    items = [-25000000000.0, 1e5, -1.5e-7, 3, 0.25, 12e+3, -0, True, None, "a,b", {"k": [1.5, "x"]}, []]
+    text = json.dumps(items)
+    assert decode(text, chunk_size) == items
+    assert decode(text.replace(", ", ",\n  "), chunk_size) == items
+
+
+def test_fuzzed_scalar_arrays_match_json_loads():
+    rng = random.Random(0)
+    for _ in range(500):
+        pick = [
+            lambda: rng.uniform(-1e12, 1e12),
+            lambda: rng.randint(-(10**12), 10**12),
+            lambda: rng.random() * 10 ** rng.randint(-20, 20),
+        ]
+        items = [rng.choice(pick)() for _ in range(rng.randint(1, 6))]
+        text = json.dumps(items)
+        assert decode(text, rng.randint(1, 16)) == json.loads(text)
+
+
+def test_rejects_non_arrays():
+    with pytest.raises(ValueError):
+        decode('{"a": 1}', 4)
+    with pytest.raises(ValueError):
+        decode("[1, 2", 4)
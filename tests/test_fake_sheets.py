@@ -0,0 +1,74 @@
+from collections import Counter
+
+import pytest
+
+import sync_to_sheet as s
+from fake_sheets import FakeHttpError, FakeSheets
+
+
+def new_tab(**options):
+    fake = FakeSheets(read_requests_per_minute=0, write_requests_per_minute=0, **options)
+    service = fake.service()
+    return fake, service, s.ensure_tab(service, fake.spreadsheet_id, "t")
+
+
+def test_values_update_past_grid_expands_it():
+    fake, service, tab = new_tab()
+    values = [[str(i), "x"] for i in range(1500)]
+    service.spreadsheets().values().update(
+        spreadsheetId=fake.spreadsheet_id, range="t!A1", valueInputOption="RAW", body={"values": values}
+    ).execute()
+    assert fake.tab(tab).row_count == 1500
+    assert s.read_tab_values(service, fake.spreadsheet_id, tab) == values
+
+
+def test_values_update_past_cell_cap_fails_without_writing():
+    fake, service, tab = new_tab(max_cells=60_000)  # Sheet1 and t start at 26,000 cells each
+    request = service.spreadsheets().values().update(
+        spreadsheetId=fake.spreadsheet_id, range="t!A1", valueInputOption="RAW", body={"values": [["x"]] * 1500}
+    )
+    with pytest.raises(FakeHttpError) as exc:
+        request.execute()
+    assert exc.value.resp.status == 400
+    assert fake.tab(tab).row_count == 1000
+    assert fake.cells_written == 0
+
+
+def test_update_cells_still_checks_grid():
+    fake, service, tab = new_tab()
+    sheet_id = fake.tab(tab).props["sheetId"]
+    body = {
+        "requests": [
+            {
+                "updateCells": {
+                    "start": {"sheetId": sheet_id, "rowIndex": 1000, "columnIndex": 0},
+                    "rows": [{"values": [{"userEnteredValue": {"stringValue": "x"}}]}],
+                    "fields": "userEnteredValue",
+                }
+            }
+        ]
+    }
+    with pytest.raises(FakeHttpError) as exc:
+        service.spreadsheets().batchUpdate(spreadsheetId=fake.spreadsheet_id, body=body).execute()
+    assert exc.value.resp.status == 400
+
+
+@pytest.mark.parametrize("step, chunks", [(None, 7), (500, 10)])
+def test_writer_grid_stays_within_cell_cap(step, chunks):
+    # 2500 rows fit under the cap only if the grid is not grown past what is written
+    fake, service, tab = new_tab(max_cells=100_000)
+    rows = [[f"r{i}c{j}" for j in range(20)] for i in range(2500)]
+    calls = dict(fake.calls)
+    writer = s.ChunkedSheetWriter(service, fake.spreadsheet_id, tab, max_chunk_rows=400)
+    try:
+        if step is None:
+            writer.write(rows, 1)
+        else:
+            for start in range(0, len(rows), step):
+                writer.write(rows[start : start + step], start + 1)
+    finally:
+        writer.close()
+    assert fake.tab(tab).row_count == len(rows)
+    # values writes grow the grid themselves: no resize calls next to them
+    assert fake.calls - Counter(calls) == Counter({"values.batchUpdate": chunks})
+    assert s.read_tab_values(service, fake.spreadsheet_id, tab) == rows
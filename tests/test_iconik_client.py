@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+import iconik_client as ic
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers: dict | None = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b"{}"
+        self.request = type("Request", (), {"body": None})()
+
+    def close(self) -> None:
+        pass
+
+
+class FakeSession:
+    def __init__(self, responses: list[FakeResponse]):
+        self.responses = list(responses)
+
+    def request(self, method, url, **kwargs) -> FakeResponse:
+        return self.responses.pop(0)
+
+
+def client_with(responses: list[FakeResponse], limiter: ic.RateLimiter) -> ic.IconikClient:
+    client = ic.IconikClient("http://localhost", "app", "token", retries=3, backoff_base=0.01, limiter=limiter)
+    client.session = FakeSession(responses)
+    return client
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("5", 5.0),
+        (" 0.5 ", 0.5),
+        ("-3", 0.0),
+        ("1e9", ic.MAX_RETRY_AFTER),
+        ("inf", None),
+        ("-inf", None),
+        ("nan", None),
+        ("soon", None),
+        ("", None),
+        (None, None),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+    ],
+)
+def test_parse_retry_after(value, expected):
+    assert ic.parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_clamps_far_future_dates():
+    far = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 86400))
+    assert ic.parse_retry_after(far) == ic.MAX_RETRY_AFTER
+
+
+def test_503_without_retry_after_backs_off_only_the_worker():
+    limiter = ic.RateLimiter(max_rps=100)
+    client = client_with([FakeResponse(503), FakeResponse(200)], limiter)
+    assert client.get_with_retries("http://localhost/x").status_code == 200
+    assert limiter.backoffs == 1
+    assert limiter.paused_until == 0.0
+    assert limiter.rate < limiter.max_rps
+
+
+def test_503_with_retry_after_pauses_every_worker():
+    limiter = ic.RateLimiter(max_rps=100)
+    client = client_with([FakeResponse(503, {"Retry-After": "0.05"}), FakeResponse(200)], limiter)
+    before = time.monotonic()
+    assert client.get_with_retries("http://localhost/x").status_code == 200
+    assert limiter.backoffs == 1
+    assert before + 0.05 <= limiter.paused_until <= time.monotonic()
+    assert limiter.throttled_seconds > 0
+
+
+class PageSource:
+    # `pages` pages of one item each; every fetch after page 1 waits on `gate`
+    def __init__(self, pages: int):
+        self.pages = pages
+        self.fetched: list[int] = []
+        self.gate = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, page: int) -> tuple[list[dict], int | None, str | None]:
+        with self._lock:
+            self.fetched.append(page)
+        if page > 1:
+            self.gate.wait(5)
+        return [{"id": page}], self.pages, None
+
+
+def test_iter_pages_stops_at_max_pages():
+    source = PageSource(50)
+    source.gate.set()
+    pages = [page for page, _ in ic.iter_pages(source, 1, concurrency=4, max_pages=6)]
+    assert pages == [1, 2, 3, 4, 5, 6]
+    assert sorted(source.fetched) == pages
+
+
+def test_iter_pages_close_does_not_wait_for_the_look_ahead():
+    source = PageSource(50)
+    source.gate.set()
+    pages = ic.iter_pages(source, 1, concurrency=4)
+    assert [next(pages)[0] for _ in range(3)] == [1, 2, 3]
+    source.gate.clear()
+    start = time.monotonic()
+    pages.close()
+    assert time.monotonic() - start < 1
+    source.gate.set()
+    # nothing past the look-ahead window was scheduled
+    assert max(source.fetched) <= 3 + 4
@@ -0,0 +1,18 @@
+import argparse
+
+from metrics import Metrics
+
+
+def test_prometheus_exports_per_run_counts_as_gauges():
+    metrics = Metrics()
+    metrics.configure(argparse.Namespace(), "export")
+    metrics.inc("http_requests_total", service="iconik", status=200)
+    metrics.inc("http_requests_total", 2, service="iconik", status=200)
+    with metrics.phase("pages"):
+        pass
+    text = metrics.to_prometheus(metrics.snapshot())
+    assert "# TYPE iconik_http_requests gauge" in text
+    assert 'iconik_http_requests{entry="export",service="iconik",status="200"} 3' in text
+    assert "_total" not in text
+    assert " counter" not in text
+    assert "# TYPE iconik_run_timestamp_seconds gauge" in text
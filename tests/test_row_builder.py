@@ -0,0 +1,144 @@
+import json
+import random
+import threading
+from typing import Any
+
+import pytest
+
+import sync_to_sheet as s
+from synthetic_assets import generate_assets
+
+
+# The flatten that RowBuilder replaced, kept verbatim as the reference output.
+def reference_normalize_cell_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        if all(not isinstance(v, (dict, list)) for v in value):
+            return "\n".join(str(v) for v in value if v is not None).strip()
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value).strip()
+
+
+def reference_asset_to_row(asset: dict, header: list[str]) -> list[str]:
+    md = asset.get("metadata") or {}
+    if not isinstance(md, dict):
+        md = {}
+
+    time_start_ms = asset.get("time_start_milliseconds")
+    time_end_ms = asset.get("time_end_milliseconds")
+
+    def ms_to_s(ms: Any) -> str:
+        if isinstance(ms, (int, float)):
+            return str(ms / 1000)
+        return ""
+
+    row: dict[str, str] = {
+        "id": str(asset.get("id") or ""),
+        "title": str(asset.get("title") or asset.get("name") or ""),
+        "time_start_ms": str(time_start_ms or ""),
+        "time_end_ms": str(time_end_ms or ""),
+        "time_start_S": ms_to_s(time_start_ms),
+        "time_end_S": ms_to_s(time_end_ms),
+        "ProjectNameTag": "",
+        "SearchTag": "",
+    }
+
+    for key in header:
+        if key in row:
+            continue
+        if key in md:
+            row[key] = reference_normalize_cell_value(md.get(key))
+        else:
+            row[key] = ""
+
+    return [row.get(col, "") for col in header]
+
+
+def edge_assets() -> list[dict]:
+    rng = random.Random(7)
+    values = [
+        {"a": {"b": [1, {"c": "깊은 값"}]}},
+        {"empty": {}},
+        {},
+        [{"value": "x", "nested": {"deep": [None, True]}}],
+        [["inner", "list"]],
+        ["  padded  ", "b"],
+        ["a", None, "b"],
+        [1, 2.5, True],
+        [],
+        "  spaced\n",
+        "한글 값",
+        0,
+        -1.25,
+        False,
+        None,
+    ]
+    assets = [
+        {"id": "no-metadata", "title": "t"},
+        {"id": None, "name": "name only", "metadata": None},
+        {"id": 42, "title": "", "metadata": ["not", "a", "dict"]},
+        {
+            "id": "base-keys-in-metadata",
+            "title": "real title",
+            "metadata": {"title": "md title", "id": "md id", "SearchTag": "md tag", "time_start_ms": "md"},
+            "time_start_milliseconds": 0,
+            "time_end_milliseconds": 1500.5,
+        },
+        {"id": "string-times", "time_start_milliseconds": "100", "time_end_milliseconds": None, "metadata": {}},
+    ]
+    for n in range(200):
+        keys = rng.sample(["Description", "PlayersTags", "Nested", "Mixed", "Extra_001"], rng.randint(0, 5))
+        assets.append({"id": f"edge-{n}", "title": f"edge {n}", "metadata": {k: rng.choice(values) for k in keys}})
+    return assets
+
+
+@pytest.fixture(scope="module")
+def assets() -> list[dict]:
+    return list(generate_assets(2000, seed=3, metadata_keys=60, fill=0.5, nested=0.1)) + edge_assets()
+
+
+def test_row_builder_matches_reference_flatten(assets):
+    header = s.build_header(assets)
+    build_row = s.RowBuilder(header)
+    for asset in assets:
+        assert build_row(asset) == reference_asset_to_row(asset, header)
+
+
+def test_row_builder_matches_reference_with_repeated_and_unknown_columns(assets):
+    header = s.build_header(assets)
+    header = header + ["Description", "title", "NotInAnyAsset", "Nested", "time_end_S"]
+    build_row = s.RowBuilder(header)
+    for asset in assets:
+        assert build_row(asset) == reference_asset_to_row(asset, header)
+
+
+def test_flatten_paths_match_reference(assets):
+    header = s.build_header(assets)
+    expected = [header] + [reference_asset_to_row(a, header) for a in assets]
+    assert s.flatten_assets(assets, header) == expected
+    assert s.flatten_assets(assets, header, workers=2, chunk_rows=300) == expected
+    chunks = s.iter_row_chunks(iter(assets), header, 128)
+    assert [header] + [row for chunk in chunks for row in chunk] == expected
+
+
+def test_flatten_pool_does_not_fork_with_threads_running(assets, monkeypatch):
+    header = s.build_header(assets)
+    expected = [header] + [reference_asset_to_row(a, header) for a in assets]
+    monkeypatch.setattr(s, "FLATTEN_POOL_MIN_ASSETS", 1)
+    monkeypatch.setattr(s.os, "cpu_count", lambda: 4)
+    assert s.can_fork_pool()
+    assert s.auto_flatten_workers(len(assets)) == 4
+    done = threading.Event()
+    thread = threading.Thread(target=done.wait)
+    thread.start()
+    try:
+        assert not s.can_fork_pool()
+        assert s.auto_flatten_workers(len(assets)) == 1
+        # an explicit worker count still runs, with clean (non-forked) workers
+        assert s.flatten_assets(assets, header, workers=2, chunk_rows=300) == expected
+    finally:
+        done.set()
+        thread.join()
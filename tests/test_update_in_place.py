@@ -0,0 +1,117 @@
+import pytest
+
+import sync_to_sheet as s
+from fake_sheets import FakeSheets
+
+HEADER = ["id", "title", "size"]
+
+
+def new_tab(current: list[list[str]]):
+    fake = FakeSheets(read_requests_per_minute=0, write_requests_per_minute=0)
+    service = fake.service()
+    tab = s.ensure_tab(service, fake.spreadsheet_id, "t")
+    if current:
+        s.write_rows(service, fake.spreadsheet_id, tab, current)
+    return fake, service, tab
+
+
+def plan(current: list[list[str]], rows: list[list[str]], grid_cols: int = 26):
+    return s.plan_in_place_update(sheet_id=7, grid_cols=grid_cols, current=current, rows=rows)
+
+
+def kinds(requests_: list[dict]) -> list[str]:
+    return [next(iter(req)) for req in requests_]
+
+
+@pytest.mark.parametrize(
+    "expected, actual, runs",
+    [
+        (["a", "b", "c"], ["a", "b", "c"], []),
+        (["a", "b", "c", "d"], ["a", "x", "y", "d"], [(1, ["b", "c"])]),
+        (["a", "b", "c", "d"], ["x", "b", "c", "y"], [(0, ["a"]), (3, ["d"])]),
+        (["a", "b", "c"], ["a"], [(1, ["b", "c"])]),
+        (["a"], ["a", "z", "", "w"], [(1, [""]), (3, [""])]),
+        (["1", " t ", "a\r\nb"], [1.0, "t", "a\nb"], []),
+        ([], [], []),
+    ],
+)
+def test_changed_runs(expected, actual, runs):
+    assert list(s.changed_runs(expected, actual)) == runs
+
+
+def test_plan_unchanged_tab_sends_nothing():
+    rows = [HEADER, ["a", "A", "1"], ["b", "B", "2"]]
+    requests_, stats = plan(rows, rows)
+    assert requests_ == []
+    assert stats == {"changed_cells": 0, "updated_rows": 0, "appended_rows": 0, "deleted_rows": 0, "unkeyed_rows": 0}
+
+
+def test_plan_orders_updates_then_bottom_up_deletes_then_appends():
+    current = [HEADER, ["a", "A", "1"], ["b", "B", "2"], ["c", "C", "3"], ["d", "D", "4"]]
+    rows = [HEADER, ["d", "D", "40"], ["a", "A", "1"], ["e", "E", "5"]]
+    requests_, stats = plan(current, rows)
+    assert kinds(requests_) == ["updateCells", "deleteDimension", "deleteDimension", "appendCells"]
+    update = requests_[0]["updateCells"]
+    # planned against the pre-delete layout: d is still on row index 4
+    assert update["start"] == {"sheetId": 7, "rowIndex": 4, "columnIndex": 2}
+    assert [r["deleteDimension"]["range"]["startIndex"] for r in requests_[1:3]] == [3, 2]
+    assert stats == {"changed_cells": 4, "updated_rows": 1, "appended_rows": 1, "deleted_rows": 2, "unkeyed_rows": 0}
+
+
+def test_plan_header_change_grows_columns_first():
+    current = [HEADER, ["a", "A", "1"]]
+    rows = [HEADER + ["format"], ["a", "A", "1", "mov"]]
+    requests_, stats = plan(current, rows, grid_cols=3)
+    assert kinds(requests_) == ["appendDimension", "updateCells", "updateCells"]
+    assert requests_[0]["appendDimension"]["length"] == 1
+    assert requests_[1]["updateCells"]["start"] == {"sheetId": 7, "rowIndex": 0, "columnIndex": 3}
+    assert stats["updated_rows"] == 1  # the header is not counted as a row
+
+
+def test_plan_keeps_rows_without_an_id():
+    current = [HEADER, ["a", "A", "1"], ["", "reviewer note"], ["", "", "", ""], ["b", "B", "2"]]
+    requests_, stats = plan(current, [HEADER, ["a", "A", "1"]])
+    assert [r["deleteDimension"]["range"]["startIndex"] for r in requests_] == [4]
+    assert stats["unkeyed_rows"] == 1
+
+
+@pytest.mark.parametrize(
+    "current, rows, message",
+    [
+        ([HEADER, ["a", "A", "1"], ["a", "A2", "2"]], [HEADER], "Duplicate id in tab: a"),
+        ([HEADER], [HEADER, ["a", "A", "1"], ["a", "A", "1"]], "Duplicate id in source: a"),
+        ([["title"], ["A"]], [HEADER], "no 'id' column"),
+    ],
+)
+def test_plan_rejects_ambiguous_ids(current, rows, message):
+    with pytest.raises(RuntimeError, match=message):
+        plan(current, rows)
+
+
+@pytest.mark.parametrize("max_chunk_bytes", [2_000_000, 300])
+def test_update_in_place_matches_source(max_chunk_bytes):
+    current = [HEADER] + [[f"id{i}", f"title {i}", str(i)] for i in range(40)]
+    current.insert(10, ["", "subtotal", "45"])
+    rows = [HEADER + ["format"]]
+    for i in range(0, 50, 2):  # odd ids deleted, ids past 39 added
+        rows.append([f"id{i}", f"title {i}" if i % 3 else f"renamed {i}", str(i), "mov"])
+    fake, service, tab = new_tab(current)
+    result = s.update_in_place(service, fake.spreadsheet_id, tab, rows, max_chunk_bytes=max_chunk_bytes)
+
+    kept = [row for row in s.read_tab_values(service, fake.spreadsheet_id, tab) if any(row)]
+    assert ["", "subtotal", "45"] in kept
+    assert [row for row in kept if row[0]] == rows
+    assert result["deleted_rows"] == 20
+    assert result["appended_rows"] == 5
+    assert result["unkeyed_rows"] == 1
+    assert result["requests"] == fake.calls["batchUpdate"] - 1  # minus ensure_tab's addSheet
+    if max_chunk_bytes < 2_000_000:
+        assert result["requests"] > 1
+
+
+def test_update_in_place_on_empty_tab_counts_write_requests():
+    rows = [HEADER] + [[f"id{i}", "t", str(i)] for i in range(30)]
+    fake, service, tab = new_tab([])
+    result = s.update_in_place(service, fake.spreadsheet_id, tab, rows, max_chunk_rows=10)
+    assert result["requests"] == fake.calls["values.batchUpdate"] == 4
+    assert s.read_tab_values(service, fake.spreadsheet_id, tab) == rows
@@ -0,0 +1,23 @@
+from verify_sheet_matches import row_picker
+
+
+def test_row_picker_absent_column_reads_empty_not_trailing_cell():
+    cols = ["id", "title", "missing"]
+    pick = row_picker(cols, {"id": 0, "title": 1})
+    assert pick(["a", "b", "junk"]) == ["a", "b", ""]
+    assert pick(["a", "b", "junk", "_fp"]) == ["a", "b", ""]
+    assert pick(["a"]) == ["a", "", ""]
+
+
+def test_row_picker_absent_column_with_reordered_tab():
+    cols = ["id", "missing", "title"]
+    pick = row_picker(cols, {"title": 0, "id": 2})
+    assert pick(["t", "x", "a", "trailing"]) == ["a", "", "t"]
+    assert pick(["t", "x", "a"]) == ["a", "", "t"]
+    assert pick([]) == ["", "", ""]
+
+
+def test_row_picker_in_order_tab():
+    pick = row_picker(["id", "title"], {"id": 0, "title": 1})
+    assert pick(["a", "b", "extra"]) == ["a", "b"]
+    assert pick(["a"]) == ["a", ""]
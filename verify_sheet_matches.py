@@ -4,64 +4,157 @@ import hashlib
 import json
 import os
 import sys
-from typing import Any
-
-from googleapiclient.discovery import build
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Callable, Iterator
 
 import sync_to_sheet as s
+from metrics import METRICS, add_metrics_arguments, reporting
+from profiling import PROFILER, add_profile_arguments, profiling
+from sheets_client import SheetsService
+
+
+class TableDigest:
+    # Same bytes as hashing "\x1f".join(row) + "\n" per row, fed to sha256 in
+    # batches so a large tab costs a handful of update() calls.
+    def __init__(self, batch_rows: int = 2000):
+        self.hasher = hashlib.sha256()
+        self.batch_rows = batch_rows
+        self._lines: list[str] = []
+
+    def add(self, row: list[str]) -> None:
+        self._lines.append("\x1f".join(row))
+        if len(self._lines) >= self.batch_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._lines:
+            self.hasher.update(("\n".join(self._lines) + "\n").encode("utf-8"))
+            self._lines = []
+
+    def hexdigest(self) -> str:
+        self._flush()
+        return self.hasher.hexdigest()
+
+
+def row_picker(cols: list[str], col_index: dict[str, int]) -> Callable[[list[Any]], list[str]]:
+    # Returns a function that lays a raw sheet row out in `cols` order (missing
+    # columns/cells as "") and normalizes it. Positions are resolved once.
+    width = max(col_index.values(), default=-1) + 1
+    positions = [col_index.get(col, width) for col in cols]
+    if width == len(cols) and positions == list(range(len(cols))):
+        n = len(cols)
+
+        def pick(row: list[Any]) -> list[str]:
+            if len(row) < n:
+                row = list(row) + [""] * (n - len(row))
+            return s.normalize_sheet_row(row[:n])
+
+        return pick
+
+    getter = itemgetter(*positions) if positions else (lambda row: ())
+
+    def pick(row: list[Any]) -> list[str]:
+        # index `width` is always the "" sentinel for columns the tab lacks
+        padded = list(row[:width]) + [""] * (width + 1 - min(len(row), width))
+        picked = getter(padded)
+        return s.normalize_sheet_row(list(picked) if isinstance(picked, tuple) else [picked])
+
+    return pick
+
+
+class RowComparer:
+    # Compares normalized rows, counting every mismatched cell but keeping only
+    # the first `max_diffs` of them for the report.
+    def __init__(self, cols: list[str], max_diffs: int):
+        self.cols = cols
+        self.max_diffs = max(0, max_diffs)
+        self.mismatch_cells = 0
+        self.diffs: list[dict[str, Any]] = []
+
+    def __call__(self, expected_row: list[str], actual_row: list[str], row_number: int) -> None:
+        if expected_row == actual_row:
+            return
+        for col_name, exp_n, act_n in zip(self.cols, expected_row, actual_row):
+            if exp_n != act_n:
+                self.mismatch_cells += 1
+                if len(self.diffs) < self.max_diffs:
+                    self.diffs.append(
+                        {
+                            "row": row_number,
+                            "col": col_name,
+                            "expected": exp_n,
+                            "actual": act_n,
+                        }
+                    )
+
+
+def write_text_report(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
 
 
-def normalize_sheet_cell(value: Any) -> str:
-    if value is None:
-        return ""
-    if isinstance(value, str):
-        return value.replace("\r\n", "\n").strip()
-    if isinstance(value, float) and value.is_integer():
-        return str(int(value))
-    return str(value).replace("\r\n", "\n").strip()
-
-
-def sha256_table(rows: list[list[str]]) -> str:
-    hasher = hashlib.sha256()
-    for row in rows:
-        hasher.update("\x1f".join(row).encode("utf-8"))
-        hasher.update(b"\n")
-    return hasher.hexdigest()
-
-
-def read_tab_values(service, spreadsheet_id: str, tab_name: str) -> list[list[Any]]:
-    resp = (
-        service.spreadsheets()
-        .values()
-        .get(
-            spreadsheetId=spreadsheet_id,
-            range=tab_name,
-            valueRenderOption="FORMATTED_VALUE",
+def open_tab_rows(args: argparse.Namespace, service, creds) -> Iterator[list[Any]]:
+    # sheet rows are streamed block by block; only the header is needed up front
+    with METRICS.phase("sheets_read"):
+        reader = s.TabReader(
+            service,
+            args.sheet,
+            args.tab,
+            service_factory=lambda: SheetsService(creds),
+            concurrency=args.read_concurrency,
+            block_rows=args.read_block_rows,
         )
-        .execute()
-    )
-    values = resp.get("values") or []
-    return values if isinstance(values, list) else []
+    return chain.from_iterable(METRICS.timed(reader.blocks(), "sheets_read"))
 
 
-def extract_row(
-    *,
-    row: list[Any],
-    cols: list[str],
-    col_index: dict[str, int],
-) -> list[str]:
-    out: list[str] = []
-    for col in cols:
-        idx = col_index.get(col)
-        cell = row[idx] if idx is not None and idx < len(row) else ""
-        out.append(normalize_sheet_cell(cell))
-    return out
+def format_row_numbers(rows: list[int], limit: int) -> str:
+    preview = ", ".join(str(r) for r in rows[: max(0, limit)])
+    return preview + (" ..." if len(rows) > max(0, limit) else "")
 
 
-def write_text_report(path: str, text: str) -> None:
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(text)
+def verify_fingerprints(args: argparse.Namespace) -> None:
+    # Only recomputes each row's fingerprint; the source JSON is not needed.
+    creds = s.build_credentials()
+    service = SheetsService(creds)
+    sheet_rows = open_tab_rows(args, service, creds)
+    header = next(sheet_rows, None)
+    if header is None:
+        print("시트 탭에서 값을 읽지 못했습니다(빈 탭이거나 접근 권한/이름을 확인하세요).", file=sys.stderr)
+        sys.exit(2)
+    if s.FINGERPRINT_COLUMN not in [s.normalize_sheet_cell(v) for v in header]:
+        print(f"탭에 {s.FINGERPRINT_COLUMN} 컬럼이 없습니다 (sync_to_sheet.py --fingerprint 로 동기화하세요).", file=sys.stderr)
+        sys.exit(2)
+
+    is_edited = s.fingerprint_checker(header)
+    edited: list[int] = []
+    row_count = 0
+    for row_number, row in enumerate(sheet_rows, start=2):
+        row_count += 1
+        if row and is_edited(row):
+            edited.append(row_number)
+
+    now = dt.datetime.now().isoformat(timespec="seconds")
+    lines = [
+        "구글 시트 행 지문 검사 리포트",
+        f"- 시각: {now}",
+        f"- 시트 ID: {args.sheet}",
+        f"- 탭: {args.tab}",
+        f"- 시트 행 수(헤더 제외): {row_count}",
+        f"- 지문 불일치 행(동기화 후 수정됨): {len(edited)}",
+        f"- 결론: {'PASS' if not edited else 'FAIL'}",
+    ]
+    if edited:
+        lines.append("")
+        lines.append(f"수정된 행 (최대 {max(0, args.max_diffs)}개): {format_row_numbers(edited, args.max_diffs)}")
+    report_text = "\n".join(lines) + "\n"
+
+    if args.out:
+        write_text_report(args.out, report_text)
+        print(f"Wrote proof report: {args.out}")
+    print(report_text)
+    sys.exit(0 if not edited else 1)
 
 
 def main() -> None:
@@ -71,7 +164,7 @@ def main() -> None:
     parser = argparse.ArgumentParser(
         description="Verify that a Google Sheets tab matches the iconik API export JSON (cell-by-cell)."
     )
-    parser.add_argument("--json", default=os.getenv("ICONIK_JSON", "assets_test.json"), help="Path to assets JSON")
+    s.add_source_arguments(parser)
     parser.add_argument("--sheet", default=os.getenv("GOOGLE_SHEET_ID"), help="Google Spreadsheet ID")
     parser.add_argument("--tab", required=True, help="Tab name to verify")
     parser.add_argument(
@@ -95,165 +188,217 @@ def main() -> None:
     )
     parser.add_argument("--max-diffs", type=int, default=20, help="How many diffs to print in the report")
     parser.add_argument("--out", help="Write a text proof report to this path (UTF-8)")
+    parser.add_argument(
+        "--read-concurrency",
+        type=int,
+        default=int(os.getenv("GOOGLE_SHEETS_READ_CONCURRENCY", "4")),
+        help="How many batchGet requests to keep in flight while reading the tab",
+    )
+    parser.add_argument(
+        "--read-block-rows",
+        type=int,
+        default=int(os.getenv("GOOGLE_SHEETS_READ_BLOCK_ROWS", "5000")),
+        help="Rows per range when reading the tab",
+    )
+    parser.add_argument(
+        "--edited-only",
+        action="store_true",
+        help=f"Only report rows whose {s.FINGERPRINT_COLUMN} no longer matches their values (no source needed)",
+    )
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    METRICS.configure(args, "verify")
+    PROFILER.start(
+        args,
+        "verify",
+        hot=(
+            RowComparer.__call__,
+            TableDigest.add,
+            s.RowBuilder.__call__,
+            s.normalize_cell_value,
+            s.normalize_sheet_row,
+            s.normalize_sheet_cell,
+        ),
+    )
 
     if not args.sheet:
         print("Missing --sheet (or GOOGLE_SHEET_ID).", file=sys.stderr)
         sys.exit(2)
 
-    assets = s.load_assets(args.json)
-    expected_header_all = s.build_header(assets)
+    if args.edited_only:
+        verify_fingerprints(args)
+        return
+
+    with METRICS.phase("load_source"):
+        assets, expected_header_all = s.load_source(args)
+    METRICS.inc("assets_total", len(assets))
     expected_header_base = list(s.BASE_HEADER)
 
     creds = s.build_credentials()
-    service = build("sheets", "v4", credentials=creds, cache_discovery=False)
+    service = SheetsService(creds)
 
-    tab_values = read_tab_values(service, args.sheet, args.tab)
-    if not tab_values:
+    sheet_rows = open_tab_rows(args, service, creds)
+    first_row = next(sheet_rows, None)
+    if first_row is None:
         print("시트 탭에서 값을 읽지 못했습니다(빈 탭이거나 접근 권한/이름을 확인하세요).", file=sys.stderr)
         sys.exit(2)
 
-    actual_header = [normalize_sheet_cell(v) for v in (tab_values[0] or [])]
-    actual_set = set(actual_header)
+    actual_header = [s.normalize_sheet_cell(v) for v in (first_row or [])]
+    # the hidden fingerprint column is sync bookkeeping, not a data column
+    has_fingerprint = s.FINGERPRINT_COLUMN in actual_header
+    synced_header = [c for c in actual_header if c != s.FINGERPRINT_COLUMN]
+    actual_set = set(synced_header)
 
     mode = args.mode
     if mode == "auto":
-        if actual_header == expected_header_all:
+        if synced_header == expected_header_all:
             mode = "all"
-        elif actual_header == expected_header_base:
+        elif synced_header == expected_header_base:
             mode = "base"
         else:
             mode = "common"
 
-    if mode == "all":
-        cols = expected_header_all
-        expected_rows = s.flatten_assets(assets, cols)
-        header_ok = actual_header == cols
-        if not header_ok:
-            print("헤더가 기대값과 다릅니다. (--mode base/common 또는 탭을 확인하세요)", file=sys.stderr)
-    elif mode == "base":
-        cols = expected_header_base
-        expected_rows = s.flatten_assets(assets, cols)
-        missing = [c for c in cols if c not in actual_set]
-        header_ok = len(missing) == 0
-        if not header_ok:
-            print(f"시트 헤더에 BASE_HEADER 컬럼이 누락되었습니다: {', '.join(missing)}", file=sys.stderr)
-    else:  # common
-        cols = [c for c in expected_header_all if c in actual_set]
-        expected_rows = s.flatten_assets(assets, cols)
-        header_ok = "id" in cols
-        if not header_ok:
-            print("공통 컬럼에 'id'가 없습니다. 탭 헤더를 확인하세요.", file=sys.stderr)
-
-    actual_col_index = {name: i for i, name in enumerate(actual_header) if name}
+    with METRICS.phase("flatten"):
+        if mode == "all":
+            cols = expected_header_all
+            expected_rows = s.flatten_assets(assets, cols)
+            header_ok = synced_header == cols
+            if not header_ok:
+                print("헤더가 기대값과 다릅니다. (--mode base/common 또는 탭을 확인하세요)", file=sys.stderr)
+        elif mode == "base":
+            cols = expected_header_base
+            expected_rows = s.flatten_assets(assets, cols)
+            missing = [c for c in cols if c not in actual_set]
+            header_ok = len(missing) == 0
+            if not header_ok:
+                print(f"시트 헤더에 BASE_HEADER 컬럼이 누락되었습니다: {', '.join(missing)}", file=sys.stderr)
+        else:  # common
+            cols = [c for c in expected_header_all if c in actual_set]
+            expected_rows = s.flatten_assets(assets, cols)
+            header_ok = "id" in cols
+            if not header_ok:
+                print("공통 컬럼에 'id'가 없습니다. 탭 헤더를 확인하세요.", file=sys.stderr)
+
+    actual_col_index = {name: i for i, name in enumerate(actual_header) if name and name != s.FINGERPRINT_COLUMN}
 
     expected_asset_count = len(assets)
-    actual_row_count = max(0, len(tab_values) - 1)
-
-    diffs: list[dict[str, Any]] = []
-    mismatch_cells = 0
 
-    def compare_rows(expected_row: list[str], actual_row: list[str], row_number: int) -> None:
-        nonlocal mismatch_cells
-        for col_name, exp, act in zip(cols, expected_row, actual_row):
-            exp_n = normalize_sheet_cell(exp)
-            act_n = normalize_sheet_cell(act)
-            if exp_n != act_n:
-                mismatch_cells += 1
-                if len(diffs) < max(0, args.max_diffs):
-                    diffs.append(
-                        {
-                            "row": row_number,
-                            "col": col_name,
-                            "expected": exp_n,
-                            "actual": act_n,
-                        }
-                    )
+    # Every cell is normalized exactly once: expected rows here, sheet rows via
+    # the picker. Rows are compared whole first and only unequal rows are
+    # diffed cell by cell; both table hashes are fed in the same pass.
+    with METRICS.phase("flatten"):
+        expected_norm = [s.normalize_sheet_row(r) for r in expected_rows[1:]]
+        pick = row_picker(cols, actual_col_index)
+        id_pos = cols.index("id") if "id" in cols else None
+        title_pos = cols.index("title") if "title" in cols else None
+
+        expected_digest = TableDigest()
+        expected_digest.add(s.normalize_sheet_row(cols))
+        for r in expected_norm:
+            expected_digest.add(r)
+    actual_digest = TableDigest()
+    actual_digest.add(cols)
+
+    is_edited = s.fingerprint_checker(first_row) if has_fingerprint else None
+    edited: list[int] = []
+
+    def normalized_sheet_rows() -> Iterator[list[str]]:
+        for idx, raw in enumerate(sheet_rows):
+            if is_edited is not None and raw and is_edited(raw):
+                edited.append(idx + 2)
+            row = pick(raw)
+            if idx < expected_asset_count:
+                actual_digest.add(row)
+            yield row
+
+    compare_rows = RowComparer(cols, args.max_diffs)
 
     matches: list[dict[str, Any]] = []
 
-    if args.match_mode == "id":
-        if "id" not in actual_col_index or "id" not in cols:
-            print("id 매칭 모드는 'id' 컬럼이 필요합니다.", file=sys.stderr)
-            sys.exit(2)
-
-        id_col_pos = cols.index("id")
-        expected_ids: list[str] = []
-        expected_seen: set[str] = set()
-        expected_dupes: set[str] = set()
-        for r in expected_rows[1:]:
-            asset_id = normalize_sheet_cell(r[id_col_pos])
-            expected_ids.append(asset_id)
-            if asset_id in expected_seen:
-                expected_dupes.add(asset_id)
-            expected_seen.add(asset_id)
-
-        sheet_id_pos = actual_col_index["id"]
-        sheet_map: dict[str, tuple[int, list[Any]]] = {}
-        sheet_dupes: set[str] = set()
-        for idx, row in enumerate(tab_values[1:], start=2):
-            asset_id = normalize_sheet_cell(row[sheet_id_pos] if sheet_id_pos < len(row) else "")
-            if asset_id in sheet_map:
-                sheet_dupes.add(asset_id)
-            sheet_map[asset_id] = (idx, row)
-
-        if expected_dupes or sheet_dupes:
-            msg = []
-            if expected_dupes:
-                msg.append(f"기준 JSON에 중복 id {len(expected_dupes)}개")
-            if sheet_dupes:
-                msg.append(f"시트에 중복 id {len(sheet_dupes)}개")
-            print("id 매칭 모드는 id가 유일해야 합니다: " + ", ".join(msg), file=sys.stderr)
-            sys.exit(2)
-
-        missing_in_sheet = [i for i in expected_ids if i not in sheet_map]
-        extra_in_sheet = [i for i in sheet_map.keys() if i not in expected_seen and i != ""]
-
-        for exp_idx, exp_row in enumerate(expected_rows[1:], start=2):
-            asset_id = normalize_sheet_cell(exp_row[id_col_pos])
-            sheet_row_num, sheet_row = sheet_map.get(asset_id, (None, []))
-            if sheet_row_num is None:
-                continue
-            act_row = extract_row(row=sheet_row, cols=cols, col_index=actual_col_index)
-            compare_rows(exp_row, act_row, sheet_row_num)
-            matches.append({"row": sheet_row_num, "id": asset_id, "title": exp_row[cols.index("title")] if "title" in cols else ""})
-
-        strict_ok = (
-            header_ok
-            and (expected_asset_count == actual_row_count)
-            and (len(missing_in_sheet) == 0)
-            and (len(extra_in_sheet) == 0)
-            and (mismatch_cells == 0)
-        )
-        id_mode_notes = {
-            "missing_in_sheet": len(missing_in_sheet),
-            "extra_in_sheet": len(extra_in_sheet),
-        }
-    else:
-        compare_n = min(expected_asset_count, actual_row_count)
-        for i in range(compare_n):
-            row_number = i + 2
-            exp_row = expected_rows[i + 1]
-            act_row = extract_row(row=tab_values[i + 1] if i + 1 < len(tab_values) else [], cols=cols, col_index=actual_col_index)
-            compare_rows(exp_row, act_row, row_number)
-            matches.append(
-                {
-                    "row": row_number,
-                    "id": normalize_sheet_cell(exp_row[cols.index("id")]) if "id" in cols else "",
-                    "title": normalize_sheet_cell(exp_row[cols.index("title")]) if "title" in cols else "",
-                }
+    with METRICS.phase("compare"):
+        if args.match_mode == "id":
+            if "id" not in actual_col_index or id_pos is None:
+                print("id 매칭 모드는 'id' 컬럼이 필요합니다.", file=sys.stderr)
+                sys.exit(2)
+
+            expected_ids = [r[id_pos] for r in expected_norm]
+            expected_seen = set(expected_ids)
+            expected_dupes: set[str] = set()
+            if len(expected_seen) != len(expected_ids):
+                seen: set[str] = set()
+                for asset_id in expected_ids:
+                    if asset_id in seen:
+                        expected_dupes.add(asset_id)
+                    seen.add(asset_id)
+
+            actual_norm = list(normalized_sheet_rows())
+            actual_row_count = len(actual_norm)
+            sheet_map: dict[str, int] = {}
+            sheet_dupes: set[str] = set()
+            for idx, row in enumerate(actual_norm):
+                asset_id = row[id_pos]
+                if asset_id in sheet_map:
+                    sheet_dupes.add(asset_id)
+                sheet_map[asset_id] = idx
+
+            if expected_dupes or sheet_dupes:
+                msg = []
+                if expected_dupes:
+                    msg.append(f"기준 JSON에 중복 id {len(expected_dupes)}개")
+                if sheet_dupes:
+                    msg.append(f"시트에 중복 id {len(sheet_dupes)}개")
+                print("id 매칭 모드는 id가 유일해야 합니다: " + ", ".join(msg), file=sys.stderr)
+                sys.exit(2)
+
+            missing_in_sheet = [i for i in expected_ids if i not in sheet_map]
+            extra_in_sheet = [i for i in sheet_map.keys() if i not in expected_seen and i != ""]
+
+            for exp_row, exp_norm in zip(expected_rows[1:], expected_norm):
+                sheet_idx = sheet_map.get(exp_norm[id_pos])
+                if sheet_idx is None:
+                    continue
+                compare_rows(exp_norm, actual_norm[sheet_idx], sheet_idx + 2)
+                matches.append(
+                    {
+                        "row": sheet_idx + 2,
+                        "id": exp_norm[id_pos],
+                        "title": exp_row[title_pos] if title_pos is not None else "",
+                    }
+                )
+
+            strict_ok = (
+                header_ok
+                and (expected_asset_count == actual_row_count)
+                and (len(missing_in_sheet) == 0)
+                and (len(extra_in_sheet) == 0)
+                and (compare_rows.mismatch_cells == 0)
             )
-
-        strict_ok = header_ok and (expected_asset_count == actual_row_count) and (mismatch_cells == 0)
-        id_mode_notes = None
-
-    expected_norm_table = [[normalize_sheet_cell(v) for v in r] for r in expected_rows]
-    actual_norm_table: list[list[str]] = [cols]
-    for i in range(1, min(len(tab_values), expected_asset_count + 1)):
-        actual_norm_table.append(extract_row(row=tab_values[i], cols=cols, col_index=actual_col_index))
-
-    expected_hash = sha256_table(expected_norm_table)
-    actual_hash = sha256_table(actual_norm_table)
+            id_mode_notes = {
+                "missing_in_sheet": len(missing_in_sheet),
+                "extra_in_sheet": len(extra_in_sheet),
+            }
+        else:
+            actual_row_count = 0
+            for i, act_norm in enumerate(normalized_sheet_rows()):
+                actual_row_count += 1
+                if i >= expected_asset_count:
+                    continue
+                exp_norm = expected_norm[i]
+                compare_rows(exp_norm, act_norm, i + 2)
+                matches.append(
+                    {
+                        "row": i + 2,
+                        "id": exp_norm[id_pos] if id_pos is not None else "",
+                        "title": exp_norm[title_pos] if title_pos is not None else "",
+                    }
+                )
+
+            strict_ok = header_ok and (expected_asset_count == actual_row_count) and (compare_rows.mismatch_cells == 0)
+            id_mode_notes = None
+
+    expected_hash = expected_digest.hexdigest()
+    actual_hash = actual_digest.hexdigest()
 
     now = dt.datetime.now().isoformat(timespec="seconds")
     summary = {
@@ -261,18 +406,19 @@ def main() -> None:
         "result": "PASS" if strict_ok else "FAIL",
         "sheet_id": args.sheet,
         "tab": args.tab,
-        "json": args.json,
+        "json": args.store or args.json,
         "mode": mode,
         "match_mode": args.match_mode,
         "assets": expected_asset_count,
         "sheet_rows": actual_row_count,
         "columns_compared": len(cols),
         "header_ok": header_ok,
-        "mismatch_cells": mismatch_cells,
+        "mismatch_cells": compare_rows.mismatch_cells,
         "expected_sha256": expected_hash,
         "actual_sha256": actual_hash,
-        "diff_preview": diffs,
+        "diff_preview": compare_rows.diffs,
         "id_mode": id_mode_notes,
+        "edited_rows": edited if has_fingerprint else None,
     }
 
     lines: list[str] = []
@@ -280,13 +426,15 @@ def main() -> None:
     lines.append(f"- 시각: {now}")
     lines.append(f"- 시트 ID: {args.sheet}")
     lines.append(f"- 탭: {args.tab}")
-    lines.append(f"- 기준 JSON: {args.json}")
+    lines.append(f"- 기준 JSON: {args.store or args.json}")
     lines.append(f"- 비교 모드: {mode} (컬럼 {len(cols)}개)")
     lines.append(f"- 매칭 모드: {args.match_mode}")
     lines.append(f"- 기준 에셋 수: {expected_asset_count}")
     lines.append(f"- 시트 행 수(헤더 제외): {actual_row_count}")
     lines.append(f"- 헤더 일치: {'예' if header_ok else '아니오'}")
-    lines.append(f"- 불일치 셀 수: {mismatch_cells}")
+    lines.append(f"- 불일치 셀 수: {compare_rows.mismatch_cells}")
+    if has_fingerprint:
+        lines.append(f"- 지문 불일치 행(동기화 후 수정됨): {len(edited)}")
     lines.append(f"- SHA256(expected): {expected_hash}")
     lines.append(f"- SHA256(actual):   {actual_hash}")
     lines.append(f"- 결론: {'PASS' if strict_ok else 'FAIL'}")
@@ -294,10 +442,14 @@ def main() -> None:
     if id_mode_notes:
         lines.append(f"- id 기준 누락: {id_mode_notes['missing_in_sheet']}, 추가: {id_mode_notes['extra_in_sheet']}")
 
-    if diffs:
+    if edited:
+        lines.append("")
+        lines.append(f"수정된 행 (최대 {max(0, args.max_diffs)}개): {format_row_numbers(edited, args.max_diffs)}")
+
+    if compare_rows.diffs:
         lines.append("")
         lines.append(f"불일치 예시 (최대 {max(0, args.max_diffs)}개):")
-        for d in diffs:
+        for d in compare_rows.diffs:
             lines.append(f"- R{d['row']}C[{d['col']}] expected={json.dumps(d['expected'], ensure_ascii=False)} actual={json.dumps(d['actual'], ensure_ascii=False)}")
 
     # matches output
@@ -323,4 +475,5 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    with reporting(), profiling():
+        main()